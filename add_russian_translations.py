@@ -1,679 +1,299 @@
+import argparse
 import json
 import re
+import time
+from collections import Counter
+
+from build_manifest import BuildManifest, BUILD_MANIFEST, fingerprint, sha256_bytes, sha256_path, write_json_if_changed
+
+INPUT_JSON = 'nhanes_grouped.json'
+OUTPUT_JSON = 'nhanes_grouped_with_ru.json'
+# Словарь медицинских терминов {английская фраза: перевод}
+TRANSLATIONS_JSON = 'translations_ru.json'
+# Версия правил перевода: входит в отпечаток словаря для кэша сборки
+TRANSLATOR_VERSION = 3
+
+# Слова (через дефис - одно слово: Mono-2-ethyl-5-hydroxyhexyl, Follow-up) и
+# отдельные знаки препинания; пробелы между ними сохраняются как есть
+_TOKEN = re.compile(r"\w+(?:-\w+)*|[^\w\s]")
+_WORD_CHAR = re.compile(r"\w")
+# Знаки, на которых обрывается непереведенный фрагмент в отчете о покрытии
+_SPAN_BREAKS = {',', ';', ':', '(', ')'}
+
+
+_translations = None
+
+
+def load_translations(path=TRANSLATIONS_JSON):
+    """Словарь переводов; читается из файла при первом обращении"""
+    global _translations
+    if _translations is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            _translations = json.load(f)
+    return _translations
+
+
+def _hyphen_joined(text, i):
+    """True, если в позиции i дефис между двумя словами без пробелов"""
+    return 0 < i < len(text) - 1 and text[i] == '-' and _WORD_CHAR.match(text, i - 1) is not None \
+        and _WORD_CHAR.match(text, i + 1) is not None
+
+
+class PhraseTranslator:
+    """Перевод описаний по самому длинному совпадению фраз словаря.
+
+    Ключи словаря разбиваются на слова и компилируются в префиксное дерево
+    по словам (без учета регистра). Описание проходится один раз слева
+    направо: в каждой позиции берется самая длинная фраза из словаря, а
+    слова без перевода остаются как есть. Результаты запоминаются по тексту
+    описания.
+    """
+
+    _VALUE = object()
+
+    def __init__(self, dictionary):
+        self.root = {}
+        for phrase, translation in dictionary.items():
+            node = self.root
+            for token in _TOKEN.findall(phrase.lower()):
+                node = node.setdefault(token, {})
+            node[self._VALUE] = phrase, translation
+        self._cache = {}
+
+    def _match(self, desc, tokens, i):
+        """((фраза, перевод), индекс после фразы) для самой длинной фразы с позиции i или None.
+
+        Фраза, к которой соседнее слово пришито дефисом без пробелов
+        (часть химического названия вроде "-ethyl-"), не переводится;
+        дефис с пробелом с одной стороны ("Hydrocarbons -Urine") - разделитель.
+        """
+        if _hyphen_joined(desc, tokens[i][1] - 1):
+            return None
+        node = self.root
+        found = None
+        for j in range(i, len(tokens)):
+            node = node.get(tokens[j][0])
+            if node is None:
+                break
+            if self._VALUE in node and not _hyphen_joined(desc, tokens[j][2]):
+                found = node[self._VALUE], j + 1
+        return found
+
+    def translate(self, desc):
+        """Возвращает (перевод, [непереведенные фрагменты], [использованные фразы словаря])"""
+        cached = self._cache.get(desc)
+        if cached is not None:
+            return cached
+        tokens = [(match.group().lower(), match.start(), match.end()) for match in _TOKEN.finditer(desc)]
+        parts = []
+        untranslated = []
+        terms = []
+        span = None              # (начало, конец) текущего непереведенного фрагмента
+        position = 0
+        i = 0
+        while i < len(tokens):
+            token, start, end = tokens[i]
+            parts.append(desc[position:start])
+            found = self._match(desc, tokens, i)
+            if found:
+                (phrase, translation), i = found
+                parts.append(translation)
+                if phrase not in terms:
+                    terms.append(phrase)
+                position = tokens[i - 1][2]
+            else:
+                parts.append(desc[start:end])
+                position = end
+                i += 1
+            # Фрагменты без перевода для отчета о покрытии: слова подряд до переведенной
+            # фразы, разделителя ' - ' или знака из _SPAN_BREAKS
+            separator = token in _SPAN_BREAKS or (token == '-' and desc[start - 1:start].isspace())
+            if found or separator:
+                if span:
+                    untranslated.append(span)
+                span = None
+            elif token[0].isalnum() or token[0] == '_':
+                span = (span[0] if span else start, end)
+        if span:
+            untranslated.append(span)
+        parts.append(desc[position:])
+        result = ''.join(parts), [desc[start:end] for start, end in untranslated], terms
+        self._cache[desc] = result
+        return result
+
+
+_translator = None
+
+
+def get_translator():
+    global _translator
+    if _translator is None:
+        _translator = PhraseTranslator(load_translations())
+    return _translator
+
+
+def clean_description(desc):
+    """Описание без кода набора в скобках в конце"""
+    return re.sub(r'\s*\([^)]+\)$', '', desc)
 
-# Словарь для перевода медицинских терминов
-# Словарь для перевода медицинских терминов
-translations = {
-    # Существующие переводы...
-    "Aromatic Amines": "Ароматические амины",
-    "Urine": "Моча",
-    "Serum": "Сыворотка крови",
-    "Special Sample": "Специальный образец",
-    "Acculturation": "Аккультурация",
-    "Aldehydes": "Альдегиды",
-    "Acrylamide": "Акриламид",
-    "Glycidamide": "Глицидамид",
-    "Apolipoprotein B": "Аполипопротеин B",
-    "Brominated Flame Retardants": "Бромированные антипирены",
-    "Pooled Samples": "Объединенные образцы",
-    "Standard Biochemistry Profile": "Стандартный биохимический профиль",
-    "Blood Pressure": "Кровяное давление",
-    "Cholesterol": "Холестерин",
-    "Caffeine": "Кофеин",
-    "Caffeine Metabolites": "Метаболиты кофеина",
-    "Consumer Behavior": "Потребительское поведение",
-    "Cognitive Functioning": "Когнитивные функции",
-    "Chlamydia": "Хламидиоз",
-    "Creatine Kinase": "Креатинкиназа",
-    "Cotinine": "Котинин",
-    "Hydroxycotinine": "Гидроксикотинин",
-    "Taste": "Вкус",
-    "Smell": "Обоняние",
-    "Copper": "Медь",
-    "Selenium": "Селен",
-    "Zinc": "Цинк",
-    "DEET": "ДЭТА",
-    "Metabolites": "Метаболиты",
-    "Dermatology": "Дерматология",
-    "Diabetes": "Диабет",
-    "Disability": "Инвалидность",
-    "Mental Health": "Психическое здоровье",
-    "Depression Screener": "Скринер депрессии",
-    "Dietary Interview": "Диетическое интервью",
-    "Technical Support File": "Файл технической поддержки",
-    "Food Codes": "Коды продуктов питания",
-    "Dietary Supplement Use": "Использование диетических добавок",
-    "24-Hour": "24-часовой",
-    "Individual Dietary Supplements": "Индивидуальные диетические добавки",
-    "First Day": "Первый день",
-    "Total Dietary Supplements": "Общие диетические добавки",
-    "Second Day": "Второй день",
-    "30-Day": "30-дневный",
-    "Drug Use": "Употребление наркотиков",
-    "Dual-Energy X-ray Absorptiometry": "Двухэнергетическая рентгеновская абсорбциометрия",
-    "Abdominal Aortic Calcification": "Кальцификация брюшной аорты",
-    "Android/Gynoid Measurements": "Измерения андроидного/гиноидного типа",
-    "Femur": "Бедренная кость",
-    "FRAX Score": "Оценка FRAX",
-    "Vertebrae Morphology": "Морфология позвонков",
-    "Spine": "Позвоночник",
-    "Housing Characteristics": "Характеристики жилья",
-    "Human Papillomavirus": "Вирус папилломы человека",
-    "HPV": "ВПЧ",
-    "DNA Results": "Результаты ДНК",
-    "Penile Swab Samples": "Образцы мазков с полового члена",
-    "Roche Linear Array": "Roche Linear Array",
-    "Herpes Simplex Virus": "Вирус простого герпеса",
-    "Type-1": "Тип 1",
-    "Type-2": "Тип 2",
-    "Hospital Utilization": "Использование больничных услуг",
-    "Access to Care": "Доступ к медицинской помощи",
-    "Mercury": "Ртуть",
-    "Inorganic": "Неорганическая",
-    "Ethyl": "Этильная",
-    "Methyl": "Метильная",
-    "Blood": "Кровь",
-    "Immunization": "Иммунизация",
-    "Income": "Доход",
-    "Insulin": "Инсулин",
-    "Kidney Conditions": "Заболевания почек",
-    "Urology": "Урология",
-    "Medical Conditions": "Медицинские состояния",
-    "Muscle Strength": "Сила мышц",
-    "Grip Test": "Тест на силу хвата",
-    "Methylmalonic Acid": "Метилмалоновая кислота",
-    "Occupation": "Профессия",
-    "Oral Glucose Tolerance Test": "Пероральный тест толерантности к глюкозе",
-    "Oral Health": "Стоматологическое здоровье",
-    "Dentition": "Зубная система",
-    "Periodontal": "Пародонтальный",
-    "Recommendation of Care": "Рекомендация по уходу",
-    "Oral Rinse": "Полоскание полости рта",
-    "Vertebral Fracture Assessment": "Оценка переломов позвоночника",
-    "Whole Body": "Все тело",
-    "Early Childhood": "Раннее детство",
-    "Personal Care and Consumer Product Chemicals and Metabolites": "Химические вещества и метаболиты средств личной гигиены и потребительских товаров",
-    "Ethylene Oxide": "Оксид этилена",
-    "Fasting Questionnaire": "Анкета о голодании",
-    "Fatty Acids": "Жирные кислоты",
-    "Vaginal Swab": "Вагинальный мазок",
-    "Roche Cobas": "Roche Cobas",
-    "DNA": "ДНК",
-    "Utilization": "Использование",
-    "Chemicals and Metabolites": "Химические вещества и метаболиты",
-    "Personal Care": "Средства личной гигиены",
-    "Consumer Product": "Потребительские товары",
-    "Linear Array": "Линейная матрица",
-    "Cobas": "Кобас",
-    "T10 Vertebrae Morphology": "Морфология позвонка T10",
-    "T11 Vertebrae Morphology": "Морфология позвонка T11",
-    "T12 Vertebrae Morphology": "Морфология позвонка T12",
-    "T4 Vertebrae Morphology": "Морфология позвонка T4",
-    "T5 Vertebrae Morphology": "Морфология позвонка T5",
-    "T6 Vertebrae Morphology": "Морфология позвонка T6",
-    "T7 Vertebrae Morphology": "Морфология позвонка T7",
-    "T8 Vertebrae Morphology": "Морфология позвонка T8",
-    "T9 Vertebrae Morphology": "Морфология позвонка T9",
-    "L1 Vertebrae Morphology": "Морфология позвонка L1",
-    "L2 Vertebrae Morphology": "Морфология позвонка L2",
-    "L3 Vertebrae Morphology": "Морфология позвонка L3",
-    "L4 Vertebrae Morphology": "Морфология позвонка L4",
-    "BFRs": "Бромированные антипирены",
-    "Roche Linear Array": "Roche Linear Array",
-    "Roche Cobas & Roche Linear Array": "Roche Cobas и Roche Linear Array",
-    "Penile Swab Samples": "Образцы мазков с полового члена",
-    "from Penile Swab Samples": "из образцов мазков с полового члена",
-    "Vaginal Swab": "Вагинальный мазок",
-    "AAS_H": "Ароматические амины - Моча - Специальный образец",
-    "AA_H": "Ароматические амины - Моча",
-    "ACQ_H": "Аккультурация",
-    "ALDS_H": "Альдегиды - Сыворотка крови - Специальный образец",
-    "ALD_H": "Альдегиды - Сыворотка крови",
-    "AMDGDS_H": "Акриламид и глицидамид - Специальный образец",
-    "AMDGYD_H": "Акриламид и глицидамид",
-    "APOB_H": "Аполипопротеин B",
-    "BFRPOL_H": "Бромированные антипирены - Объединенные образцы",
-    "BIOPRO_H": "Стандартный биохимический профиль",
-    "BPQ_H": "Кровяное давление и холестерин",
-    "CAFE_H": "Кофеин и метаболиты кофеина - Моча",
-    "CBQ_H": "Потребительское поведение",
-    "CFQ_H": "Когнитивные функции",
-    "CHLMDA_H": "Хламидиоз - Моча",
-    "CKQ_H": "Креатинкиназа",
-    "COT_H": "Котинин и гидроксикотинин - Сыворотка крови",
-    "CSQ_H": "Вкус и обоняние",
-    "CSX_H": "Вкус и обоняние",
-    "CUSEZN_H": "Медь, селен и цинк - Сыворотка крови",
-    "DEET_H": "ДЭТА и метаболиты",
-    "DEQ_H": "Дерматология",
-    "DIQ_H": "Диабет",
-    "DLQ_H": "Инвалидность",
-    "DPQ_H": "Психическое здоровье - Скринер депрессии",
-    "DRXFCD_H": "Диетическое интервью - Файл технической поддержки - Коды продуктов питания",
-    "DS1IDS_H": "Использование диетических добавок 24-часовое - Индивидуальные диетические добавки, первый день",
-    "DS1TOT_H": "Использование диетических добавок 24-часовое - Общие диетические добавки, первый день",
-    "DS2IDS_H": "Использование диетических добавок 24-часовое - Индивидуальные диетические добавки, второй день",
-    "DS2TOT_H": "Использование диетических добавок 24-часовое - Общие диетические добавки, второй день",
-    "DSQIDS_H": "Использование диетических добавок 30-дневное - Индивидуальные диетические добавки",
-    "DSQTOT_H": "Использование диетических добавок 30-дневное - Общие диетические добавки",
-    "DUQ_H": "Употребление наркотиков",
-    "DXXAAC_H": "Двухэнергетическая рентгеновская абсорбциометрия - Кальцификация брюшной аорты",
-    "DXXAG_H": "Двухэнергетическая рентгеновская абсорбциометрия - Измерения андроидного/гиноидного типа",
-    "DXXFEM_H": "Двухэнергетическая рентгеновская абсорбциометрия - Бедренная кость",
-    "DXXFRX_H": "Двухэнергетическая рентгеновская абсорбциометрия - Оценка FRAX",
-    "DXXL1_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка L1",
-    "DXXL2_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка L2",
-    "DXXL3_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка L3",
-    "DXXL4_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка L4",
-    "DXXSPN_H": "Двухэнергетическая рентгеновская абсорбциометрия - Позвоночник",
-    "DXXT10_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка T10",
-    "DXXT11_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка T11",
-    "DXXT12_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка T12",
-    "DXXT4_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка T4",
-    "DXXT5_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка T5",
-    "DXXT6_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка T6",
-    "DXXT7_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка T7",
-    "DXXT8_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка T8",
-    "DXXT9_H": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонка T9",
-    "DXXVFA_H": "Двухэнергетическая рентгеновская абсорбциометрия - Оценка переломов позвоночника",
-    "DXX_H": "Двухэнергетическая рентгеновская абсорбциометрия - Все тело",
-    "ECQ_H": "Раннее детство",
-    "EPHPP_H": "Химические вещества и метаболиты средств личной гигиены и потребительских товаров",
-    "ETHOXS_H": "Оксид этилена - Специальный образец",
-    "ETHOX_H": "Оксид этилена",
-    "FASTQX_H": "Анкета о голодании",
-    "FAS_H": "Жирные кислоты - Сыворотка крови",
-    "FLDEP_H": "Фториды - Плазма",
-    "FNA_H": "Фолиевая кислота - Эритроциты",
-    "FOLATE_H": "Фолиевая кислота - Сыворотка крови",
-    "FOLFMS_H": "Фолиевая кислота - Специальный образец",
-    "GHB_H": "Гамма-гидроксибутират",
-    "GLU_H": "Глюкоза - Сыворотка крови",
-    "GLYCO_H": "Гликогемоглобин",
-    "HCAAS_H": "Гетероциклические ароматические амины - Специальный образец",
-    "HCAA_H": "Гетероциклические ароматические амины",
-    "HCB_H": "Гексахлорбензол",
-    "HCQ_H": "Здоровье сердца",
-    "HCT_H": "Гематокрит",
-    "HDQ_H": "История болезни",
-    "HEQ_H": "Здоровье окружающей среды",
-    "HEPA_H": "Гепатит A",
-    "HEPB_S_H": "Гепатит B: Тесты поверхности",
-    "HEPC_H": "Гепатит C и антиген",
-    "HIQ_H": "Индекс здоровья",
-    "HIV_H": "ВИЧ",
-    "HOQ_H": "Характеристики жилья",
-    "HPVP_H": "Вирус папилломы человека (ВПЧ) ДНК - Результаты из образцов мазков с полового члена: Roche Linear Array",
-    "HPVSWR_H": "Вирус папилломы человека (ВПЧ) ДНК - Вагинальный мазок: Roche Cobas и Roche Linear Array",
-    "HSV_H": "Вирус простого герпеса тип 1 и тип 2",
-    "HUQ_H": "Использование больничных услуг и доступ к медицинской помощи",
-    "IHGEM_H": "Ртуть: Неорганическая, этильная и метильная - Кровь",
-    "IMQ_H": "Иммунизация",
-    "INQ_H": "Доход",
-    "INS_H": "Инсулин",
-    "KIQ_U_H": "Заболевания почек - Урология",
-    "MCQ_H": "Медицинские состояния",
-    "MGX_H": "Сила мышц - Тест на силу хвата",
-    "MMA_H": "Метилмалоновая кислота",
-    "OCQ_H": "Профессия",
-    "OGTT_H": "Пероральный тест толерантности к глюкозе",
-    "OHQ_H": "Стоматологическое здоровье",
-    "OHXDEN_H": "Стоматологическое здоровье - Зубная система",
-    "OHXPER_H": "Стоматологическое здоровье - Пародонтальный",
-    "OHXREF_H": "Стоматологическое здоровье - Рекомендация по уходу",
-    "ORHPV_H": "Вирус папилломы человека (ВПЧ) - Полоскание полости рта",
-    "Acrylamide": "Акриламид",
-    "Glycidamide": "Глицидамид",
-    "Blood Pressure": "Кровяное давление",
-    "Cholesterol": "Холестерин",
-    "Caffeine": "Кофеин",
-    "Caffeine Metabolites": "Метаболиты кофеина",
-    "Human Papillomavirus (HPV)": "Вирус папилломы человека (ВПЧ)",
-    "DNA Results": "Результаты ДНК",
-    "Herpes Simplex Virus": "Вирус простого герпеса",
-    "Type-1": "Тип 1",
-    "Type-2": "Тип 2",
-    "Hospital Utilization": "Использование больничных услуг",
-    "Access to Care": "Доступ к медицинской помощи",
-    "Mercury": "Ртуть",
-    "Inorganic": "Неорганическая",
-    "Ethyl": "Этильная",
-    "Methyl": "Метильная",
-    "Osteoporosis": "Остеопороз",
-    "Polycyclic Aromatic Hydrocarbons (PAH)": "Полциклические ароматические углеводороды (ПАУ)",
-    "Physical Activity": "Физическая активность",
-    "Physical Activity Monitor": "Монитор физической активности",
-    "Day": "День",
-    "Header": "Заголовок",
-    "Hour": "Час",
-    "Lead": "Свинец",
-    "Cadmium": "Кадмий",
-    "Total Mercury": "Общая ртуть",
-    "Selenium": "Селен",
-    "Manganese": "Марганец",
-    "Non-dioxin-like Polychlorinated Biphenyls": "Полихлорированные бифенилы без диоксиноподобного действия",
-    "Mono-ortho-substituted Polychlorinated Biphenyls": "Моно-орто-замещенные полихлорированные бифенилы",
-    "Perchlorate": "Перхлорат",
-    "Nitrate": "Нитрат",
-    "Thiocyanate": "Тиоцианат",
-    "Perfluoroalkyl and Polyfluoroalkyl Substances": "Перфторалкильные и полифторалкильные вещества",
-    "formerly Polyfluoroalkyl Chemicals - PFC": "ранее полифторалкильные химикаты - ПФХ",
-    "Physical Functioning": "Физическое функционирование",
-    "Phthalates and Plasticizers Metabolites": "Метаболиты фталатов и пластификаторов",
-    "Pooled-Sample Technical Support File": "Файл технической поддержки объединенных образцов",
-    "Pesticides": "Пестициды",
-    "Organochlorine Pesticides": "Органхлорные пестициды",
-    "Pesticide Use": "Использование пестицидов",
-    "Reproductive Health": "Репродуктивное здоровье",
-    "Preventive Aspirin Use": "Профилактическое использование аспирина",
-    "Prescription Medications": "Рецептурные лекарства",
-    "Sleep Disorders": "Расстройства сна",
-    "Chlamydia Pgp3": "Хламидия Pgp3",
-    "plasmid gene product 3": "продукт плазмидного гена 3",
-    "ELISA": "ИФА",
-    "enzyme linked immunosorbent assay": "иммуноферментный анализ",
-    "multiplex bead array": "мультиплексный бисерный массив",
-    "MBA": "МБА",
-    "Flame Retardant Metabolites": "Метаболиты антипиренов",
-    "Urine (Surplus)": "Моча (избыток)",
-    "Glyphosate": "Глифосат",
-    "GLYP": "ГЛИФ",
-    "Hepatitis C": "Гепатит C",
-    "Confirmed Antibody": "Подтвержденные антитела",
-    "INNO-LIA": "ИННО-ЛИА",
-    "Klotho": "Клото",
-    "Serum (Surplus)": "Сыворотка крови (избыток)",
-    "in US children 3-11 Years of Age": "у детей США 3-11 лет",
-    "Linear and Branched PFOS and PFOA Isomers": "Линейные и разветвленные изомеры ПФОС и ПФОА",
-    "Surplus": "Избыток",
-    "Serum Neurofilament Light Chain": "Легкая цепь нейрофиламентов сыворотки",
-    "Terpenes": "Терпены",
-    "Antibody to Toxocara spp.": "Антитела к Toxocara spp.",
-    "Toxoplasma gondii Antibody": "Антитела к Toxoplasma gondii",
-    "Sexual Behavior": "Сексуальное поведение",
-    "Tissue Transglutaminase Assay": "Анализ тканевой трансглутаминазы",
-    "IgA-TTG": "IgA-ТТГ",
-    "IgA Endomyseal Antibody Assay": "Анализ антител к эндомизию IgA",
-    "IgA EMA": "IgA EMA",
-    "Trichomonas": "Трихомонада",
-    "Tobacco-specific Nitrosamines": "Табакоспецифические нитрозамины",
-    "TSNAs": "ТСНА",
-    "Sex Steroid Hormone": "Гормон половых стероидов",
-    "Arsenics": "Мышьяки",
-    "Speciated": "Специфицированные",
-    "Urine Flow Rate": "Скорость потока мочи",
-    "Cotinine": "Котинин",
-    "Hydroxycotinine": "Гидроксикотинин",
-    "Other Nicotine Metabolites and Analogs": "Другие метаболиты и аналоги никотина",
-    "Pregnancy Test": "Тест на беременность",
-    "Mercury: Inorganic": "Ртуть: Неорганическая",
-    "Iodine": "Йод",
-    "Metals": "Металлы",
-    "Pyrethroids": "Пиретроиды",
-    "Herbicides": "Гербициды",
-    "Organophosphorus Metabolites": "Метаболиты органофосфорных соединений",
-    "Arsenic": "Мышьяк",
-    "Total": "Общий",
-    "Volatile Organic Compound": "Летучее органическое соединение",
-    "VOC": "ЛОС",
-    "Volatile Organic Compound (VOC) Metabolites": "Метаболиты летучих органических соединений (ЛОС)",
-    "Vitamin D": "Витамин D",
-    "Vitamin B12": "Витамин B12",
-    "Volatile N-Nitrosamine Compounds": "Летучие N-нитрозаминовые соединения",
-    "VNAs": "ЛНС",
-    "Volatile Organic Compounds": "Летучие органические соединения",
-    "VOCs": "ЛОС",
-    "Trihalomethanes": "Тригалогенметаны",
-    "MTBE": "МТБЭ",
-    "Trihalomethanes/MTBE": "Тригалогенметаны/МТБЭ",
-    "Volatile Toxicant": "Летучий токсикант",
-    "Weight History": "История веса",
-    "Youth": "Молодежь",
-    "Weight History - Youth": "История веса - Молодежь",
-    "Albumin": "Альбумин",
-    "Creatinine": "Креатинин",
-    "Complete Blood Count": "Общий анализ крови",
-    "5-part Differential": "5-компонентный дифференциал",
-    "Whole Blood": "Цельная кровь",
-    "Alcohol Use": "Употребление алкоголя",
-    "Cardiovascular Health": "Сердечно-сосудистое здоровье",
-    "Current Health Status": "Текущий статус здоровья",
-    "Smoking": "Курение",
-    "Household Smokers": "Курящие в доме",
-    "Recent Tobacco Use": "Недавнее употребление табака",
-    "Secondhand Smoke Exposure": "Воздействие вторичного табачного дыма",
-    "Cigarette Use": "Употребление сигарет",
-    "Body Measures": "Измерения тела",
-    "Diet Behavior": "Пищевое поведение",
-    "Nutrition": "Питание",
-    "Diet Behavior & Nutrition": "Пищевое поведение и питание",
-    "Demographic Variables": "Демографические переменные",
-    "Sample Weights": "Веса выборки",
-    "Demographic Variables and Sample Weights": "Демографические переменные и веса выборки",
-    "Audiometry": "Аудиометрия",
-    "Acoustic Reflex": "Акустический рефлекс",
-    "Tympanometry": "Тимпанометрия",
-    "Balance": "Баланс",
-    "Bioelectrical Impedance Analysis": "Биоэлектрический импедансный анализ",
-    "Blood Pressure & Cholesterol": "Кровяное давление и холестерин",
-    "Cardiovascular Fitness": "Кардиоваскулярная подготовка",
-    "Dietary Interview": "Диетическое интервью",
-    "Technical Support File": "Файл технической поддержки",
-    "Food Code Format File": "Файл формата кодов продуктов питания",
-    "Dietary Supplement Database": "База данных диетических добавок",
-    "Blend Information": "Информация о смесях",
-    "Ingredient Information": "Информация об ингредиентах",
-    "Product Information": "Информация о продуктах",
-    "Dietary Supplement Use 30-Day": "Использование диетических добавок 30-дневное",
-    "File 1": "Файл 1",
-    "Supplement Counts": "Количество добавок",
-    "Roche Cobas": "Roche Cobas",
-    "Roche Linear Array": "Roche Linear Array",
-    "from Penile Swab Samples": "из образцов мазков с полового члена",
-    "Vaginal Swab": "Вагинальный мазок",
-    "Roche Cobas & Roche Linear Array": "Roche Cobas и Roche Linear Array",
-    "Penile Swab Samples": "Образцы мазков с полового члена",
-    "BFRs": "Бромированные антипирены",
-    "alpha-1-Acid Glycoprotein": "Альфа-1-кислый гликопротеин",
-    "Allergy": "Аллергия",
-    "Allergens - Household Dust": "Аллергены - Бытовые пыль",
-    "Allergen Specific IgE(s) & Total IgE": "Специфические IgE к аллергенам и общий IgE",
-    "Air Quality": "Качество воздуха",
-    "Albumin & Creatinine": "Альбумин и креатинин",
-    "Arthritis": "Артрит",
-    "Arthritis Body Measures": "Измерения тела при артрите",
-    "Wideband Reflectance": "Широкополосное отражение",
-    "Vitamin B12": "Витамин B12",
-    "Bowel Health": "Здоровье кишечника",
-    "Pesticides - Carbamates & Organophosphorus Metabolites": "Пестициды - Карбаматы и метаболиты органофосфорных соединений",
-    "Chlamydia & Gonorrhea": "Хламидиоз и гонорея",
-    "Gonorrhea": "Гонорея",
-    "Pesticides - Carbamates": "Пестициды - Карбаматы",
-    "Consumer Behavior Phone Follow-up Module - Adult": "Модуль телефонного последующего наблюдения за потребительским поведением - Взрослые",
-    "Consumer Behavior Phone Follow-up Module - Child": "Модуль телефонного последующего наблюдения за потребительским поведением - Дети",
-    "Ages 18-19": "Возраст 18-19 лет",
-    "Blood Pressure - Oscillometric Measurements": "Кровяное давление - Осциллометрические измерения",
-    "Complete Blood Count with 5-part Differential in Whole Blood": "Общий анализ крови с 5-компонентным дифференциалом в цельной крови",
-    "Complete Blood Count with 5-Part Differential - Whole Blood": "Общий анализ крови с 5-компонентным дифференциалом - Цельная кровь",
-    "Cardiovascular Fitness": "Кардиоваскулярная подготовка",
-    "Environmental Health": "Здоровье окружающей среды",
-    "Hepatitis A": "Гепатит A",
-    "Hepatitis B: Surface Tests": "Гепатит B: Тесты поверхности",
-    "Hepatitis C and Antigen": "Гепатит C и антиген",
-    "Health Index": "Индекс здоровья",
-    "Hepatitis B": "Гепатит B",
-    "Hepatitis C": "Гепатит C",
-    "Medical History": "История болезни",
-    "Kidney Conditions - Urology": "Заболевания почек - Урология",
-    "Muscle Strength - Grip Test": "Сила мышц - Тест на силу хвата",
-    "Oral Health - Dentition": "Стоматологическое здоровье - Зубная система",
-    "Oral Health - Periodontal": "Стоматологическое здоровье - Пародонтальный",
-    "Oral Health - Recommendation of Care": "Стоматологическое здоровье - Рекомендация по уходу",
-    "HPV - Oral Rinse": "ВПЧ - Полоскание полости рта",
-    "Heterocyclic Aromatic Amines": "Гетероциклические ароматические амины",
-    "Hexachlorobenzene": "Гексахлорбензол",
-    "Heart Health": "Здоровье сердца",
-    "Hematocrit": "Гематокрит",
-    "Gamma-Hydroxybutyrate": "Гамма-гидроксибутират",
-    "Glucose": "Глюкоза",
-    "Glycated Hemoglobin": "Гликогемоглобин",
-    "Folic Acid - Erythrocytes": "Фолиевая кислота - Эритроциты",
-    "Folic Acid - Serum": "Фолиевая кислота - Сыворотка крови",
-    "Folic Acid - Special Sample": "Фолиевая кислота - Специальный образец",
-    "Fluorides - Plasma": "Фториды - Плазма",
-    "Acrylamide & Glycidamide": "Акриламид и глицидамид",
-    "Apolipoprotein B (ApoB)": "Аполипопротеин B (ApoB)",
-    "Brominated Flame Retardants (BFRs) - Pooled Samples": "Бромированные антипирены (БАП) - Объединенные образцы",
-    "Caffeine & Caffeine Metabolites - Urine": "Кофеин и метаболиты кофеина - Моча",
-    "Chlamydia - Urine": "Хламидиоз - Моча",
-    "Cotinine and Hydroxycotinine - Serum": "Котинин и гидроксикотинин - Сыворотка крови",
-    "Taste & Smell": "Вкус и обоняние",
-    "Copper, Selenium & Zinc - Serum": "Медь, селен и цинк - Сыворотка крови",
-    "Dietary Interview - Technical Support File - Food Codes": "Диетическое интервью - Файл технической поддержки - Коды продуктов питания",
-    "Dietary Supplement Use 24-Hour - Individual Dietary Supplements, First Day": "Использование диетических добавок 24-часовое - Индивидуальные диетические добавки, первый день",
-    "Dietary Supplement Use 24-Hour - Total Dietary Supplements, First Day": "Использование диетических добавок 24-часовое - Общие диетические добавки, первый день",
-    "Dietary Supplement Use 24-Hour - Individual Dietary Supplements, Second Day": "Использование диетических добавок 24-часовое - Индивидуальные диетические добавки, второй день",
-    "Dietary Supplement Use 24-Hour - Total Dietary Supplements, Second Day": "Использование диетических добавок 24-часовое - Общие диетические добавки, второй день",
-    "Dietary Supplement Use 30-Day - Individual Dietary Supplements": "Использование диетических добавок 30-дневное - Индивидуальные диетические добавки",
-    "Dietary Supplement Use 30-Day - Total Dietary Supplements": "Использование диетических добавок 30-дневное - Общие диетические добавки",
-    "Dual-Energy X-ray Absorptiometry - Abdominal Aortic Calcification": "Двухэнергетическая рентгеновская абсорбциометрия - Кальцификация брюшной аорты",
-    "Dual-Energy X-ray Absorptiometry - Android/Gynoid Measurements": "Двухэнергетическая рентгеновская абсорбциометрия - Измерения андроидного/гиноидного типа",
-    "Dual-Energy X-ray Absorptiometry - Femur": "Двухэнергетическая рентгеновская абсорбциометрия - Бедренная кость",
-    "Dual-Energy X-ray Absorptiometry - FRAX Score": "Двухэнергетическая рентгеновская абсорбциометрия - Оценка FRAX",
-    "Dual-Energy X-ray Absorptiometry - Vertebrae Morphology": "Двухэнергетическая рентгеновская абсорбциометрия - Морфология позвонков",
-    "Dual-Energy X-ray Absorptiometry - Spine": "Двухэнергетическая рентгеновская абсорбциометрия - Позвоночник",
-    "Dual-Energy X-ray Absorptiometry - Vertebral Fracture Assessment": "Двухэнергетическая рентгеновская абсорбциометрия - Оценка переломов позвоночника",
-    "Dual-Energy X-ray Absorptiometry - Whole Body": "Двухэнергетическая рентгеновская абсорбциометрия - Все тело",
-    "Ethylene Oxide - Special Sample": "Оксид этилена - Специальный образец",
-    "Fasting Questionnaire": "Анкета о голодании",
-    "Fatty Acids - Serum": "Жирные кислоты - Сыворотка крови",
-    "HPV DNA Results from Penile Swab Samples: Roche Linear Array": "Результаты ДНК ВПЧ из образцов мазков с полового члена: Roche Linear Array",
-    "HPV DNA - Vaginal Swab: Roche Cobas & Roche Linear Array": "ДНК ВПЧ - Вагинальный мазок: Roche Cobas и Roche Linear Array",
-    "Herpes Simplex Virus Type 1 and Type 2": "Вирус простого герпеса тип 1 и тип 2",
-    "Hospital Utilization & Access to Care": "Использование больничных услуг и доступ к медицинской помощи",
-    "Mercury: Inorganic, Ethyl and Methyl - Blood": "Ртуть: Неорганическая, этильная и метильная - Кровь",
-    "HPV - Oral Rinse": "ВПЧ - Полоскание полости рта",
-    "Acrylamide & Glycidamide - Special Sample": "Акриламид и глицидамид - Специальный образец",
-    "Heterocyclic Aromatic Amines - Special Sample": "Гетероциклические ароматические амины - Специальный образец",
-    "Aromatic Amines - Urine - Special Sample": "Ароматические амины - Моча - Специальный образец",
-    "Aldehydes - Serum - Special Sample": "Альдегиды - Сыворотка крови - Специальный образец",
-    "Aromatic Amines - Urine": "Ароматические амины - Моча",
-    "Aldehydes - Serum": "Альдегиды - Сыворотка крови",
-
-    # НОВЫЕ ДОБАВЛЕННЫЕ ТЕРМИНЫ
-    "Fluoride": "Фторид",
-    "Fluorosis": "Флюороз",
-    "Clinical": "Клинический",
-    "Folate": "Фолат",
-    "RBC": "Эритроциты",
-    "Folate Forms - Total & Individual - Serum": "Формы фолата - Общие и индивидуальные - Сыворотка крови",
-    "Formaldehyde": "Формальдегид",
-    "Formaldehyde - Special Sample": "Формальдегид - Специальный образец",
-    "Food Security": "Пищевая безопасность",
-    "Glycohemoglobin": "Гликогемоглобин",
-    "Plasma Fasting Glucose": "Глюкоза плазмы натощак",
-    "Hepatitis B: core antibody, surface antigen, and Hepatitis D antibody": "Гепатит B: антитела к кору, поверхностный антиген и антитела к гепатиту D",
-    "Hepatitis B: Surface Antibody": "Гепатит B: Поверхностные антитела",
-    "Hepatitis C: RNA (HCV-RNA) and Hepatitis C Genotype": "Гепатит C: РНК (HCV-RНК) и генотип гепатита C",
-    "Hepatitis E: IgG & IgM Antibodies": "Гепатит E: Антитела IgG и IgM",
-    "Hepatitis": "Гепатит",
-    "Health Insurance": "Медицинская страховка",
-    "HIV Antibody Test": "Тест на антитела к ВИЧ",
-    "Herpes Simplex Virus Type-1 & Type-2": "Вирус простого герпеса тип 1 и тип 2",
-    "Lead, Cadmium, Total Mercury, Selenium, and Manganese - Blood": "Свинец, кадмий, общая ртуть, селен и марганец - Кровь",
-    "Non-dioxin-like Polychlorinated Biphenyls & Mono-ortho-substituted Polychlorinated Biphenyls - Serum - Pooled Samples": "Полихлорированные бифенилы без диоксиноподобного действия и моно-орто-замещенные полихлорированные бифенилы - Сыворотка крови - Объединенные образцы",
-    "Perchlorate, Nitrate & Thiocyanate - Urine - Special Sample": "Перхлорат, нитрат и тиоцианат - Моча - Специальный образец",
-    "Perchlorate, Nitrate & Thiocyanate - Urine": "Перхлорат, нитрат и тиоцианат - Моча",
-    "Perfluoroalkyl and Polyfluoroalkyl Substances (formerly Polyfluoroalkyl Chemicals - PFC)": "Перфторалкильные и полифторалкильные вещества (ранее полифторалкильные химикаты - ПФХ)",
-    "Phthalates and Plasticizers Metabolites - Urine": "Метаболиты фталатов и пластификаторов - Моча",
-    "Pesticides - Organochlorine Pesticides - Pooled Samples": "Пестициды - Органхлорные пестициды - Объединенные образцы",
-    "Chlamydia Pgp3 (plasmid gene product 3) ELISA (enzyme linked immunosorbent assay) and multiplex bead array (MBA) results": "Хламидия Pgp3 (продукт плазмидного гена 3) ИФА (иммуноферментный анализ) и результаты мультиплексного бисерного массива (МБА)",
-    "Flame Retardant Metabolites - Urine (Surplus)": "Метаболиты антипиренов - Моча (избыток)",
-    "Glyphosate (GLYP) - Urine": "Глифосат (ГЛИФ) - Моча",
-    "Hepatitis C: Confirmed Antibody (INNO-LIA)": "Гепатит C: Подтвержденные антитела (ИННО-ЛИА)",
-    "Klotho - Serum (Surplus)": "Клото - Сыворотка крови (избыток)",
-    "Perfluoroalkyl and Polyfluoroalkyl Substances in US children 3-11 Years of Age": "Перфторалкильные и полифторалкильные вещества у детей США 3-11 лет",
-    "Perfluoroalkyl and Polyfluoroalkyl Substances - Linear and Branched PFOS and PFOA Isomers (Surplus)": "Перфторалкильные и полифторалкильные вещества - Линейные и разветвленные изомеры ПФОС и ПФОА (избыток)",
-    "Perfluoroalkyl and Polyfluoroalkyl Substances": "Перфторалкильные и полифторалкильные вещества",
-    "Phthalates and Plasticizers Metabolites - Urine (Surplus)": "Метаболиты фталатов и пластификаторов - Моча (избыток)",
-    "Serum Neurofilament Light Chain - Serum": "Легкая цепь нейрофиламентов - Сыворотка крови",
-    "Terpenes – Serum (Surplus)": "Терпены - Сыворотка крови (избыток)",
-    "Antibody to Toxocara spp. (Surplus)": "Антитела к Toxocara spp. (избыток)",
-    "Toxoplasma gondii Antibody - Serum (Surplus)": "Антитела к Toxoplasma gondii - Сыворотка крови (избыток)",
-    "Tissue Transglutaminase Assay (IgA-TTG) & IgA Endomyseal Antibody Assay (IgA EMA)": "Анализ тканевой трансглутаминазы (IgA-ТТГ) и анализ антител к эндомизию IgA (IgA EMA)",
-    "Trichomonas - Urine": "Трихомонада - Моча",
-    "Cholesterol - LDL & Triglycerides": "Холестерин - ЛПНП и триглицериды",
-    "LDL": "ЛПНП",
-    "Triglycerides": "Триглицериды",
-    "Sex Steroid Hormone - Serum": "Гормон половых стероидов - Сыворотка крови",
-    "Arsenics - Speciated - Urine - Special Sample": "Мышьяки - Специфицированные - Моча - Специальный образец",
-    "Arsenics - Speciated - Urine": "Мышьяки - Специфицированные - Моча",
-    "Urine Flow Rate": "Скорость потока мочи",
-    "Other Nicotine Metabolites and Analogs": "Другие метаболиты и аналоги никотина",
-    "Volatile Organic Compound (VOC) Metabolites": "Метаболиты летучих органических соединений (ЛОС)",
-    "Volatile N-Nitrosamine Compounds": "Летучие N-нитрозаминовые соединения",
-    "Trihalomethanes/MTBE": "Тригалогенметаны/МТБЭ",
-    "Weight History - Youth": "История веса - Молодежь",
-    "Albumin & Creatinine": "Альбумин и креатинин",
-    "Arthritis Body Measures": "Измерения тела при артрите",
-    "Wideband Reflectance": "Широкополосное отражение",
-    "Pesticides - Carbamates & Organophosphorus Metabolites": "Пестициды - Карбаматы и метаболиты органофосфорных соединений",
-    "Chlamydia & Gonorrhea": "Хламидиоз и гонорея",
-    "Pesticides - Carbamates": "Пестициды - Карбаматы",
-    "Consumer Behavior Phone Follow-up Module - Adult": "Модуль телефонного последующего наблюдения за потребительским поведением - Взрослые",
-    "Consumer Behavior Phone Follow-up Module - Child": "Модуль телефонного последующего наблюдения за потребительским поведением - Дети",
-    "Blood Pressure - Oscillometric Measurements": "Кровяное давление - Осциллометрические измерения",
-    "Complete Blood Count with 5-part Differential in Whole Blood": "Общий анализ крови с 5-компонентным дифференциалом в цельной крови",
-    "Complete Blood Count with 5-Part Differential - Whole Blood": "Общий анализ крови с 5-компонентным дифференциалом - Цельная кровь",
-    "Environmental Health": "Здоровье окружающей среды",
-    "Hepatitis A": "Гепатит A",
-    "Hepatitis B: Surface Tests": "Гепатит B: Тесты поверхности",
-    "Hepatitis C and Antigen": "Гепатит C и антиген",
-    "Health Index": "Индекс здоровья",
-    "Medical History": "История болезни",
-    "Heterocyclic Aromatic Amines": "Гетероциклические ароматические амины",
-    "Hexachlorobenzene": "Гексахлорбензол",
-    "Heart Health": "Здоровье сердца",
-    "Hematocrit": "Гематокрит",
-    "Gamma-Hydroxybutyrate": "Гамма-гидроксибутират",
-    "Glucose": "Глюкоза",
-    "Glycated Hemoglobin": "Гликогемоглобин",
-    "Folic Acid - Erythrocytes": "Фолиевая кислота - Эритроциты",
-    "Folic Acid - Serum": "Фолиевая кислота - Сыворотка крови",
-    "Folic Acid - Special Sample": "Фолиевая кислота - Специальный образец",
-    "Fluorides - Plasma": "Фториды - Плазма",
-    "Water": "Вода",
-    "Polycyclic Aromatic Hydrocarbons (PAH) - Urine": "Полциклические ароматические углеводороды (ПАУ) - Моча",
-    "Physical Activity Monitor - Day": "Монитор физической активности - День",
-    "Physical Activity Monitor - Header": "Монитор физической активности - Заголовок",
-    "Physical Activity Monitor - Hour": "Монитор физической активности - Час",
-    "OSQ_H": "Остеопороз",
-    "PAH_H": "Полциклические ароматические углеводороды (ПАУ) - Моча",
-    "PAQ_H": "Физическая активность",
-    "PAXDAY_H": "Монитор физической активности - День",
-    "PAXHD_H": "Монитор физической активности - Заголовок",
-    "PAXHR_H": "Монитор физической активности - Час",
-    "PBCD_H": "Свинец, кадмий, общая ртуть, селен и марганец - Кровь",
-    "PCBPOL_H": "Полихлорированные бифенилы без диоксиноподобного действия и моно-орто-замещенные полихлорированные бифенилы - Сыворотка крови - Объединенные образцы",
-    "PERNTS_H": "Перхлорат, нитрат и тиоцианат - Моча - Специальный образец",
-    "PERNT_H": "Перхлорат, нитрат и тиоцианат - Моча",
-    "PFAS_H": "Перфторалкильные и полифторалкильные вещества (ранее полифторалкильные химикаты - ПФХ)",
-    "PFQ_H": "Физическое функционирование",
-    "PHTHTE_H": "Метаболиты фталатов и пластификаторов - Моча",
-    "POOLTF_H": "Файл технической поддержки объединенных образцов",
-    "PSTPOL_H": "Пестициды - Органхлорные пестициды - Объединенные образцы",
-    "PUQMEC_H": "Использование пестицидов",
-    "RHQ_H": "Репродуктивное здоровье",
-    "RXQASA_H": "Профилактическое использование аспирина",
-    "RXQ_RX_H": "Рецептурные лекарства",
-    "SLQ_H": "Расстройства сна",
-    "SSCT_H": "Хламидия Pgp3 (продукт плазмидного гена 3) ИФА (иммуноферментный анализ) и результаты мультиплексного бисерного массива (МБА)",
-    "SSFLRT_H": "Метаболиты антипиренов - Моча (избыток)",
-    "SSGLYP_H": "Глифосат (ГЛИФ) - Моча",
-    "SSHEPC_H": "Гепатит C: Подтвержденные антитела (ИННО-ЛИА)",
-    "SSKL_H": "Клото - Сыворотка крови (избыток)",
-    "SSPFAC_H": "Перфторалкильные и полифторалкильные вещества у детей США 3-11 лет",
-    "SSPFAS_H": "Перфторалкильные и полифторалкильные вещества - Линейные и разветвленные изомеры ПФОС и ПФОА (избыток)",
-    "SSPFSU_H": "Перфторалкильные и полифторалкильные вещества",
-    "SSPHTE_H": "Метаболиты фталатов и пластификаторов - Моча (избыток)",
-    "SSSNFL_H": "Легкая цепь нейрофиламентов - Сыворотка крови",
-    "SSTERP_H": "Терпены - Сыворотка крови (избыток)",
-    "SSTOCA_H": "Антитела к Toxocara spp. (избыток)",
-    "SSTOXO_H": "Антитела к Toxoplasma gondii - Сыворотка крови (избыток)",
-    "SXQ_H": "Сексуальное поведение",
-    "TGEMA_H": "Анализ тканевой трансглутаминазы (IgA-ТТГ) и анализ антител к эндомизию IgA (IgA EMA)",
-    "TRICH_H": "Трихомонада - Моча",
-    "TRIGLY_H": "Холестерин - ЛПНП и триглицериды",
-    "TSNA_H": "Табакоспецифические нитрозамины (ТСНА) - Моча",
-    "TST_H": "Гормон половых стероидов - Сыворотка крови",
-    "UASS_H": "Мышьяки - Специфицированные - Моча - Специальный образец",
-    "UAS_H": "Мышьяки - Специфицированные - Моча",
-    "UCFLOW_H": "Скорость потока мочи",
-    "FLDEW_H": "Фториды - Вода",
-    "FLXCLN_H": "Флюороз - Клинический",
-    "FOLATE_H": "Фолат - Эритроциты",
-    "FOLFMS_H": "Формы фолата - Общие и индивидуальные - Сыворотка крови",
-    "FORMAL_H": "Формальдегид",
-    "FORMAS_H": "Формальдегид - Специальный образец",
-    "FSQ_H": "Пищевая безопасность",
-    "GHB_H": "Гликогемоглобин",
-    "GLU_H": "Глюкоза плазмы натощак",
-    "HCAAS_H": "Гетероциклические ароматические амины - Специальный образец",
-    "HCAA_H": "Гетероциклические ароматические амины",
-    "HCB_H": "Гексахлорбензол",
-    "HCQ_H": "Здоровье сердца",
-    "HCT_H": "Гематокрит",
-    "HDQ_H": "История болезни",
-    "HEQ_H": "Здоровье окружающей среды",
-    "HEPA_H": "Гепатит A",
-    "HEPBD_H": "Гепатит B: антитела к кору, поверхностный антиген и антитела к гепатиту D",
-    "HEPB_S_H": "Гепатит B: Поверхностные антитела",
-    "HEPC_H": "Гепатит C: РНК (HCV-RНК) и генотип гепатита C",
-    "HEPE_H": "Гепатит E: Антитела IgG и IgM",
-    "HEQ_H": "Гепатит",
-    "HIQ_H": "Медицинская страховка",
-    "HIV_H": "ВИЧ",
-    "HOQ_H": "Характеристики жилья",
-    "HPVP_H": "Вирус папилломы человека (ВПЧ) ДНК - Результаты из образцов мазков с полового члена: Roche Linear Array",
-    "HPVSWR_H": "Вирус папилломы человека (ВПЧ) ДНК - Вагинальный мазок: Roche Cobas и Roche Linear Array",
-    "HSV_H": "Вирус простого герпеса тип 1 и тип 2",
-    "HUQ_H": "Использование больничных услуг и доступ к медицинской помощи",
-    "IHGEM_H": "Ртуть: Неорганическая, этильная и метильная - Кровь",
-    "IMQ_H": "Иммунизация",
-    "INQ_H": "Доход",
-    "INS_H": "Инсулин",
-    "KIQ_U_H": "Заболевания почек - Урология",
-    "MCQ_H": "Медицинские состояния",
-    "MGX_H": "Сила мышц - Тест на силу хвата",
-    "MMA_H": "Метилмалоновая кислота",
-    "OCQ_H": "Профессия",
-    "OGTT_H": "Пероральный тест толерантности к глюкозе",
-    "OHQ_H": "Стоматологическое здоровье",
-    "OHXDEN_H": "Стоматологическое здоровье - Зубная система",
-    "OHXPER_H": "Стоматологическое здоровье - Пародонтальный",
-    "OHXREF_H": "Стоматологическое здоровье - Рекомендация по уходу",
-    "ORHPV_H": "Вирус папилломы человека (ВПЧ) - Полоскание полости рта",
-    "Plasma": "Плазма",
-}
 
 def translate_description(desc):
     """Переводит описание на русский язык"""
-    # Убираем код в скобках в конце
-    desc_clean = re.sub(r'\s*\([^)]+\)$', '', desc)
+    return get_translator().translate(clean_description(desc))[0]
+
 
-    # Пытаемся найти точный перевод
+def translate_by_parts(desc):
+    """Прежний перевод: точное совпадение или целые части между ' - ' (для сравнения)"""
+    translations = load_translations()
+    desc_clean = clean_description(desc)
     if desc_clean in translations:
         return translations[desc_clean]
+    return ' - '.join(translations.get(part, part) for part in desc_clean.split(' - '))
+
+
+def iter_descriptions(data):
+    for period in data:
+        for category in data[period]:
+            for item in data[period][category]:
+                yield item['desc']
+
+
+def benchmark(descriptions, repeat=5):
+    """Время перевода всего каталога: по частям, по фразам без кэша и с кэшем"""
 
-    # Если точного перевода нет, пытаемся перевести по частям
-    translated_parts = []
-    for part in desc_clean.split(' - '):
-        if part in translations:
-            translated_parts.append(translations[part])
+    def measure(translate):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for desc in descriptions:
+                translate(desc)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    print(f"=== Перевод {len(descriptions)} описаний (лучшее из {repeat}) ===")
+    print(f"По частям ' - ':      {measure(translate_by_parts) * 1000:.1f} мс")
+    started = time.perf_counter()
+    translator = PhraseTranslator(load_translations())
+    print(f"Построение дерева:    {(time.perf_counter() - started) * 1000:.1f} мс")
+
+    def cold(desc):
+        translator._cache.clear()
+        translator.translate(clean_description(desc))
+
+    print(f"По фразам, без кэша:  {measure(cold) * 1000:.1f} мс")
+    translator = get_translator()
+    print(f"По фразам, с кэшем:   {measure(translate_description) * 1000:.1f} мс")
+
+
+def coverage_report(descriptions, top=30):
+    """Сколько описаний переведено полностью и какие фрагменты чаще всего остаются на английском"""
+    translator = get_translator()
+    spans = Counter()
+    full = partial = none = improved = 0
+    for desc in set(descriptions):
+        translated, untranslated, _ = translator.translate(clean_description(desc))
+        spans.update(untranslated)
+        if translated != translate_by_parts(desc):
+            improved += 1
+        if not untranslated:
+            full += 1
+        elif translated != clean_description(desc):
+            partial += 1
         else:
-            # Если перевода нет, оставляем как есть
-            translated_parts.append(part)
+            none += 1
+    total = full + partial + none
+    print(f"=== Покрытие перевода: {total} уникальных описаний ===")
+    print(f"Полностью:  {full} ({full / total:.0%})")
+    print(f"Частично:   {partial} ({partial / total:.0%})")
+    print(f"Без перевода: {none} ({none / total:.0%})")
+    print(f"Лучше перевода по частям: {improved}")
+    print(f"\nНепереведенные фрагменты ({len(spans)} разных), самые частые:")
+    for span, count in spans.most_common(top):
+        print(f"  {count:>4}  {span}")
 
-    return ' - '.join(translated_parts)
+def _phrase_key(text):
+    """Слова текста через пробел с пробелами по краям - для поиска фразы как подстроки"""
+    return ' ' + ' '.join(_TOKEN.findall(text.lower())) + ' '
+
+
+def add_russian_translations(input_json=INPUT_JSON, output_json=OUTPUT_JSON, manifest_path=BUILD_MANIFEST,
+                             full=False):
+    """Добавляет русские переводы к JSON файлу.
+
+    Память переводов в манифесте хранит для хэша каждого описания перевод и
+    фразы словаря, которые в нем использованы. Заново переводятся только
+    новые описания и те, которых касается правка словаря: использованная
+    фраза изменена или удалена, либо в описании встречается новая фраза.
+    """
+    translations = load_translations()
+    manifest = BuildManifest(manifest_path)
+    dictionary = fingerprint([TRANSLATOR_VERSION, translations])
+    inputs = {'input': sha256_path(input_json), 'dictionary': dictionary}
+    if not full and manifest.up_to_date('translations', inputs, output_json):
+        print(f"{output_json} актуален")
+        return
 
-def add_russian_translations():
-    """Добавляет русские переводы к JSON файлу"""
     # Читаем исходный файл
-    with open('nhanes_grouped.json', 'r', encoding='utf-8') as f:
+    with open(input_json, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
+    stage = manifest.stage('translations')
+    if full or stage.get('version') != TRANSLATOR_VERSION:
+        memory, previous = {}, {}
+    else:
+        memory, previous = stage['items'], stage.get('terms', {})
+    changed = {phrase for phrase, translation in previous.items() if translations.get(phrase) != translation}
+    added = [_phrase_key(phrase) for phrase in translations if phrase not in previous]
+    new_memory = {}
+    translated = invalidated = 0
+
     # Проходим по всем периодам и категориям
     for period in data:
         for category in data[period]:
             for item in data[period][category]:
                 # Добавляем русский перевод
-                item['ru'] = translate_description(item['desc'])
+                desc = item['desc']
+                key = sha256_bytes(desc.encode('utf-8'))[:16]
+                entry = new_memory.get(key) or memory.get(key)
+                if entry and (changed.intersection(entry['terms'])
+                              or (added and any(phrase in _phrase_key(desc) for phrase in added))):
+                    entry = None
+                    invalidated += 1
+                if entry is None:
+                    ru, _, terms = get_translator().translate(clean_description(desc))
+                    entry = {'ru': ru, 'terms': terms}
+                    translated += 1
+                new_memory[key] = entry
+                item['ru'] = entry['ru']
 
     # Сохраняем обновленный файл
-    with open('nhanes_grouped_with_ru.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    write_json_if_changed(output_json, data)
+    stage['items'] = new_memory
+    stage['terms'] = dict(translations)
+    stage['version'] = TRANSLATOR_VERSION
+    manifest.mark_built('translations', inputs, output_json)
+    manifest.save()
+
+    print(f"Русские переводы добавлены в файл {output_json} "
+          f"(переведено заново: {translated}, из них из-за правки словаря: {invalidated})")
 
-    print("Русские переводы добавлены в файл nhanes_grouped_with_ru.json")
 
 if __name__ == "__main__":
-    add_russian_translations()
+    parser = argparse.ArgumentParser(description="Добавление русских переводов к сгруппированному JSON")
+    parser.add_argument('--input', default=INPUT_JSON)
+    parser.add_argument('--output', default=OUTPUT_JSON)
+    parser.add_argument('--manifest', default=BUILD_MANIFEST, help="Манифест инкрементальной сборки")
+    parser.add_argument('--full', action='store_true', help="Перевести все заново")
+    parser.add_argument('--benchmark', action='store_true', help="Сравнить скорость перевода на каталоге")
+    parser.add_argument('--coverage', action='store_true', help="Отчет о непереведенных фрагментах")
+    args = parser.parse_args()
+    if args.benchmark or args.coverage:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            descriptions = list(iter_descriptions(json.load(f)))
+        if args.benchmark:
+            benchmark(descriptions)
+        if args.coverage:
+            coverage_report(descriptions)
+    else:
+        add_russian_translations(args.input, args.output, args.manifest, args.full)
@@ -0,0 +1,177 @@
+import argparse
+import hashlib
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Настройки
+STORE_DIR = 'downloads/store'
+NHANES_DATA_DIR = 'nhanes_data'
+VIEW_DIRS = ['downloads/xpt_files', 'downloads/htm_files', NHANES_DATA_DIR]
+HASH_BLOCK = 1024 * 1024
+
+# Раскладка NHANESDataManager: суффикс цикла -> папка цикла, префикс файла -> категория
+MANAGER_CYCLES = {
+    '': '1999-2000', 'B': '2001-2002', 'C': '2003-2004', 'D': '2005-2006', 'E': '2007-2008',
+    'F': '2009-2010', 'G': '2011-2012', 'H': '2013-2014', 'I': '2015-2016', 'J': '2017-2018',
+    'P': '2017-2020', 'L': '2021-2023',
+}
+MANAGER_CATEGORIES = {
+    'DEMO': 'demo',
+    'DR1TOT': 'diet', 'DR2TOT': 'diet', 'DR1IFF': 'diet', 'DR2IFF': 'diet', 'DRXFCD': 'diet', 'DBQ': 'diet',
+    'BMX': 'exam', 'BPX': 'exam', 'BPQ': 'exam', 'AUQ': 'exam', 'AUX': 'exam', 'CVX': 'exam',
+    'CBC': 'lab', 'HDL': 'lab', 'TRIGLY': 'lab', 'TCHOL': 'lab', 'ALB_CR': 'lab', 'CRP': 'lab',
+    'HSQ': 'q', 'DIQ': 'q', 'ALQ': 'q', 'SMQ': 'q', 'ACQ': 'q', 'CDQ': 'q',
+}
+
+
+def sha256_file(path):
+    """sha256 файла, читаемого блоками"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def manager_view_path(filename, data_dir=NHANES_DATA_DIR):
+    """Путь файла в раскладке NHANESDataManager (nhanes_data/<цикл>/<категория>/...)
+
+    DEMO_J.xpt -> nhanes_data/2017-2018/demo/DEMO_2017_2018.xpt. Возвращает
+    None для файлов, которых менеджер не знает.
+    """
+    stem, ext = os.path.splitext(filename)
+    if ext.lower() != '.xpt':
+        return None
+    stem = stem.upper()
+    if stem.startswith('P_'):
+        prefix, suffix = stem[2:], 'P'
+    else:
+        match = re.match(r'^(.+?)(?:_([A-Z]))?$', stem)
+        prefix, suffix = match.group(1), match.group(2) or ''
+    category = MANAGER_CATEGORIES.get(prefix)
+    cycle = MANAGER_CYCLES.get(suffix)
+    if category is None or cycle is None:
+        return None
+    return Path(data_dir) / cycle / category / f"{prefix}_{cycle.replace('-', '_')}.xpt"
+
+
+class BlobStore:
+    """Контентно-адресуемое хранилище: один экземпляр байтов на sha256.
+
+    Файлы лежат в <root>/objects/<aa>/<sha256>, а привычные пути
+    (downloads/xpt_files/<имя>, nhanes_data/<цикл>/<категория>/<имя>)
+    являются жесткими ссылками на них, либо символическими, если жесткую
+    создать нельзя (другая файловая система).
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+        self.objects = self.root / 'objects'
+
+    def blob_path(self, sha256):
+        return self.objects / sha256[:2] / sha256
+
+    def ingest(self, src_path, sha256=None):
+        """Перемещает файл в хранилище и возвращает sha256.
+
+        Хэш обычно уже посчитан при потоковой загрузке; если нет, считается
+        здесь. Если такие байты уже есть, исходный файл просто удаляется.
+        """
+        sha256 = sha256 or sha256_file(src_path)
+        blob = self.blob_path(sha256)
+        if blob.exists():
+            os.remove(src_path)
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(src_path, blob)
+            os.chmod(blob, 0o444)
+        return sha256
+
+    def link_view(self, sha256, view_path):
+        """Атомарно делает view_path ссылкой на блоб"""
+        blob = self.blob_path(sha256)
+        view_path = Path(view_path)
+        view_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = view_path.with_name(view_path.name + '.link')
+        if tmp_path.exists() or tmp_path.is_symlink():
+            tmp_path.unlink()
+        try:
+            os.link(blob, tmp_path)
+        except OSError:
+            os.symlink(os.path.abspath(blob), tmp_path)
+        os.replace(tmp_path, view_path)
+
+    def discard(self, sha256, view_path):
+        """Удаляет представление, а блоб - если на него больше нет жестких ссылок"""
+        view_path = Path(view_path)
+        if view_path.exists() or view_path.is_symlink():
+            view_path.unlink()
+        blob = self.blob_path(sha256)
+        if blob.exists() and blob.stat().st_nlink == 1:
+            blob.chmod(0o644)
+            blob.unlink()
+
+    def _blobs(self):
+        if not self.objects.exists():
+            return []
+        return [path for path in self.objects.glob('*/*') if path.is_file()]
+
+    def add_file(self, path):
+        """Переносит уже существующий файл в хранилище, оставляя на его месте ссылку"""
+        path = Path(path)
+        if path.is_symlink():
+            return None
+        sha256 = sha256_file(path)
+        blob = self.blob_path(sha256)
+        if blob.exists() and os.path.samefile(blob, path):
+            return None
+        tmp_path = path.with_name(path.name + '.ingest')
+        os.replace(path, tmp_path)
+        self.ingest(tmp_path, sha256)
+        self.link_view(sha256, path)
+        return sha256
+
+    def verify(self, workers=None):
+        """Параллельно перехэширует хранилище. Возвращает (проверено, [испорченные блобы])"""
+        blobs = self._blobs()
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            hashes = executor.map(sha256_file, blobs, chunksize=16)
+            corrupted = [str(blob) for blob, digest in zip(blobs, hashes) if digest != blob.name]
+        return len(blobs), corrupted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Контентно-адресуемое хранилище файлов NHANES")
+    parser.add_argument('--store', default=STORE_DIR, help="Папка хранилища")
+    commands = parser.add_subparsers(dest='command', required=True)
+    verify_parser = commands.add_parser('verify', help="Перехэшировать все блобы на всех ядрах")
+    verify_parser.add_argument('--workers', type=int, help="Число процессов (по умолчанию все ядра)")
+    import_parser = commands.add_parser('import', help="Перенести уже скачанные файлы в хранилище")
+    import_parser.add_argument('dirs', nargs='*', default=VIEW_DIRS, help="Папки для импорта")
+    args = parser.parse_args(argv)
+
+    store = BlobStore(args.store)
+
+    if args.command == 'verify':
+        total, corrupted = store.verify(args.workers)
+        print(f"Проверено блобов: {total}")
+        for path in corrupted:
+            print(f"✗ Хэш не совпадает: {path}")
+        print(f"Повреждено: {len(corrupted)}")
+        return 1 if corrupted else 0
+
+    imported = 0
+    for directory in args.dirs:
+        for path in sorted(Path(directory).rglob('*')):
+            if path.is_file() and path.suffix.lower() in ('.xpt', '.htm'):
+                if store.add_file(path):
+                    imported += 1
+    print(f"Импортировано файлов: {imported}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
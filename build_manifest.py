@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+
+# Манифест инкрементальной пересборки JSON каталогов
+BUILD_MANIFEST = 'downloads/build_manifest.json'
+HASH_BLOCK = 1 << 20
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_path(path):
+    """sha256 файла или None, если файла нет"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            # Блоками: XPT файлы бывают в сотни мегабайт
+            for block in iter(lambda: f.read(HASH_BLOCK), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def fingerprint(obj):
+    """Хэш JSON-сериализуемого значения (настроек, словарей) для инвалидации кэша"""
+    return sha256_bytes(json.dumps(obj, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+
+
+def file_state(path):
+    stat = os.stat(path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def write_json_if_changed(path, data):
+    """Пишет JSON (как json.dump с indent=2) только если содержимое изменилось.
+
+    Возвращает True, если файл перезаписан.
+    """
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    except FileNotFoundError:
+        pass
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return True
+
+
+class BuildManifest:
+    """Состояние стадий сборки: входы, кэш результатов по элементам и хэш выхода.
+
+    Каждая стадия (htm_info, grouped, translations) хранит свой раздел:
+    'inputs' - отпечатки входов последней сборки, 'output' - sha256 выходного
+    файла, 'items' - кэш результатов по отдельным элементам (файлам, кодам,
+    описаниям), чтобы пересчитывать только изменившиеся.
+    """
+
+    def __init__(self, path=BUILD_MANIFEST):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.stages = json.load(f).get('stages', {})
+        except FileNotFoundError:
+            self.stages = {}
+        except json.JSONDecodeError:
+            print(f"Манифест {path} поврежден, пересобираем все")
+            self.stages = {}
+
+    def stage(self, name):
+        return self.stages.setdefault(name, {'inputs': {}, 'output': None, 'items': {}})
+
+    def up_to_date(self, name, inputs, output_path):
+        """True, если входы не менялись, а выход на месте и не правился руками"""
+        stage = self.stage(name)
+        return stage['inputs'] == inputs and stage['output'] is not None \
+            and sha256_path(output_path) == stage['output']
+
+    def mark_built(self, name, inputs, output_path):
+        stage = self.stage(name)
+        stage['inputs'] = inputs
+        stage['output'] = sha256_path(output_path)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'stages': self.stages}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import time
+
+from add_russian_translations import TRANSLATOR_VERSION, load_translations, translate_description
+from build_manifest import BuildManifest, BUILD_MANIFEST, fingerprint, sha256_path, write_json_if_changed
+from catalog_db import CatalogDB
+from nhanes_codes import CYCLES, COMPONENTS, PREFIX_TABLE, classify
+
+INPUT_JSON = 'htm_info.json'
+OUT_DIR = '.'
+# Представление -> (файл, ключ первого уровня, ключ второго уровня)
+VIEWS = {
+    'by_cycle': ('nhanes_by_cycle.json', 'years', 'component'),
+    'by_component': ('nhanes_by_component.json', 'component', 'years'),
+    'by_category': ('nhanes_by_category.json', 'category', 'years'),
+}
+
+# Порядок ключей в выходных файлах: циклы по времени, компоненты как на сайте
+_ORDER = {
+    'years': {years: i for i, years in enumerate(CYCLES.values())},
+    'component': {component: i for i, component in enumerate(COMPONENTS)},
+}
+
+
+def _sort_key(field):
+    order = _ORDER.get(field, {})
+    return lambda key: (order.get(key, len(order)), key)
+
+
+def build_views(data):
+    """Один проход по {код: описание}: классификация, перевод и раскладка по всем представлениям.
+
+    Возвращает ({имя представления: {ключ: {ключ: [записи]}}}, [записи]).
+    Запись - {code, desc, ru, prefix, cycle, years, component, category}.
+    """
+    views = {name: {} for name in VIEWS}
+    items = []
+    ru_cache = {}
+    for code in sorted(data):
+        desc = data[code]
+        if desc not in ru_cache:
+            ru_cache[desc] = translate_description(desc)
+        item = {'code': code, 'desc': desc, 'ru': ru_cache[desc], **classify(code)}
+        items.append(item)
+        for name, (_, outer, inner) in VIEWS.items():
+            views[name].setdefault(item[outer], {}).setdefault(item[inner], []).append(item)
+
+    # Упорядочиваем ключи; записи уже идут по коду
+    for name, (_, outer, inner) in VIEWS.items():
+        view = views[name]
+        views[name] = {
+            key: {sub: view[key][sub] for sub in sorted(view[key], key=_sort_key(inner))}
+            for key in sorted(view, key=_sort_key(outer))
+        }
+    return views, items
+
+
+def write_db(db_path, items):
+    """Компонент, категория, заголовок и перевод каждого набора -> CatalogDB"""
+    with CatalogDB(db_path) as db:
+        with db.lock, db.conn:
+            db.conn.executemany('INSERT OR IGNORE INTO components(name) VALUES (?)',
+                                [(component,) for component in COMPONENTS])
+        for item in items:
+            db.upsert_dataset(item['code'], component=item['component'], category=item['category'],
+                              title=item['desc'], title_ru=item['ru'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Каталог наборов NHANES по циклам, компонентам и категориям с переводом")
+    parser.add_argument('--input', default=INPUT_JSON, help="JSON с заголовками (get_htm_info.py)")
+    parser.add_argument('--out-dir', default=OUT_DIR, help="Папка для JSON представлений")
+    parser.add_argument('--db', help="Записать классификацию и переводы в базу каталога SQLite")
+    parser.add_argument('--manifest', default=BUILD_MANIFEST, help="Манифест инкрементальной сборки")
+    parser.add_argument('--full', action='store_true', help="Пересобрать без манифеста")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    outputs = {name: os.path.join(args.out_dir, filename) for name, (filename, _, _) in VIEWS.items()}
+    manifest = BuildManifest(args.manifest)
+    inputs = {'input': sha256_path(args.input),
+              'config': fingerprint([CYCLES, PREFIX_TABLE, TRANSLATOR_VERSION, load_translations()])}
+    if not args.full and not args.db and all(
+            manifest.up_to_date(f'views.{name}', inputs, path) for name, path in outputs.items()):
+        print(f"Представления каталога актуальны ({(time.perf_counter() - started) * 1000:.0f} мс)")
+        return 0
+
+    with open(args.input, encoding='utf-8') as f:
+        data = json.load(f)
+    views, items = build_views(data)
+    built = time.perf_counter() - started
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for name, path in outputs.items():
+        changed = write_json_if_changed(path, views[name])
+        manifest.mark_built(f'views.{name}', inputs, path)
+        print(f"{'✓' if changed else '='} {path}: {len(views[name])} групп")
+    manifest.save()
+
+    if args.db:
+        write_db(args.db, items)
+        print(f"Классификация записана в {args.db}")
+
+    print("\n=== Наборы по компонентам ===")
+    for component, by_years in views['by_component'].items():
+        print(f"  {component}: {sum(len(group) for group in by_years.values())}")
+    print(f"Всего кодов: {len(items)}, разбор и перевод за один проход: {built * 1000:.0f} мс")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from nhanes_codes import CYCLES, split_code
+
+# Файл каталога по умолчанию
+CATALOG_DB = 'nhanes_catalog.db'
+
+FILE_KINDS = ('xpt', 'htm', 'csv', 'txt')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cycles (
+    suffix TEXT PRIMARY KEY,
+    years TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS components (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    code TEXT PRIMARY KEY,
+    prefix TEXT NOT NULL,
+    cycle TEXT REFERENCES cycles(suffix),
+    years TEXT,
+    component TEXT REFERENCES components(name),
+    category TEXT,
+    title TEXT,
+    title_ru TEXT,
+    data_file_name TEXT,
+    date_published TEXT
+);
+CREATE INDEX IF NOT EXISTS datasets_cycle_component ON datasets(cycle, component);
+CREATE INDEX IF NOT EXISTS datasets_cycle_category ON datasets(cycle, category);
+CREATE INDEX IF NOT EXISTS datasets_prefix ON datasets(prefix);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    code TEXT NOT NULL REFERENCES datasets(code),
+    kind TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS urls_code_kind ON urls(code, kind);
+CREATE TABLE IF NOT EXISTS files (
+    code TEXT NOT NULL REFERENCES datasets(code),
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER,
+    sha256 TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    updated TEXT NOT NULL,
+    PRIMARY KEY (code, kind)
+);
+CREATE INDEX IF NOT EXISTS files_kind_status ON files(kind, status);
+CREATE TABLE IF NOT EXISTS variables (
+    code TEXT NOT NULL REFERENCES datasets(code),
+    variable TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT,
+    sas_label TEXT,
+    english_text TEXT,
+    english_instructions TEXT,
+    target TEXT,
+    PRIMARY KEY (code, variable)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS variables_variable ON variables(variable);
+CREATE TABLE IF NOT EXISTS variable_values (
+    code TEXT NOT NULL,
+    variable TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    value TEXT,
+    description TEXT,
+    count INTEGER,
+    cumulative INTEGER,
+    skip_to TEXT,
+    PRIMARY KEY (code, variable, position),
+    FOREIGN KEY (code, variable) REFERENCES variables(code, variable) ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS xpt_columns (
+    code TEXT NOT NULL REFERENCES datasets(code),
+    variable TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    label TEXT,
+    PRIMARY KEY (code, variable)
+) WITHOUT ROWID;
+"""
+
+DATASET_FIELDS = ('years', 'component', 'category', 'title', 'title_ru', 'data_file_name', 'date_published')
+
+
+def code_from_url(url):
+    return os.path.splitext(os.path.basename(urlparse(url).path))[0].upper()
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+class CatalogDB:
+    """Каталог наборов данных NHANES и журнал загрузок в одном файле SQLite.
+
+    Заменяет ручное объединение JSON файлов по коду набора: ссылки, заголовки
+    документации, категории, переводы и состояние локальных файлов (скачан,
+    сконвертирован, хэш) лежат в индексированных таблицах. Методы можно
+    вызывать из нескольких потоков загрузчика.
+    """
+
+    def __init__(self, path=CATALOG_DB):
+        self.path = path
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.executemany('INSERT OR IGNORE INTO cycles(suffix, years) VALUES (?, ?)', CYCLES.items())
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _ensure_dataset(self, code):
+        prefix, suffix = split_code(code)
+        self.conn.execute(
+            'INSERT OR IGNORE INTO datasets(code, prefix, cycle, years) VALUES (?, ?, ?, ?)',
+            (code, prefix, suffix if suffix in CYCLES else None, CYCLES.get(suffix)))
+
+    def upsert_dataset(self, code, **fields):
+        """Создает набор данных или обновляет переданные поля (None не затирает старое значение)"""
+        code = code.upper()
+        fields = {key: value for key, value in fields.items() if key in DATASET_FIELDS and value is not None}
+        with self.lock, self.conn:
+            self._ensure_dataset(code)
+            if fields.get('component'):
+                self.conn.execute('INSERT OR IGNORE INTO components(name) VALUES (?)', (fields['component'],))
+            if fields:
+                assignments = ', '.join(f'{key} = ?' for key in fields)
+                self.conn.execute(f'UPDATE datasets SET {assignments} WHERE code = ?', (*fields.values(), code))
+
+    def add_url(self, url, kind, code=None):
+        code = (code or code_from_url(url)).upper()
+        with self.lock, self.conn:
+            self._ensure_dataset(code)
+            self.conn.execute('INSERT INTO urls(url, code, kind) VALUES (?, ?, ?) '
+                              'ON CONFLICT(url) DO UPDATE SET code = excluded.code, kind = excluded.kind',
+                              (url, code, kind))
+
+    def record_file(self, code, kind, path, size=None, sha256=None, status='ok', error=None):
+        """Журнал: локальный файл набора данных (xpt, htm, csv, parquet, txt) и его состояние"""
+        code = code.upper()
+        with self.lock, self.conn:
+            self._ensure_dataset(code)
+            self.conn.execute(
+                'INSERT OR REPLACE INTO files(code, kind, path, size, sha256, status, error, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (code, kind, str(path), size, sha256, status, error, _now()))
+
+    def file(self, code, kind):
+        with self.lock:
+            return self.conn.execute('SELECT * FROM files WHERE code = ? AND kind = ?',
+                                     (code.upper(), kind)).fetchone()
+
+    def links(self, kind='xpt'):
+        """Ссылки заданного типа в порядке добавления"""
+        with self.lock:
+            return [row['url'] for row in self.conn.execute(
+                'SELECT url FROM urls WHERE kind = ? ORDER BY rowid', (kind,))]
+
+    def datasets(self, cycle=None, component=None, category=None, prefix=None, missing=None):
+        """Наборы данных по фильтрам.
+
+        missing='csv' оставляет только наборы без успешно записанного файла
+        этого типа, например все лабораторные наборы _J, еще не
+        сконвертированные в CSV: datasets(cycle='J', component='Laboratory', missing='csv').
+        """
+        conditions, params = [], []
+        for column, value in (('cycle', cycle), ('component', component),
+                              ('category', category), ('prefix', prefix)):
+            if value is not None:
+                conditions.append(f'd.{column} = ?')
+                params.append(value.upper() if column in ('cycle', 'prefix') else value)
+        if missing:
+            conditions.append("NOT EXISTS (SELECT 1 FROM files f "
+                              "WHERE f.code = d.code AND f.kind = ? AND f.status = 'ok')")
+            params.append(missing)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(
+                f'SELECT d.* FROM datasets d {where} ORDER BY d.code', params)]
+
+    def titles(self):
+        """Код -> заголовок документации (как htm_info.json)"""
+        with self.lock:
+            return {row['code']: row['title'] for row in self.conn.execute(
+                'SELECT code, title FROM datasets WHERE title IS NOT NULL ORDER BY code')}
+
+    def replace_codebook(self, code, variables):
+        """Заменяет кодовую книгу набора данных (см. codebook_index.parse_codebook)"""
+        code = code.upper()
+        with self.lock, self.conn:
+            self._ensure_dataset(code)
+            self.conn.execute('DELETE FROM variables WHERE code = ?', (code,))
+            seen = set()
+            for position, variable in enumerate(variables):
+                # Переменная может повторяться в документации; берем первое описание
+                if variable['variable'] in seen:
+                    continue
+                seen.add(variable['variable'])
+                self.conn.execute(
+                    'INSERT INTO variables(code, variable, position, title, sas_label, english_text, '
+                    'english_instructions, target) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (code, variable['variable'], position, variable.get('title'), variable.get('sas_label'),
+                     variable.get('english_text'), variable.get('english_instructions'), variable.get('target')))
+                self.conn.executemany(
+                    'INSERT INTO variable_values(code, variable, position, value, description, count, '
+                    'cumulative, skip_to) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(code, variable['variable'], i, value['value'], value['description'], value['count'],
+                      value['cumulative'], value['skip_to']) for i, value in enumerate(variable['values'])])
+
+    def replace_xpt_columns(self, code, names, labels=None):
+        """Заменяет столбцы и метки набора данных из метаданных XPT файла"""
+        code = code.upper()
+        labels = list(labels or [])
+        labels += [None] * (len(names) - len(labels))
+        with self.lock, self.conn:
+            self._ensure_dataset(code)
+            self.conn.execute('DELETE FROM xpt_columns WHERE code = ?', (code,))
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO xpt_columns(code, variable, position, label) VALUES (?, ?, ?, ?)',
+                [(code, name.upper(), position, label or None)
+                 for position, (name, label) in enumerate(zip(names, labels))])
+
+    def codebook(self, variable=None, code=None):
+        """Кодовые книги переменной (во всех наборах или в одном) или всех переменных набора"""
+        conditions, params = [], []
+        if variable:
+            conditions.append('variable = ?')
+            params.append(variable.upper())
+        if code:
+            conditions.append('code = ?')
+            params.append(code.upper())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        with self.lock:
+            rows = [dict(row) for row in self.conn.execute(
+                f'SELECT * FROM variables {where} ORDER BY code, position', params)]
+            for row in rows:
+                row['values'] = [dict(value) for value in self.conn.execute(
+                    'SELECT value, description, count, cumulative, skip_to FROM variable_values '
+                    'WHERE code = ? AND variable = ? ORDER BY position', (row['code'], row['variable']))]
+        return rows
+
+    def stats(self):
+        with self.lock:
+            datasets = self.conn.execute('SELECT COUNT(*) FROM datasets').fetchone()[0]
+            urls = dict(self.conn.execute('SELECT kind, COUNT(*) FROM urls GROUP BY kind').fetchall())
+            files = dict(self.conn.execute(
+                "SELECT kind, COUNT(*) FROM files WHERE status = 'ok' GROUP BY kind").fetchall())
+        return {'datasets': datasets, 'urls': urls, 'files': files}
+
+    def import_json(self, xpt_links=None, htm_links=None, catalog=None, htm_info=None, grouped=None):
+        """Переносит в базу существующие JSON файлы проекта (отсутствующие пропускаются)"""
+
+        def load(path):
+            if not path or not os.path.exists(path):
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        counts = {}
+        data = load(catalog)
+        if data:
+            for entry in data['files']:
+                self.upsert_dataset(**entry)
+                self.add_url(entry['xpt_url'], 'xpt', entry['code'])
+                if entry.get('doc_url'):
+                    self.add_url(entry['doc_url'], 'htm', entry['code'])
+            counts['catalog'] = len(data['files'])
+        for kind, path in (('xpt', xpt_links), ('htm', htm_links)):
+            data = load(path)
+            if data:
+                for url in data['links']:
+                    self.add_url(url, kind)
+                counts[kind] = len(data['links'])
+        data = load(htm_info)
+        if data:
+            for filename, title in data.items():
+                self.upsert_dataset(os.path.splitext(filename)[0], title=title)
+            counts['htm_info'] = len(data)
+        data = load(grouped)
+        if data:
+            count = 0
+            for cycle, categories in data.items():
+                for category, items in categories.items():
+                    for item in items:
+                        self.upsert_dataset(item['code'], category=category, title=item.get('desc'),
+                                            title_ru=item.get('ru'))
+                        count += 1
+            counts['grouped'] = count
+        return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Каталог NHANES и журнал загрузок в SQLite")
+    parser.add_argument('--db', default=CATALOG_DB, help="Файл базы SQLite")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="Загрузить в базу JSON файлы проекта")
+    import_parser.add_argument('--xpt-links', default='nhanes_xpt_links.json')
+    import_parser.add_argument('--htm-links', default='nhanes_htm_links.json')
+    import_parser.add_argument('--catalog', default='nhanes_catalog.json')
+    import_parser.add_argument('--htm-info', default='htm_info.json')
+    import_parser.add_argument('--grouped', default='nhanes_grouped_ru.json')
+
+    query_parser = commands.add_parser('query', help="Найти наборы данных")
+    query_parser.add_argument('--cycle', help="Суффикс цикла: J, P, '' для 1999-2000")
+    query_parser.add_argument('--component', help="Компонент: Laboratory, Dietary...")
+    query_parser.add_argument('--category', help="Категория из nhanes_grouped.json")
+    query_parser.add_argument('--prefix', help="Префикс кода: DEMO, BPX...")
+    query_parser.add_argument('--missing', choices=FILE_KINDS,
+                              help="Только наборы без локального файла этого типа")
+
+    commands.add_parser('stats', help="Сводка по базе")
+    args = parser.parse_args(argv)
+
+    with CatalogDB(args.db) as db:
+        if args.command == 'import':
+            counts = db.import_json(args.xpt_links, args.htm_links, args.catalog, args.htm_info, args.grouped)
+            for name, count in counts.items():
+                print(f"✓ {name}: {count}")
+        elif args.command == 'query':
+            rows = db.datasets(args.cycle, args.component, args.category, args.prefix, args.missing)
+            for row in rows:
+                print(f"{row['code']:<14} {row['years'] or '?':<10} {row['title'] or ''}")
+            print(f"Найдено: {len(rows)}")
+        else:
+            stats = db.stats()
+            print(f"Наборов данных: {stats['datasets']}")
+            print(f"Ссылок: {stats['urls']}")
+            print(f"Локальных файлов: {stats['files']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
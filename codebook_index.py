@@ -0,0 +1,213 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+
+from catalog_db import CatalogDB, CATALOG_DB
+
+# Настройки
+HTM_DIR = 'downloads/htm_files'
+WORKERS = os.cpu_count() or 1
+CHUNKSIZE = 8
+
+# Подписи <dt> в описании переменной -> поле записи
+DT_FIELDS = {
+    'variable name': 'variable',
+    'sas label': 'sas_label',
+    'english text': 'english_text',
+    'english instructions': 'english_instructions',
+    'target': 'target',
+}
+# Столбцы таблицы значений
+VALUE_COLUMNS = ['value', 'description', 'count', 'cumulative', 'skip_to']
+
+
+def _clean(text):
+    return ' '.join(text.split())
+
+
+def _to_int(text):
+    try:
+        return int(text.replace(',', ''))
+    except ValueError:
+        return None
+
+
+class CodebookParser(HTMLParser):
+    """Разбирает HTM документацию NHANES в записи о переменных.
+
+    Каждая переменная описана блоком: заголовок h3, список dl/dt/dd
+    (Variable Name, SAS Label, English Text, Target) и таблица значений
+    (Code or Value, Value Description, Count, Cumulative, Skip to Item).
+    Результат - self.variables (dict на переменную, значения в 'values').
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.variables = []
+        self.current = None
+        self.title = None
+        self._text = None        # Куда сейчас копится текст (список) или None
+        self._capture = None     # 'h3', 'dt', 'dd', 'td', 'th'
+        self._dt = None
+        self._row = None
+        self._header_row = False
+        self._in_header = 0      # Внутри div#PageHeader заголовки переменных не ищем
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'div':
+            if self._in_header:
+                self._in_header += 1
+            elif dict(attrs).get('id') == 'PageHeader':
+                self._in_header = 1
+        elif self._in_header:
+            return
+        elif tag in ('h3', 'dt', 'dd') and self._capture is None:
+            self._capture = tag
+            self._text = []
+        elif tag == 'tr':
+            self._row = []
+            self._header_row = False
+        elif tag in ('td', 'th') and self._row is not None:
+            self._finish_cell()
+            self._capture = tag
+            self._text = []
+            if tag == 'th':
+                self._header_row = True
+        elif tag == 'br' and self._text is not None:
+            self._text.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag == 'div' and self._in_header:
+            self._in_header -= 1
+            return
+        if tag == self._capture and tag in ('h3', 'dt', 'dd'):
+            text = _clean(''.join(self._text))
+            self._capture = None
+            self._text = None
+            if tag == 'h3':
+                self.title = text
+            elif tag == 'dt':
+                self._dt = DT_FIELDS.get(text.rstrip(':').strip().lower())
+            else:
+                self._handle_dd(text)
+        elif tag in ('td', 'th'):
+            self._finish_cell()
+        elif tag == 'tr' and self._row is not None:
+            self._finish_cell()
+            self._finish_row()
+
+    def handle_data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+    def _handle_dd(self, text):
+        field, self._dt = self._dt, None
+        if field == 'variable':
+            self.current = {'variable': text, 'title': self.title, 'sas_label': None,
+                            'english_text': None, 'english_instructions': None,
+                            'target': [], 'values': []}
+            self.variables.append(self.current)
+        elif field == 'target' and self.current is not None:
+            self.current['target'].append(text)
+        elif field and self.current is not None:
+            self.current[field] = text
+
+    def _finish_cell(self):
+        if self._capture in ('td', 'th') and self._row is not None:
+            self._row.append(_clean(''.join(self._text)))
+            self._capture = None
+            self._text = None
+
+    def _finish_row(self):
+        row, self._row = self._row, None
+        if self._header_row or self.current is None or not row:
+            return
+        row = (row + [''] * len(VALUE_COLUMNS))[:len(VALUE_COLUMNS)]
+        value = dict(zip(VALUE_COLUMNS, row))
+        value['count'] = _to_int(value['count'])
+        value['cumulative'] = _to_int(value['cumulative'])
+        self.current['values'].append(value)
+
+
+def parse_codebook(filepath):
+    """Возвращает (код набора, [переменные]) для одного HTM файла"""
+    code = os.path.splitext(os.path.basename(filepath))[0].upper()
+    parser = CodebookParser()
+    with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+        parser.feed(f.read())
+    parser.close()
+    for variable in parser.variables:
+        variable['target'] = '; '.join(variable['target']) or None
+    return code, parser.variables
+
+
+def build_index(filepaths, db, workers=WORKERS, chunksize=CHUNKSIZE, log=print):
+    """Разбирает файлы в пуле процессов и записывает кодовые книги в базу"""
+    variables = values = errors = 0
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = executor.map(_parse_safe, filepaths, chunksize=chunksize)
+        for filepath, (code, parsed, error) in zip(filepaths, results):
+            if error:
+                log(f"✗ {os.path.basename(filepath)}: {error}")
+                errors += 1
+                continue
+            db.replace_codebook(code, parsed)
+            variables += len(parsed)
+            values += sum(len(variable['values']) for variable in parsed)
+    return variables, values, errors
+
+
+def _parse_safe(filepath):
+    try:
+        code, variables = parse_codebook(filepath)
+        return code, variables, None
+    except Exception as e:
+        return None, None, str(e)
+
+
+def print_codebook(rows):
+    for variable in rows:
+        print(f"{variable['code']}.{variable['variable']}: {variable['sas_label'] or ''}")
+        if variable['target']:
+            print(f"  Целевая группа: {variable['target']}")
+        for value in variable['values']:
+            count = '' if value['count'] is None else value['count']
+            print(f"  {value['value']:>12}  {value['description']:<50} {count}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Индекс кодовых книг из HTM документации NHANES")
+    parser.add_argument('--db', default=CATALOG_DB, help="База каталога SQLite")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build', help="Разобрать HTM файлы и записать в базу")
+    build_parser.add_argument('--htm-dir', default=HTM_DIR, help="Папка с HTM файлами")
+    build_parser.add_argument('--workers', type=int, default=WORKERS, help="Процессов")
+    lookup_parser = commands.add_parser('lookup', help="Показать кодовую книгу переменной")
+    lookup_parser.add_argument('variable', help="Имя переменной, например RIAGENDR")
+    lookup_parser.add_argument('--code', help="Только в этом наборе данных")
+    args = parser.parse_args(argv)
+
+    with CatalogDB(args.db) as db:
+        if args.command == 'lookup':
+            started = time.perf_counter()
+            rows = db.codebook(args.variable, args.code)
+            elapsed = (time.perf_counter() - started) * 1000
+            print_codebook(rows)
+            print(f"Найдено: {len(rows)} за {elapsed:.1f} мс")
+            return 0 if rows else 1
+
+        filepaths = sorted(os.path.join(args.htm_dir, f) for f in os.listdir(args.htm_dir)
+                           if f.endswith('.htm'))
+        print(f"=== Индекс кодовых книг: {len(filepaths)} HTM файлов ===")
+        started = time.monotonic()
+        variables, values, errors = build_index(filepaths, db, args.workers)
+        print(f"Переменных: {variables}, строк значений: {values}, ошибок: {errors}")
+        print(f"Время: {time.monotonic() - started:.1f} с")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
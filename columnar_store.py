@@ -0,0 +1,191 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # без pyarrow остаются только CSV
+    pa = pq = None
+
+# Колоночная копия каждого CSV: csv/<код>.parquet рядом с csv/<код>.csv
+COLUMNAR_SUFFIX = '.parquet'
+COMPRESSION = 'zstd'
+COMPRESSION_LEVEL = 3
+# Ключи метаданных: метка SAS у поля, метка и имя набора у схемы
+LABEL_KEY = b'label'
+FILE_LABEL_KEY = b'sas.file_label'
+TABLE_NAME_KEY = b'sas.table_name'
+
+
+def available():
+    return pq is not None
+
+
+def columnar_path(csv_file):
+    """csv/<код>.csv -> csv/<код>.parquet"""
+    return Path(csv_file).with_suffix(COLUMNAR_SUFFIX)
+
+
+def blank_text_to_missing(df):
+    """Пустые строки текстовых столбцов -> пропуск.
+
+    Пустой текст SAS в CSV - пустое поле, и pd.read_csv читает его как
+    NaN; Parquet копия хранит там же пропуск, чтобы load_frame давал
+    одинаковый набор из обоих форматов.
+    """
+    for column in df.columns[[pd.api.types.is_string_dtype(dtype) for dtype in df.dtypes]]:
+        df[column] = df[column].mask(df[column] == '')
+    return df
+
+
+def _schema(df, meta):
+    """Схема Arrow по первому куску: метки SAS - в метаданных полей.
+
+    Столбцы, пустые в первом куске, получают тип string, чтобы следующие
+    куски с текстом в них записывались в ту же схему.
+    """
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    labels = dict(zip(meta.column_names, meta.column_labels)) if meta else {}
+    fields = []
+    for field in schema:
+        if pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        if labels.get(field.name):
+            field = field.with_metadata({LABEL_KEY: labels[field.name].encode('utf-8')})
+        fields.append(field)
+    metadata = dict(schema.metadata or {})
+    if meta and meta.file_label:
+        metadata[FILE_LABEL_KEY] = meta.file_label.encode('utf-8')
+    if meta and meta.table_name:
+        metadata[TABLE_NAME_KEY] = meta.table_name.encode('utf-8')
+    return pa.schema(fields, metadata=metadata)
+
+
+class ParquetChunkWriter:
+    """Запись набора в Parquet по кускам DataFrame (zstd, словарное кодирование).
+
+    Схема берется из первого куска и метаданных meta (форма meta pyreadstat),
+    так что потоковая конвертация пишет Parquet тем же проходом, что и CSV.
+    """
+
+    def __init__(self, path, meta=None):
+        if pq is None:
+            raise RuntimeError("pyarrow не установлен: запись Parquet недоступна")
+        self.path = Path(path)
+        self.meta = meta
+        self.writer = None
+
+    def write(self, chunk):
+        chunk = blank_text_to_missing(chunk.copy(deep=False))
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(str(self.path), _schema(chunk, self.meta), compression=COMPRESSION,
+                                           compression_level=COMPRESSION_LEVEL, use_dictionary=True)
+        self.writer.write_table(pa.Table.from_pandas(chunk, schema=self.writer.schema, preserve_index=False))
+
+    def close(self, column_names=()):
+        if self.writer is None:
+            # Ни одного куска: файл только со схемой, как CSV только с заголовком
+            self.write(pd.DataFrame({name: pd.Series(dtype=object) for name in column_names}))
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close(self.meta.column_names if self.meta else ())
+        elif self.writer is not None:
+            self.writer.close()
+
+
+def write_parquet(df, path, meta=None):
+    """DataFrame -> Parquet с метками столбцов SAS"""
+    with ParquetChunkWriter(path, meta) as writer:
+        writer.write(df)
+
+
+def read_frame(path, columns=None):
+    """Parquet -> DataFrame (можно только нужные столбцы)"""
+    return pd.read_parquet(path, columns=columns)
+
+
+def column_labels(path):
+    """{столбец: метка SAS} из метаданных полей Parquet"""
+    schema = pq.read_schema(str(path))
+    return {field.name: field.metadata[LABEL_KEY].decode('utf-8')
+            for field in schema if field.metadata and LABEL_KEY in field.metadata}
+
+
+def fresh_columnar(source_file):
+    """Путь к Parquet копии файла (CSV или XPT), если она есть и не старше него; иначе None"""
+    parquet_file = columnar_path(source_file)
+    if pq is None or not parquet_file.exists():
+        return None
+    source_file = Path(source_file)
+    if source_file.exists() and parquet_file.stat().st_mtime < source_file.stat().st_mtime:
+        return None
+    return parquet_file
+
+
+def load_frame(csv_file):
+    """Набор данных из CSV, а при наличии свежей Parquet копии - из нее"""
+    parquet_file = fresh_columnar(csv_file)
+    if parquet_file is not None:
+        return read_frame(parquet_file)
+    return pd.read_csv(csv_file)
+
+
+def benchmark(csv_dir, repeat=1):
+    """Размер на диске и время загрузки CSV и Parquet по всей папке"""
+    pairs = [(csv_file, columnar_path(csv_file)) for csv_file in sorted(Path(csv_dir).glob('*.csv'))
+             if columnar_path(csv_file).exists()]
+    print(f"{'Файл':<24} {'CSV, КБ':>10} {'Parquet, КБ':>12} {'CSV, мс':>9} {'Parquet, мс':>12}")
+    totals = [0, 0, 0.0, 0.0]
+    for csv_file, parquet_file in pairs:
+        timings = []
+        for load in (pd.read_csv, read_frame):
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                load(csv_file if load is pd.read_csv else parquet_file)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best)
+        sizes = [csv_file.stat().st_size, parquet_file.stat().st_size]
+        print(f"{csv_file.name:<24} {sizes[0] / 1024:>10,.0f} {sizes[1] / 1024:>12,.0f} "
+              f"{timings[0] * 1000:>9.1f} {timings[1] * 1000:>12.1f}")
+        for i, value in enumerate(sizes + timings):
+            totals[i] += value
+    skipped = len(list(Path(csv_dir).glob('*.csv'))) - len(pairs)
+    print(f"\nФайлов: {len(pairs)}" + (f" (еще {skipped} CSV без Parquet копии)" if skipped else ''))
+    if pairs:
+        print(f"Диск: CSV {totals[0] / 2 ** 20:,.1f} МБ, Parquet {totals[1] / 2 ** 20:,.1f} МБ "
+              f"({totals[0] / max(totals[1], 1):.1f}x меньше)")
+        print(f"Загрузка: CSV {totals[2]:.2f} с, Parquet {totals[3]:.2f} с "
+              f"({totals[2] / max(totals[3], 1e-9):.1f}x быстрее)")
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Колоночные Parquet копии CSV наборов NHANES")
+    parser.add_argument('--csv-dir', default='csv', help="Папка с .csv и .parquet")
+    parser.add_argument('--repeat', type=int, default=1, help="Повторов загрузки, берется лучшее время")
+    parser.add_argument('--labels', metavar='CODE', help="Показать метки столбцов из Parquet набора")
+    args = parser.parse_args(argv)
+    if pq is None:
+        print("pyarrow не установлен")
+        return 1
+    if args.labels:
+        for column, label in column_labels(Path(args.csv_dir) / f"{args.labels}{COLUMNAR_SUFFIX}").items():
+            print(f"{column:<12} {label}")
+        return 0
+    benchmark(args.csv_dir, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import json
+import os
+
+from build_manifest import file_state, sha256_path
+
+# Журнал конвертации лежит в папке с результатами: свой для каждой папки CSV
+JOURNAL_FILE = '.convert_journal.jsonl'
+
+
+class ConversionJournal:
+    """Журнал пакетной конвертации: XPT -> состояние источника и выходов.
+
+    Файл - JSON lines, запись дописывается и сбрасывается на диск сразу после
+    каждого сконвертированного файла, поэтому прерванный запуск теряет не
+    больше одной записи; последняя запись по файлу побеждает. Оборванная
+    последняя строка (процесс убит посреди записи) пропускается.
+
+    Запись действительна, пока совпадают ключ (версия конвертера и
+    настройки выхода), sha256 источника и размеры выходных файлов.
+    """
+
+    def __init__(self, directory, key):
+        self.path = os.path.join(directory, JOURNAL_FILE)
+        self.key = key
+        self.entries = {}
+        self._torn = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._torn = not line.endswith('\n')
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.entries[entry['file']] = entry
+        except FileNotFoundError:
+            pass
+        self._file = None
+
+    def check(self, source, outputs):
+        """(актуален ли, снимок источника {state, sha256} для record).
+
+        Сначала сравниваются размер и mtime источника; хэш считается только
+        если они изменились или записи нет, так что повторный запуск по
+        неизменному дереву обходится stat-проверками. Снимок берется до
+        конвертации: файл, измененный во время нее, при следующем запуске
+        не совпадет по хэшу и будет сконвертирован снова.
+        """
+        state = file_state(source)
+        entry = self.entries.get(os.path.basename(source))
+        if entry and entry['key'] == self.key and entry['state'] == state and self._outputs_match(entry, outputs):
+            return True, {'state': state, 'sha256': entry['sha256']}
+        snapshot = {'state': state, 'sha256': sha256_path(source)}
+        if not entry or entry['key'] != self.key or snapshot['sha256'] != entry['sha256'] \
+                or not self._outputs_match(entry, outputs):
+            return False, snapshot
+        # Тот же файл с новым mtime: запоминаем, чтобы в следующий раз хватило stat
+        self.record(source, outputs, snapshot)
+        return True, snapshot
+
+    @staticmethod
+    def _outputs_match(entry, outputs):
+        for path in outputs:
+            recorded = entry['outputs'].get(os.path.basename(path))
+            if recorded is None or not os.path.exists(path) or os.path.getsize(path) != recorded:
+                return False
+        return True
+
+    def record(self, source, outputs, snapshot):
+        """Запомнить успешную конвертацию source (снимок из check) в outputs, сразу на диск"""
+        entry = {
+            'file': os.path.basename(source),
+            'key': self.key,
+            'state': snapshot['state'],
+            'sha256': snapshot['sha256'],
+            'outputs': {os.path.basename(path): os.path.getsize(path) for path in outputs},
+        }
+        self.entries[entry['file']] = entry
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if self._torn:
+                # Оборванную строку закрываем, чтобы новая запись не склеилась с ней
+                self._file.write('\n')
+                self._torn = False
+        self._file.write(json.dumps(entry, ensure_ascii=False, sort_keys=True) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def compact(self):
+        """Переписать журнал атомарно: по одной последней записи на файл"""
+        self.close()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for name in sorted(self.entries):
+                f.write(json.dumps(self.entries[name], ensure_ascii=False, sort_keys=True) + '\n')
+        os.replace(tmp_path, self.path)
+        self._torn = False
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
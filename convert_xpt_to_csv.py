@@ -1,79 +1,505 @@
+import argparse
+import multiprocessing
 import os
+import sys
+import time
+from contextlib import nullcontext
+from multiprocessing.connection import wait
+from types import SimpleNamespace
+
 import pandas as pd
 import pyreadstat
 from pathlib import Path
 from sas7bdat import SAS7BDAT
 
-def convert_xpt_to_csv():
-    """Convert all .xpt files from downloads/xpt_files to .csv in csv folder"""
+import columnar_store
+import xport_reader
+from build_manifest import fingerprint
+from catalog_db import CATALOG_DB, CatalogDB
+from conversion_journal import ConversionJournal
+from xpt_dispatch import ReaderCache, plan_readers
+
+try:
+    import resource
+except ImportError:  # Windows: no address-space limit for workers
+    resource = None
+
+# Batch conversion defaults
+CONVERT_WORKERS = os.cpu_count() or 1
+FILE_TIMEOUT = 600
+MEMORY_MB = None
+# Rows per chunk in streaming mode; 0 reads each file whole
+CHUNK_ROWS = 100_000
+# Bump when the bytes of the output change, so the journal reconverts everything
+CONVERTER_VERSION = 3
+# XPT text columns are ASCII; latin-1 decodes any byte, so pandas gives str like pyreadstat
+TEXT_ENCODING = 'latin-1'
+# pandas decodes an IBM zero (all bytes 0) as 16**-65 instead of 0.0
+PANDAS_IBM_ZERO = 16.0 ** -65
+# Rows kept from the start of the file for a preview (see convert_file(preview=True))
+PREVIEW_ROWS = 5
+# Outputs are written under this suffix and renamed into place when complete
+PARTIAL_SUFFIX = '.part'
+# Also write csv/<code>.parquet (zstd, SAS labels as field metadata) when pyarrow is installed
+WRITE_PARQUET = columnar_store.available()
+
+
+def _pandas_meta(reader):
+    """Metadata in the shape of pyreadstat's meta, built from a pandas XportReader"""
+    def text(value):
+        return value.decode('latin-1').strip() if isinstance(value, bytes) else (value or '')
+
+    return SimpleNamespace(
+        column_names=[text(field['name']) for field in reader.fields],
+        column_labels=[text(field['label']) for field in reader.fields],
+        file_label=text(reader.member_info.get('label')),
+        table_name=text(reader.member_info.get('set_name')),
+        file_encoding=None,
+    )
+
+
+def _read_pandas(xpt_file, rows=None):
+    with pd.read_sas(str(xpt_file), format='xport', iterator=True, encoding=TEXT_ENCODING) as reader:
+        meta = _pandas_meta(reader)
+        return reader.read(rows), meta
+
+
+def _read_xport_reader(xpt_file, rows=None):
+    return xport_reader.read_xport(xpt_file, stop=rows)
+
+
+def _read_pyreadstat(xpt_file, rows=None):
+    return pyreadstat.read_xport(str(xpt_file), row_limit=rows or 0)
+
+
+def _read_sas7bdat(xpt_file, rows=None):
+    with SAS7BDAT(str(xpt_file)) as f:
+        df = f.to_data_frame()
+    return (df if rows is None else df.head(rows)), None
+
+
+# Reader name (see xpt_dispatch.READERS) -> function returning (df, meta)
+FULL_READERS = {'xport_reader': _read_xport_reader, 'pandas': _read_pandas, 'pyreadstat': _read_pyreadstat,
+                'sas7bdat': _read_sas7bdat}
+
+
+def _dispatch(xpt_file, readers, attempt, log, report, preferred):
+    """Try the readers planned for this file's format, in order; return attempt()'s result.
+
+    Time spent in readers that failed is accumulated in report['wasted'];
+    report also gets the sniffed 'format' and the winning 'reader'.
+    """
+    report = {} if report is None else report
+    report.update(format=None, reader=None, wasted=0.0)
+    report['format'], names = plan_readers(xpt_file, preferred)
+    errors = []
+    for name in names:
+        started = time.monotonic()
+        try:
+            log(f"Trying {name} for {xpt_file.name} ({report['format']})...")
+            result = attempt(readers[name])
+        except Exception as e:
+            report['wasted'] += time.monotonic() - started
+            errors.append(f"{name}({e})")
+            log(f"{name} failed: {e}")
+            continue
+        report['reader'] = name
+        return result
+    raise Exception(f"All methods failed: {', '.join(errors)}")
+
+
+def read_xpt(xpt_file, log=print, report=None, preferred=None, rows=None):
+    """Read an .xpt file once and return (df, meta); rows limits it to the first rows.
+
+    The first bytes of the file decide which readers are tried
+    (xpt_dispatch.plan_readers): XPORT v5 goes to xport_reader, which only
+    decodes the rows asked for, then pandas and pyreadstat;
+    v8 straight to pyreadstat; SAS7BDAT to sas7bdat; an HTML error page
+    fails without parsing. `preferred` - the reader that worked for this
+    file last time - is tried first. meta is None when the reader does not
+    provide it.
+    """
+    df, meta = _dispatch(xpt_file, FULL_READERS, lambda read: read(xpt_file, rows), log, report, preferred)
+    log(f"Successfully read, shape: {df.shape}")
+    return df, meta
+
+
+def write_csv(df, csv_file, log=print):
+    """Save a DataFrame as .csv"""
+    log(f"Saving to {csv_file}...")
+    df.to_csv(str(csv_file), index=False)
+    log(f"Successfully saved {csv_file}")
+
+
+def _write_chunks(chunks, csv_file, meta, parquet_file=None):
+    """Append DataFrame chunks to one .csv; the header goes out with the first chunk
+
+    With parquet_file each chunk also goes to a Parquet file in the same pass.
+    Returns (rows, columns, head) where head is the first PREVIEW_ROWS rows,
+    gathered across chunks smaller than that.
+    """
+    rows = 0
+    head = None
+    column_names = meta.column_names
+    columns = len(column_names)
+    parquet = columnar_store.ParquetChunkWriter(parquet_file, meta) if parquet_file else nullcontext()
+    # The .csv is closed first, so the Parquet copy is never older than it
+    # (columnar_store.fresh_columnar treats an older copy as stale)
+    with parquet, open(csv_file, 'w', encoding='utf-8', newline='') as f:
+        for chunk in chunks:
+            chunk.to_csv(f, index=False, header=f.tell() == 0)
+            if parquet_file:
+                parquet.write(chunk)
+            if head is None:
+                head = chunk.head(PREVIEW_ROWS).copy()
+            elif len(head) < PREVIEW_ROWS:
+                head = pd.concat([head, chunk.head(PREVIEW_ROWS - len(head))], ignore_index=True)
+            rows += chunk.shape[0]
+            columns = chunk.shape[1]
+        if f.tell() == 0:
+            # No rows at all: same header-only file as a full read would give
+            head = pd.DataFrame(columns=column_names)
+            head.to_csv(f, index=False)
+    return rows, columns, head
+
+
+def _stream_pandas(xpt_file, csv_file, chunksize, parquet_file=None):
+    with pd.read_sas(str(xpt_file), format='xport', chunksize=chunksize,
+                     encoding=TEXT_ENCODING) as reader:
+        meta = _pandas_meta(reader)
+        return _write_chunks(reader, csv_file, meta, parquet_file) + (meta,)
+
+
+def _stream_xport_reader(xpt_file, csv_file, chunksize, parquet_file=None):
+    # Each chunk is a slice of rows decoded straight from the mmap
+    with xport_reader.XportFile(xpt_file) as xport:
+        meta = xport.meta()
+        chunks = (xport.to_dataframe(start=start, stop=start + chunksize)
+                  for start in range(0, xport.nrows, chunksize))
+        return _write_chunks(chunks, csv_file, meta, parquet_file) + (meta,)
+
+
+def _stream_pyreadstat(xpt_file, csv_file, chunksize, parquet_file=None):
+    _, meta = pyreadstat.read_xport(str(xpt_file), metadataonly=True)
+    chunks = (df for df, _ in pyreadstat.read_file_in_chunks(
+        pyreadstat.read_xport, str(xpt_file), chunksize=chunksize))
+    return _write_chunks(chunks, csv_file, meta, parquet_file) + (meta,)
+
+
+def _stream_sas7bdat(xpt_file, csv_file, chunksize, parquet_file=None):
+    # sas7bdat has no chunked reader, read the whole file
+    df, meta = _read_sas7bdat(xpt_file)
+    write_csv(df, csv_file, log=lambda message: None)
+    if parquet_file:
+        columnar_store.write_parquet(df, parquet_file, meta)
+    return df.shape[0], df.shape[1], df.head(PREVIEW_ROWS).copy(), meta
+
+
+STREAM_READERS = {'xport_reader': _stream_xport_reader, 'pandas': _stream_pandas, 'pyreadstat': _stream_pyreadstat,
+                  'sas7bdat': _stream_sas7bdat}
+
+
+def stream_xpt_to_csv(xpt_file, csv_file, chunksize=CHUNK_ROWS, log=print, report=None, preferred=None,
+                      parquet_file=None):
+    """Convert an .xpt file to .csv in chunks of `chunksize` rows.
+
+    Peak memory is bounded by one chunk instead of the whole file. The
+    readers are chosen the same way as in read_xpt and chunks are written
+    with the same to_csv settings, so the result is byte-identical to
+    write_csv(read_xpt(...)). With parquet_file the same chunks are also
+    written to Parquet. Returns (rows, columns, head, meta), head being the
+    first PREVIEW_ROWS rows.
+    """
+    rows, columns, head, meta = _dispatch(xpt_file, STREAM_READERS,
+                                          lambda stream: stream(xpt_file, csv_file, chunksize, parquet_file),
+                                          log, report, preferred)
+    log(f"Successfully streamed {chunksize:,} rows per chunk, shape: {(rows, columns)}")
+    return rows, columns, head, meta
+
+
+def convert_file(xpt_file, csv_file, chunksize=0, log=print, preferred=None, parquet=WRITE_PARQUET, preview=False):
+    """Convert one .xpt file to .csv and return a result dict for the summary
+
+    chunksize > 0 streams the file (see stream_xpt_to_csv), 0 reads it whole.
+    parquet=True also writes a Parquet copy next to the .csv. Both are
+    written to *.part files and renamed into place only when complete, so
+    an interrupted run never leaves a truncated file that looks valid.
+    preview=True adds the file's meta and first PREVIEW_ROWS rows to the
+    result as 'meta' and 'head', so a caller can describe the file
+    without parsing it again.
+    """
+    started = time.monotonic()
+    report = {}
+    parquet_file = columnar_store.columnar_path(csv_file) if parquet else None
+    outputs = [path for path in (csv_file, parquet_file) if path]
+    partial = {path: partial_path(path) for path in outputs}
+    try:
+        if chunksize:
+            rows, columns, head, meta = stream_xpt_to_csv(xpt_file, partial[csv_file], chunksize, log, report,
+                                                          preferred, partial.get(parquet_file))
+        else:
+            df, meta = read_xpt(xpt_file, log, report, preferred)
+            write_csv(df, partial[csv_file], log=log)
+            if parquet_file:
+                columnar_store.write_parquet(df, partial[parquet_file], meta)
+            rows, columns = df.shape
+            head = df.head(PREVIEW_ROWS).copy()
+        for path in outputs:
+            os.replace(partial[path], path)
+        result = {'file': xpt_file.name, 'rows': rows, 'columns': columns,
+                  'seconds': time.monotonic() - started, 'error': None, 'parquet': parquet_file,
+                  'format': report['format'], 'reader': report['reader'], 'wasted': report['wasted'],
+                  'labels': (list(meta.column_names), list(meta.column_labels)) if meta else None}
+        if preview:
+            result.update(meta=meta, head=head)
+        return result
+    except Exception as e:
+        return {'file': xpt_file.name, 'rows': 0, 'columns': 0,
+                'seconds': time.monotonic() - started, 'error': str(e) or type(e).__name__, 'parquet': None,
+                'format': report.get('format'), 'reader': None, 'wasted': report.get('wasted', 0.0),
+                'labels': None}
+    finally:
+        for path in partial.values():
+            if path.exists():
+                path.unlink()
+
+
+def partial_path(path):
+    """Where an output is written before it is renamed into place"""
+    return path.with_name(path.name + PARTIAL_SUFFIX)
+
+
+def remove_partials(directory, pattern='*'):
+    """Delete <pattern>.part leftovers of an interrupted run"""
+    for stale in Path(directory).glob(f"{pattern}{PARTIAL_SUFFIX}"):
+        stale.unlink()
+
+
+def journal_key(parquet):
+    """Conversion journal key: outputs with the same key are interchangeable"""
+    return fingerprint({'version': CONVERTER_VERSION, 'parquet': bool(parquet)})
+
+
+def address_space_mb():
+    """Address space this interpreter has mapped, MB; None where /proc is unavailable
+
+    A forked worker starts with the same mappings, so RLIMIT_AS has to
+    leave room above this before the worker reads a single row.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _convert_in_child(conn, xpt_file, csv_file, chunksize, memory_mb, preferred=None, parquet=WRITE_PARQUET):
+    """Worker process entry point: apply the memory ceiling, convert, send the result back"""
+    if memory_mb and resource is not None:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    log = []
+    result = convert_file(xpt_file, csv_file, chunksize, log=log.append, preferred=preferred, parquet=parquet)
+    if result['error']:
+        result['log'] = log
+    conn.send(result)
+    conn.close()
+
+
+def convert_isolated(jobs, workers=CONVERT_WORKERS, timeout=FILE_TIMEOUT, memory_mb=MEMORY_MB, chunksize=CHUNK_ROWS,
+                     on_result=None, parquet=WRITE_PARQUET):
+    """Convert (xpt_file, csv_file, preferred_reader) jobs, each in its own process, at most `workers` at a time.
+
+    A file that raises, runs past `timeout` seconds, exceeds the `memory_mb`
+    address-space ceiling or crashes the interpreter (e.g. a segfault in a
+    C reader) only fails itself; the rest of the batch keeps going. Returns
+    result dicts with wall time measured from process start.
+    """
+    pending = list(jobs)
+    pending.reverse()
+    running = {}  # Connection -> (process, xpt_file, started)
+    results = []
+
+    def finish(conn, result):
+        process, xpt_file, started = running.pop(conn)
+        conn.close()
+        process.join()
+        result['seconds'] = time.monotonic() - started
+        results.append(result)
+        if on_result:
+            on_result(xpt_file, result)
+
+    def failed(xpt_file, error):
+        return {'file': xpt_file.name, 'rows': 0, 'columns': 0, 'error': error, 'labels': None, 'parquet': None,
+                'format': None, 'reader': None, 'wasted': 0.0}
+
+    while pending or running:
+        while pending and len(running) < max(1, workers):
+            xpt_file, csv_file, preferred = pending.pop()
+            parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_convert_in_child,
+                                              args=(child_conn, xpt_file, csv_file, chunksize, memory_mb, preferred, parquet),
+                                              daemon=True)
+            process.start()
+            child_conn.close()
+            running[parent_conn] = (process, xpt_file, time.monotonic())
+
+        now = time.monotonic()
+        wait_for = min(started + timeout for _, _, started in running.values()) - now if timeout else None
+        ready = wait(list(running), timeout=max(0, wait_for) if wait_for is not None else None)
+
+        for conn in ready:
+            try:
+                result = conn.recv()
+            except EOFError:
+                # The process exited without sending a result: crash or hard kill
+                process = running[conn][0]
+                process.join()
+                code = process.exitcode
+                reason = f"killed by signal {-code}" if code and code < 0 else f"exit code {code}"
+                result = failed(running[conn][1], f"worker crashed ({reason})")
+            finish(conn, result)
+
+        if timeout:
+            now = time.monotonic()
+            for conn, (process, xpt_file, started) in list(running.items()):
+                if now - started >= timeout:
+                    process.kill()
+                    finish(conn, failed(xpt_file, f"timeout after {timeout} s"))
+    return results
+
+
+def print_summary(results):
+    """Per-file wall time and throughput, slowest first"""
+    print(f"\n{'File':<24} {'Reader':<10} {'Rows':>10} {'Time, s':>9} {'Rows/s':>12}  Status")
+    for result in sorted(results, key=lambda r: -r['seconds']):
+        rate = result['rows'] / result['seconds'] if result['seconds'] > 0 else 0
+        status = 'ok' if not result['error'] else result['error']
+        print(f"{result['file']:<24} {result['reader'] or '-':<10} {result['rows']:>10,} {result['seconds']:>9.2f} "
+              f"{rate:>12,.0f}  {status}")
+    rows = sum(result['rows'] for result in results)
+    busy = sum(result['seconds'] for result in results)
+    print(f"Total: {rows:,} rows, {busy:.1f} s of conversion time"
+          + (f", {rows / busy:,.0f} rows/s per worker" if busy else ''))
+    wasted = sum(result['wasted'] for result in results)
+    print(f"Parse time lost to failed readers: {wasted:.2f} s")
+
+
+def convert_xpt_to_csv(xpt_dir="downloads/xpt_files", csv_dir="csv", workers=CONVERT_WORKERS,
+                       timeout=FILE_TIMEOUT, memory_mb=MEMORY_MB, chunksize=CHUNK_ROWS, parquet=WRITE_PARQUET,
+                       full=False, db_path=CATALOG_DB):
+    """Convert all .xpt files from downloads/xpt_files to .csv in csv folder
+
+    With workers=0 files are converted one by one in this process, as
+    before; otherwise each file runs in an isolated worker process.
+
+    Files whose source hash, converter version and output options match
+    the conversion journal in csv_dir, and whose outputs are still in
+    place, are skipped; full=True reconverts everything. Each finished
+    file is journaled at once, so a killed run resumes where it stopped.
+    Results are recorded in the catalog database at db_path.
+    """
 
     # Define directories
-    xpt_dir = Path("downloads/xpt_files")
-    csv_dir = Path("csv")
+    xpt_dir = Path(xpt_dir)
+    csv_dir = Path(csv_dir)
 
     # Create csv directory if it doesn't exist
     csv_dir.mkdir(exist_ok=True)
     print(f"Created directory: {csv_dir}")
 
-    # Counter for converted files
-    converted_count = 0
-    error_count = 0
+    # Leftovers of an interrupted run
+    remove_partials(csv_dir)
 
     # Find all .xpt files in the directory
-    xpt_files = list(xpt_dir.glob("*.xpt"))
-    print(f"Found {len(xpt_files)} .xpt files to convert")
+    xpt_files = sorted(xpt_dir.glob("*.xpt"))
+    print(f"Found {len(xpt_files)} .xpt files")
 
+    # Skip files the journal says are already converted with the same settings
+    started = time.monotonic()
+    journal = ConversionJournal(csv_dir, journal_key(parquet))
+    outputs = {}
+    snapshots = {}
+    pending = []
     for xpt_file in xpt_files:
-        # Create the corresponding csv path
         csv_file = csv_dir / xpt_file.with_suffix('.csv').name
+        outputs[xpt_file] = [csv_file] + ([columnar_store.columnar_path(csv_file)] if parquet else [])
+        up_to_date, snapshots[xpt_file] = journal.check(xpt_file, outputs[xpt_file])
+        if up_to_date and not full:
+            continue
+        pending.append(xpt_file)
+    print(f"Up to date: {len(xpt_files) - len(pending)}, to convert: {len(pending)} "
+          f"(journal check {(time.monotonic() - started) * 1000:.0f} ms)")
 
-        print(f"Processing: {xpt_file.name} -> {csv_file.name}")
+    # Conversion results go to the download ledger in the catalog database
+    db = CatalogDB(db_path)
+    # The reader that worked for each file last time is tried first
+    readers = ReaderCache(xpt_dir)
 
-        try:
-            # Try different methods to read the .xpt file
-            df = None
-
-            # Method 1: Try pandas read_sas
-            try:
-                print(f"Trying pandas read_sas for {xpt_file.name}...")
-                df = pd.read_sas(str(xpt_file), format='xport')
-                print(f"Successfully read with pandas, shape: {df.shape}")
-            except Exception as e1:
-                print(f"Pandas failed: {e1}")
-
-                # Method 2: Try pyreadstat
-                try:
-                    print(f"Trying pyreadstat for {xpt_file.name}...")
-                    df, meta = pyreadstat.read_xport(str(xpt_file))
-                    print(f"Successfully read with pyreadstat, shape: {df.shape}")
-                except Exception as e2:
-                    print(f"Pyreadstat failed: {e2}")
-
-                    # Method 3: Try sas7bdat
-                    try:
-                        print(f"Trying sas7bdat for {xpt_file.name}...")
-                        with SAS7BDAT(str(xpt_file)) as f:
-                            df = f.to_data_frame()
-                        print(f"Successfully read with sas7bdat, shape: {df.shape}")
-                    except Exception as e3:
-                        print(f"Sas7bdat failed: {e3}")
-                        raise Exception(f"All methods failed: pandas({e1}), pyreadstat({e2}), sas7bdat({e3})")
-
-            if df is not None:
-                # Save as .csv
-                print(f"Saving to {csv_file}...")
-                df.to_csv(str(csv_file), index=False)
-                print(f"Successfully saved {csv_file}")
-                converted_count += 1
-            else:
-                print(f"No data frame created for {xpt_file.name}")
-                error_count += 1
+    def record(xpt_file, result):
+        csv_file = csv_dir / xpt_file.with_suffix('.csv').name
+        if result['error']:
+            print(f"✗ {xpt_file.name}: {result['error']}")
+            db.record_file(xpt_file.stem, 'csv', csv_file, status='error', error=result['error'])
+            return
+        print(f"✓ {xpt_file.name}: {result['rows']:,} rows, {result['seconds']:.1f} s ({result['reader']})")
+        journal.record(xpt_file, outputs[xpt_file], snapshots[xpt_file])
+        readers.put(xpt_file, result['format'], result['reader'])
+        db.record_file(xpt_file.stem, 'csv', csv_file, csv_file.stat().st_size)
+        if result['parquet']:
+            db.record_file(xpt_file.stem, 'parquet', result['parquet'], result['parquet'].stat().st_size)
+        if result['labels']:
+            db.replace_xpt_columns(xpt_file.stem, *result['labels'])
 
-        except Exception as e:
-            print(f"Error converting {xpt_file.name}: {e}")
-            error_count += 1
+    jobs = [(xpt_file, csv_dir / xpt_file.with_suffix('.csv').name, readers.get(xpt_file)) for xpt_file in pending]
+    if workers:
+        print(f"Converting in {workers} worker processes (timeout {timeout} s, "
+              f"memory ceiling {f'{memory_mb} MB' if memory_mb else 'none'})")
+        results = convert_isolated(jobs, workers, timeout, memory_mb, chunksize, on_result=record, parquet=parquet)
+    else:
+        results = []
+        for xpt_file, csv_file, preferred in jobs:
+            print(f"Processing: {xpt_file.name} -> {csv_file.name}")
+            result = convert_file(xpt_file, csv_file, chunksize, preferred=preferred, parquet=parquet)
+            record(xpt_file, result)
+            results.append(result)
 
+    db.close()
+    readers.save()
+    journal.compact()
+    converted_count = sum(1 for result in results if not result['error'])
+    error_count = len(results) - converted_count
+    print_summary(results)
     print(f"\nConversion completed! {converted_count} files converted successfully, {error_count} errors.")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert NHANES .xpt files to .csv")
+    parser.add_argument('--xpt-dir', default="downloads/xpt_files", help="Folder with .xpt files")
+    parser.add_argument('--csv-dir', default="csv", help="Output folder for .csv files")
+    parser.add_argument('--workers', type=int, default=CONVERT_WORKERS,
+                        help="Worker processes; 0 converts serially in this process")
+    parser.add_argument('--timeout', type=float, default=FILE_TIMEOUT, help="Per-file timeout, seconds")
+    parser.add_argument('--memory-mb', type=int, default=MEMORY_MB,
+                        help="Address-space ceiling per worker process, MB (Unix only). It counts everything the "
+                             "worker has mapped, including the interpreter and its libraries "
+                             f"(about {address_space_mb() or '?'} MB here), not just the data")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS,
+                        help="Rows per chunk when streaming; 0 reads each file whole")
+    parser.add_argument('--no-parquet', dest='parquet', action='store_false', default=WRITE_PARQUET,
+                        help="Write only .csv, without the Parquet copy")
+    parser.add_argument('--full', action='store_true', help="Reconvert all files, ignoring the journal")
+    parser.add_argument('--db', default=CATALOG_DB, help="Catalog database that records the conversion results")
+    args = parser.parse_args(argv)
+    baseline = address_space_mb()
+    if args.memory_mb and args.workers and baseline and args.memory_mb <= baseline:
+        parser.error(f"--memory-mb {args.memory_mb} is below the {baseline} MB a worker has mapped "
+                     f"before reading any data; every file would fail")
+    results = convert_xpt_to_csv(args.xpt_dir, args.csv_dir, args.workers, args.timeout, args.memory_mb,
+                                 args.chunksize, args.parquet, args.full, args.db)
+    return 1 if any(result['error'] for result in results) else 0
+
 
 if __name__ == "__main__":
-    convert_xpt_to_csv()
\ No newline at end of file
+    sys.exit(main())
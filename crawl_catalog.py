@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
+
+import http_client
+from catalog_db import CatalogDB, CATALOG_DB
+from link_extractor import BASE_URL, iter_links
+
+# Страницы компонентов NHANES
+COMPONENTS = ['Demographics', 'Dietary', 'Examination', 'Laboratory', 'Questionnaire', 'LimitedAccess']
+PAGE_URL = BASE_URL + '/nchs/nhanes/search/datapage.aspx?Component={component}'
+CRAWL_WORKERS = len(COMPONENTS)
+STREAM_CHUNK = 64 * 1024
+
+# Выходные файлы
+XPT_LINKS_JSON = 'nhanes_xpt_links.json'
+HTM_LINKS_JSON = 'nhanes_htm_links.json'
+CATALOG_JSON = 'nhanes_catalog.json'
+
+# Сервер CDC не различает регистр пути; приводим его к одному написанию
+_PUBLIC_PREFIX = re.compile(r'^/nchs/data/nhanes/public/', re.I)
+
+
+def canonical_url(url):
+    """Каноническая форма ссылки на файл NHANES.
+
+    Схема и хост в нижнем регистре, префикс /Nchs/Data/Nhanes/Public/
+    в одном написании, код файла в верхнем регистре, расширение в нижнем:
+    .../nchs/data/nhanes/public/1999/datafiles/dsbi.XPT ->
+    .../Nchs/Data/Nhanes/Public/1999/DataFiles/DSBI.xpt
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path
+    if _PUBLIC_PREFIX.match(path):
+        path = _PUBLIC_PREFIX.sub('/Nchs/Data/Nhanes/Public/', path)
+        path = re.sub(r'/datafiles/', '/DataFiles/', path, flags=re.I)
+    directory, _, filename = path.rpartition('/')
+    stem, dot, ext = filename.rpartition('.')
+    if dot and ext.lower() in ('xpt', 'htm'):
+        filename = f"{stem.upper()}.{ext.lower()}"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), f"{directory}/{filename}", parts.query, ''))
+
+
+def dedup_key(url):
+    """Ключ для поиска дублей: каноническая ссылка без учета регистра.
+
+    /Nchs/Nhanes/2017-2018/DEMO_J.XPT и /nchs/nhanes/2017-2018/demo_j.xpt -
+    один и тот же файл на сервере, но canonical_url приводит к одному
+    написанию только известный префикс /Nchs/Data/Nhanes/Public/.
+    """
+    return canonical_url(url).casefold()
+
+
+def doc_url_for(xpt_url):
+    """Документация лежит рядом с данными: DEMO_J.xpt -> DEMO_J.htm"""
+    return xpt_url[:-len('.xpt')] + '.htm'
+
+
+def crawl_component(component, page_url=PAGE_URL, base_url=BASE_URL, save_dir=None):
+    """Скачивает страницу компонента потоком и возвращает записи о файлах"""
+    url = page_url.format(component=component)
+    records = []
+    saved = None
+    started = time.monotonic()
+    with http_client.get(url, stream=True) as response:
+        response.raise_for_status()
+        if response.encoding is None:
+            response.encoding = 'utf-8'
+        if save_dir:
+            os.makedirs(save_dir, exist_ok=True)
+            saved = open(os.path.join(save_dir, f"{component}.html"), 'w', encoding='utf-8')
+
+        def chunks():
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK, decode_unicode=True):
+                if saved:
+                    saved.write(chunk)
+                yield chunk
+
+        try:
+            for record in iter_links(chunks(), base_url):
+                record['component'] = component
+                records.append(record)
+        finally:
+            if saved:
+                saved.close()
+    return component, records, time.monotonic() - started
+
+
+def merge_records(pages):
+    """Объединяет записи всех страниц в один каталог без дублей.
+
+    Дубли определяются по канонической ссылке на XPT без учета регистра
+    (dedup_key); первая запись побеждает вместе с ее написанием ссылки,
+    недостающие поля берутся из следующих.
+    """
+    catalog = {}
+    duplicates = 0
+    for records in pages:
+        for record in records:
+            xpt_url = canonical_url(record['url'])
+            doc_url = canonical_url(record['doc_url']) if record.get('doc_url') else doc_url_for(xpt_url)
+            entry = {
+                'code': os.path.splitext(os.path.basename(xpt_url))[0],
+                'component': record.get('component'),
+                'years': record.get('years'),
+                'data_file_name': record.get('data_file_name'),
+                'date_published': record.get('date_published'),
+                'xpt_url': xpt_url,
+                'doc_url': doc_url,
+            }
+            key = dedup_key(xpt_url)
+            existing = catalog.get(key)
+            if existing is None:
+                catalog[key] = entry
+                continue
+            duplicates += 1
+            for key, value in entry.items():
+                if existing.get(key) is None:
+                    existing[key] = value
+    return list(catalog.values()), duplicates
+
+
+def write_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сбор каталога файлов NHANES со страниц всех компонентов")
+    parser.add_argument('--component', action='append', choices=COMPONENTS,
+                        help="Компонент (по умолчанию все)")
+    parser.add_argument('--page-url', default=PAGE_URL,
+                        help="Шаблон адреса страницы с {component}; для локальных фикстур, "
+                             "например http://localhost:8000/{component}.html")
+    parser.add_argument('--base-url', default=BASE_URL, help="База для относительных ссылок на страницах")
+    parser.add_argument('--workers', type=int, default=CRAWL_WORKERS, help="Параллельных запросов")
+    parser.add_argument('--save-pages', metavar='DIR', help="Сохранить скачанные страницы как фикстуры")
+    parser.add_argument('--out-dir', default='.', help="Папка для JSON каталогов")
+    parser.add_argument('--db', default=CATALOG_DB, help="База каталога SQLite (пустая строка - не писать)")
+    args = parser.parse_args(argv)
+
+    components = args.component or COMPONENTS
+    print(f"=== Сбор каталога NHANES: {', '.join(components)} ===\n")
+
+    started = time.monotonic()
+    pages = {}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(crawl_component, component, args.page_url, args.base_url, args.save_pages):
+                   component for component in components}
+        for future, component in futures.items():
+            try:
+                _, records, seconds = future.result()
+            except Exception as e:
+                print(f"✗ {component}: {e}")
+                failed += 1
+                continue
+            pages[component] = records
+            print(f"✓ {component}: {len(records)} ссылок за {seconds:.1f} с")
+
+    if failed:
+        # Неполный каталог не пишем: ссылки упавших компонентов пропали бы из JSON и базы
+        print(f"\nНе удалось скачать страниц: {failed}; каталоги и база не изменены")
+        return 1
+
+    # Порядок каталога не зависит от того, какая страница пришла первой
+    catalog, duplicates = merge_records(pages[component] for component in components if component in pages)
+    xpt_links = [entry['xpt_url'] for entry in catalog]
+    htm_links = [entry['doc_url'] for entry in catalog]
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    write_json(os.path.join(args.out_dir, XPT_LINKS_JSON), {"total_links": len(xpt_links), "links": xpt_links})
+    write_json(os.path.join(args.out_dir, HTM_LINKS_JSON), {"total_links": len(htm_links), "links": htm_links})
+    write_json(os.path.join(args.out_dir, CATALOG_JSON), {"total_files": len(catalog), "files": catalog})
+
+    if args.db:
+        with CatalogDB(args.db) as db:
+            for entry in catalog:
+                db.upsert_dataset(**entry)
+                db.add_url(entry['xpt_url'], 'xpt', entry['code'])
+                db.add_url(entry['doc_url'], 'htm', entry['code'])
+
+    print(f"\nФайлов в каталоге: {len(catalog)} (дублей отброшено: {duplicates})")
+    print(f"Время: {time.monotonic() - started:.1f} с")
+    print(f"Сохранено: {XPT_LINKS_JSON}, {HTM_LINKS_JSON}, {CATALOG_JSON} в {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
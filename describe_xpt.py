@@ -3,11 +3,20 @@ import pyreadstat
 from pathlib import Path
 from datetime import datetime
 
-def describe_xpt_file(xpt_file_path):
-    """Extract and return header information from an XPT file"""
+def describe_xpt_file(xpt_file_path, df=None, meta=None, rows=None):
+    """Extract and return header information from an XPT file
+
+    If df and meta are passed (e.g. by the pipeline, which has already
+    parsed the file), they are used instead of reading the file again.
+    df may be just the first rows when the row count is passed as rows.
+    Errors are then raised to the caller instead of being returned as the
+    description text.
+    """
+    parsed_by_caller = df is not None and meta is not None
     try:
         # Read the XPT file and get metadata
-        df, meta = pyreadstat.read_xport(str(xpt_file_path))
+        if df is None or meta is None:
+            df, meta = pyreadstat.read_xport(str(xpt_file_path))
 
         # Get file information
         file_size = os.path.getsize(xpt_file_path)
@@ -22,7 +31,7 @@ def describe_xpt_file(xpt_file_path):
         description.append(f"Last Modified: {datetime.fromtimestamp(os.path.getmtime(xpt_file_path))}")
         description.append("")
         description.append(f"Dataset Information:")
-        description.append(f"Number of Rows: {df.shape[0]:,}")
+        description.append(f"Number of Rows: {df.shape[0] if rows is None else rows:,}")
         description.append(f"Number of Columns: {df.shape[1]}")
         description.append("")
         description.append("Column Information:")
@@ -67,6 +76,8 @@ def describe_xpt_file(xpt_file_path):
         return "\n".join(description)
 
     except Exception as e:
+        if parsed_by_caller:
+            raise
         error_msg = f"Error processing {xpt_file_path.name}: {str(e)}"
         print(error_msg)
         return error_msg
@@ -0,0 +1,319 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+
+import http_client
+import metrics
+
+# Настройки по умолчанию
+DEFAULT_WORKERS = 8        # Сколько файлов качаем одновременно
+DEFAULT_PER_HOST = 4       # Сколько одновременных запросов к одному хосту
+DEFAULT_HOST_DELAY = 0.1   # Минимальная пауза между запросами к одному хосту (сек)
+CHUNK_SIZE = 256 * 1024    # Размер блока при потоковой записи
+RESUME_ATTEMPTS = 5        # Сколько раз докачивать файл после обрыва
+PART_SUFFIX = '.part'
+
+
+class IncompleteDownload(Exception):
+    """Сервер закрыл соединение раньше, чем отдал весь файл"""
+
+
+def _content_range_start(value):
+    """Возвращает начальный байт из заголовка Content-Range (или None)"""
+    match = re.match(r'bytes\s+(\d+)-\d+/', value or '')
+    return int(match.group(1)) if match else None
+
+
+def _content_range_total(value):
+    """Возвращает полный размер из заголовка Content-Range (или None)"""
+    match = re.match(r'bytes\s+[^/]+/(\d+)', value or '')
+    return int(match.group(1)) if match else None
+
+
+class FetchResult:
+    """Итог скачивания одного файла"""
+
+    def __init__(self, size=0, sha256=None, etag=None, last_modified=None, not_modified=False):
+        self.size = size
+        self.sha256 = sha256
+        self.etag = etag
+        self.last_modified = last_modified
+        self.not_modified = not_modified
+
+
+def _hash_existing(path):
+    """Начинает sha256 с уже скачанной части файла (нужно только при докачке)"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(block)
+    return hasher
+
+
+def _stream_response(response, part_path, offset, result, body):
+    """Разбирает ответ и дописывает тело в .part. Возвращает True, если файл полон"""
+    if response.status_code == 304:
+        result.not_modified = True
+        return True
+    if response.status_code == 416:
+        # Запрошенный диапазон за концом файла: .part либо уже полон, либо устарел
+        total = _content_range_total(response.headers.get('Content-Range'))
+        if total is not None and total == offset:
+            result.sha256 = _hash_existing(part_path).hexdigest()
+            return True
+        os.remove(part_path)
+        return False
+    response.raise_for_status()
+
+    if response.status_code == 206 and _content_range_start(response.headers.get('Content-Range')) == offset:
+        mode = 'ab'
+        hasher = _hash_existing(part_path)
+    else:
+        # Сервер проигнорировал Range и отдает файл целиком
+        offset = 0
+        mode = 'wb'
+        hasher = hashlib.sha256()
+
+    result.etag = response.headers.get('ETag')
+    result.last_modified = response.headers.get('Last-Modified')
+    expected = response.headers.get('Content-Length')
+    expected = offset + int(expected) if expected is not None else None
+
+    with open(part_path, mode) as f:
+        # Время ожидания сети и время записи на диск считаем раздельно
+        started = time.monotonic()
+        try:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                received = time.monotonic()
+                body['transfer'] += received - started
+                f.write(chunk)
+                hasher.update(chunk)
+                started = time.monotonic()
+                body['write'] += started - received
+                body['nbytes'] += len(chunk)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            # Обрыв посреди тела: сам запрос http_client уже повторял, тут нужна докачка
+            raise IncompleteDownload(f"обрыв после {offset + body['nbytes']} байт: {e}") from e
+
+    written = os.path.getsize(part_path)
+    if expected is not None and written < expected:
+        raise IncompleteDownload(f"получено {written} из {expected} байт")
+    result.sha256 = hasher.hexdigest()
+    return True
+
+
+def _fetch_part(url, part_path, headers, timeout, result):
+    """Один проход докачки в .part файл. Возвращает True, если файл полон"""
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    request_headers = dict(headers or {})
+    if offset:
+        request_headers['Range'] = f'bytes={offset}-'
+        # Условный запрос имеет смысл только для целого файла
+        request_headers.pop('If-None-Match', None)
+        request_headers.pop('If-Modified-Since', None)
+
+    with http_client.get(url, headers=request_headers, stream=True, timeout=timeout) as response:
+        # Тело дочитываем здесь, поэтому и запрос в метрики записываем здесь
+        body = {'transfer': 0.0, 'write': 0.0, 'nbytes': 0}
+        error = None
+        try:
+            return _stream_response(response, part_path, offset, result, body)
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            metrics.recorder.record(url, status=response.status_code, transfer=body['transfer'],
+                                    write=body['write'], nbytes=body['nbytes'], error=error,
+                                    **response.timing)
+
+
+def download_to_path(url, filepath, headers=None, timeout=30, attempts=RESUME_ATTEMPTS, manifest=None,
+                     conditional=True, store=None):
+    """Потоково скачивает URL в filepath и возвращает FetchResult.
+
+    Данные пишутся блоками в filepath + '.part', после обрыва докачка
+    продолжается запросом Range, а готовый файл атомарно переименовывается.
+    Поэтому в памяти держится только один блок, а по основному пути
+    никогда не лежит недокачанный файл.
+
+    Если передан SyncManifest, запрос делается условным: при ответе 304
+    файл не перекачивается, а результат помечается как not_modified.
+    С conditional=False файл скачивается заново, но манифест обновляется.
+
+    Если передан BlobStore, готовый файл кладется в хранилище по sha256,
+    посчитанному при загрузке, а по filepath создается ссылка на него.
+    """
+    part_path = str(filepath) + PART_SUFFIX
+    request_headers = dict(headers or {})
+    if manifest is not None and conditional:
+        request_headers.update(manifest.conditional_headers(url, filepath))
+    last_error = None
+
+    for attempt in range(attempts):
+        result = FetchResult()
+        try:
+            if _fetch_part(url, part_path, request_headers, timeout, result):
+                if result.not_modified:
+                    result.size = os.path.getsize(filepath)
+                    if manifest is not None:
+                        manifest.touch(url)
+                    return result
+                if store is not None:
+                    store.ingest(part_path, result.sha256)
+                    store.link_view(result.sha256, filepath)
+                else:
+                    os.replace(part_path, filepath)
+                result.size = os.path.getsize(filepath)
+                if manifest is not None:
+                    manifest.record(url, result.etag, result.last_modified, result.size, result.sha256,
+                                    filepath)
+                return result
+        except (requests.exceptions.ChunkedEncodingError, IncompleteDownload) as e:
+            # Только обрывы посреди тела: ошибки соединения и таймауты запроса
+            # http_client.request уже повторил MAX_RETRIES раз
+            last_error = e
+        if attempt + 1 < attempts:
+            time.sleep(http_client.backoff_delay(attempt))
+
+    raise requests.exceptions.RetryError(f"Не удалось докачать {url}: {last_error}")
+
+
+class HostLimiter:
+    """Ограничивает нагрузку на один хост: число параллельных запросов и частоту"""
+
+    def __init__(self, max_concurrent, min_interval):
+        self.semaphore = threading.Semaphore(max_concurrent)
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+
+    def __enter__(self):
+        self.semaphore.acquire()
+        # Резервируем момент старта под замком, а ждем уже без него
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.min_interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+        return False
+
+
+class DownloadStats:
+    """Сводная статистика прогона загрузки"""
+
+    def __init__(self):
+        self.successful = 0
+        self.failed = 0
+        self.skipped = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        end = self.finished if self.finished is not None else time.monotonic()
+        return max(end - self.started, 1e-9)
+
+    @property
+    def bytes_per_sec(self):
+        return self.bytes / self.elapsed
+
+    @property
+    def files_per_sec(self):
+        return (self.successful + self.failed) / self.elapsed
+
+    def summary(self):
+        """Возвращает строки итогового отчета о пропускной способности"""
+        return [
+            f"Время: {self.elapsed:.1f} с",
+            f"Объем: {self.bytes / 1024 / 1024:.2f} MB",
+            f"Скорость: {self.bytes_per_sec / 1024 / 1024:.2f} MB/с, {self.files_per_sec:.2f} файлов/с",
+        ]
+
+
+class DownloadEngine:
+    """Параллельная загрузка с общим лимитом потоков и лимитом на хост.
+
+    fetch(url, filename) должен возвращать кортеж (success, message, nbytes, skipped),
+    где skipped означает, что файл не изменился и не перекачивался.
+    Движку не важно, откуда берутся URL, поэтому его можно прогонять
+    против локального сервера (например, python -m http.server).
+    """
+
+    def __init__(self, fetch, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST,
+                 host_delay=DEFAULT_HOST_DELAY):
+        self.fetch = fetch
+        self.workers = max(1, workers)
+        self.per_host = max(1, per_host)
+        self.host_delay = host_delay
+        self._limiters = {}
+        self._limiters_lock = threading.Lock()
+
+    def _limiter_for(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._limiters_lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = HostLimiter(self.per_host, self.host_delay)
+                self._limiters[host] = limiter
+            return limiter
+
+    def _run_one(self, url, filename):
+        with self._limiter_for(url):
+            try:
+                return self.fetch(url, filename)
+            except Exception as e:
+                return False, f"Неизвестная ошибка для {filename}: {str(e)}", 0, False
+
+    def map(self, fn, urls):
+        """{url: fn(url)} с теми же лимитами потоков и хостов, что у run (например, HEAD запросы)"""
+        def limited(url):
+            with self._limiter_for(url):
+                return fn(url)
+
+        urls = list(urls)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return dict(zip(urls, executor.map(limited, urls)))
+
+    def run(self, tasks, on_result=None):
+        """Скачивает задачи [(url, filename), ...] и возвращает DownloadStats.
+
+        on_result(index, total, url, filename, success, message) вызывается
+        в основном потоке по мере завершения загрузок.
+        """
+        tasks = list(tasks)
+        stats = DownloadStats()
+        total = len(tasks)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self._run_one, url, filename): (url, filename)
+                for url, filename in tasks
+            }
+            for index, future in enumerate(as_completed(futures), 1):
+                url, filename = futures[future]
+                success, message, nbytes, skipped = future.result()
+                if skipped:
+                    stats.skipped += 1
+                elif success:
+                    stats.successful += 1
+                    stats.bytes += nbytes
+                else:
+                    stats.failed += 1
+                if on_result:
+                    on_result(index, total, url, filename, success, message)
+
+        stats.finished = time.monotonic()
+        return stats
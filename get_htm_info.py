@@ -1,7 +1,13 @@
+import argparse
 import os
 import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
 from pathlib import Path
 
+from build_manifest import BuildManifest, BUILD_MANIFEST, file_state, sha256_path, write_json_if_changed
+
 try:
     from bs4 import BeautifulSoup
 except ImportError:
@@ -12,9 +18,129 @@ except ImportError:
 # Настройки
 HTM_DIR = 'downloads/htm_files'
 OUTPUT_JSON = 'htm_info.json'
+WORKERS = os.cpu_count() or 1
+CHUNKSIZE = 16
+READ_CHUNK = 16 * 1024  # Заголовок страницы лежит в первых килобайтах файла
+
+
+class _HeaderFound(Exception):
+    pass
+
+
+class PageHeaderParser(HTMLParser):
+    """Ищет первый h3 внутри div#PageHeader и останавливает разбор, как только он закрыт.
+
+    Текст собирается так же, как get_text(strip=True) в BeautifulSoup:
+    каждый текстовый узел обрезается по краям, пустые отбрасываются,
+    остальные склеиваются без разделителя. Если разметка внутри заголовка
+    необычная (div закрылся раньше h3), self.unsure = True, и результат
+    лучше перепроверить полным разбором.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.header_depth = 0   # Глубина div внутри PageHeader (0 - еще не внутри)
+        self.h3_depth = 0
+        self.header_seen = False
+        self.parts = []
+        self.pending = []
+        self.title = None
+        self.unsure = False
+
+    def _flush(self):
+        text = ''.join(self.pending).strip()
+        if text:
+            self.parts.append(text)
+        self.pending = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.h3_depth:
+            self._flush()
+            if tag == 'h3':
+                self.h3_depth += 1
+            elif tag == 'div':
+                self.header_depth += 1
+            return
+        if self.header_depth:
+            if tag == 'div':
+                self.header_depth += 1
+            elif tag == 'h3':
+                self.h3_depth = 1
+        elif tag == 'div' and not self.header_seen and dict(attrs).get('id') == 'PageHeader':
+            self.header_seen = True
+            self.header_depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        if self.h3_depth:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if self.h3_depth:
+            self._flush()
+            if tag == 'h3':
+                self.h3_depth -= 1
+                if not self.h3_depth:
+                    self.title = ''.join(self.parts)
+                    raise _HeaderFound()
+            elif tag == 'div':
+                self.header_depth -= 1
+                if self.header_depth <= 0:
+                    self.unsure = True
+                    raise _HeaderFound()
+            return
+        if self.header_depth and tag == 'div':
+            self.header_depth -= 1
+            if not self.header_depth:
+                # PageHeader закрылся без h3
+                self.unsure = True
+                raise _HeaderFound()
+
+    def handle_data(self, data):
+        if self.h3_depth:
+            self.pending.append(data)
+
+    def handle_comment(self, data):
+        # Комментарий не входит в текст, но разрывает текстовый узел
+        if self.h3_depth:
+            self._flush()
+
+
+def extract_h3_fast(filepath, chunk_size=READ_CHUNK):
+    """Читает файл кусками и останавливается на закрытии h3 в div#PageHeader.
+
+    Возвращает текст заголовка или None, если его нельзя надежно получить
+    без полного разбора (нет PageHeader, нет h3, необычная разметка).
+    """
+    parser = PageHeaderParser()
+    with open(filepath, 'r', encoding='utf-8') as f:
+        try:
+            for chunk in iter(lambda: f.read(chunk_size), ''):
+                parser.feed(chunk)
+            parser.close()
+        except _HeaderFound:
+            pass
+    if parser.title is None or parser.unsure:
+        return None
+    return parser.title
+
 
 def extract_h3_from_file(filepath):
-    """Извлекает текст из h3 элемента внутри div с id='PageHeader'"""
+    """Извлекает текст из h3 элемента внутри div с id='PageHeader'.
+
+    Сначала пробует быстрый разбор начала файла, при неудаче - полный
+    разбор BeautifulSoup.
+    """
+    try:
+        title = extract_h3_fast(filepath)
+        if title is not None:
+            return title
+    except Exception:
+        pass
+    return extract_h3_full(filepath)
+
+
+def extract_h3_full(filepath):
+    """Полный разбор файла BeautifulSoup (прежний способ)"""
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
@@ -40,60 +166,162 @@ def extract_h3_from_file(filepath):
     except Exception as e:
         return f"Ошибка обработки файла: {str(e)}"
 
-def main():
+def is_error(h3_text):
+    return h3_text.startswith("Ошибка") or h3_text in ("H3 элемент не найден", "PageHeader не найден")
+
+
+def extract_titles(filepaths, workers=WORKERS, chunksize=CHUNKSIZE):
+    """Извлекает заголовки из файлов, при workers > 1 - в пуле процессов.
+
+    Задачи отправляются пачками по chunksize файлов, чтобы не платить за
+    пересылку каждого пути отдельно. Результаты идут в порядке filepaths.
+    """
+    if workers <= 1:
+        yield from map(extract_h3_from_file, filepaths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(extract_h3_from_file, filepaths, chunksize=chunksize)
+
+
+def update_titles(htm_dir, htm_files, manifest, workers=WORKERS, chunksize=CHUNKSIZE, full=False):
+    """Извлекает заголовки только из новых и измененных файлов.
+
+    Для каждого файла манифест помнит mtime, размер, sha256 и заголовок.
+    Файл с тем же mtime и размером не читается; при другом mtime, но том же
+    содержимом (перекачан без изменений) файл только хэшируется. Возвращает
+    (заголовки по имени файла, список обработанных файлов, число удаленных).
+    """
+    stage = manifest.stage('htm_info')
+    cache = {} if full else stage['items']
+    items = {}
+    todo = []
+    for filename in htm_files:
+        filepath = os.path.join(htm_dir, filename)
+        state = file_state(filepath)
+        entry = cache.get(filename)
+        if entry and entry['mtime_ns'] == state['mtime_ns'] and entry['size'] == state['size']:
+            items[filename] = entry
+        elif entry and entry['size'] == state['size'] and entry['sha256'] == sha256_path(filepath):
+            items[filename] = {**entry, **state}
+        else:
+            todo.append(filename)
+
+    filepaths = [os.path.join(htm_dir, filename) for filename in todo]
+    for filename, filepath, h3_text in zip(todo, filepaths, extract_titles(filepaths, workers, chunksize)):
+        items[filename] = {**file_state(filepath), 'sha256': sha256_path(filepath), 'title': h3_text}
+
+    removed = len(set(cache) - set(items))
+    stage['items'] = items
+    return {filename: items[filename]['title'] for filename in htm_files}, todo, removed
+
+
+def check_parsers(filepaths):
+    """Сравнивает быстрый разбор с полным по времени и результатам"""
+    started = time.perf_counter()
+    full = [extract_h3_full(path) for path in filepaths]
+    full_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fast = [extract_h3_from_file(path) for path in filepaths]
+    fast_time = time.perf_counter() - started
+
+    mismatches = [(path, a, b) for path, a, b in zip(filepaths, full, fast) if a != b]
+    print(f"Полный разбор (BeautifulSoup): {full_time:.2f} с")
+    print(f"Ранний выход: {fast_time:.2f} с (ускорение {full_time / fast_time:.1f}x)")
+    print(f"Расхождений: {len(mismatches)}")
+    for path, a, b in mismatches[:10]:
+        print(f"  {path}: {a!r} != {b!r}")
+
+
+def compare_timings(filepaths, workers, chunksize):
+    """Сравнивает последовательный и параллельный проход по одним и тем же файлам"""
+    started = time.perf_counter()
+    serial = list(extract_titles(filepaths, workers=1))
+    serial_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    parallel = list(extract_titles(filepaths, workers, chunksize))
+    parallel_time = time.perf_counter() - started
+
+    print(f"Последовательно: {serial_time:.2f} с")
+    print(f"Процессов {workers}: {parallel_time:.2f} с (ускорение {serial_time / parallel_time:.1f}x)")
+    print("Результаты совпадают" if serial == parallel else "ВНИМАНИЕ: результаты различаются!")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Извлечение заголовков H3 из HTM файлов NHANES")
+    parser.add_argument('--htm-dir', default=HTM_DIR, help="Папка с HTM файлами")
+    parser.add_argument('--output', default=OUTPUT_JSON, help="JSON с заголовками")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="Процессов (1 - без пула)")
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE, help="Файлов в одной задаче процесса")
+    parser.add_argument('--compare', action='store_true',
+                        help="Сравнить время последовательного и параллельного прохода, JSON не писать")
+    parser.add_argument('--check-parser', action='store_true',
+                        help="Сравнить быстрый разбор с полным BeautifulSoup, JSON не писать")
+    parser.add_argument('--manifest', default=BUILD_MANIFEST, help="Манифест инкрементальной сборки")
+    parser.add_argument('--full', action='store_true', help="Разобрать все файлы заново, без манифеста")
+    args = parser.parse_args(argv)
+
     print("=== Извлечение заголовков H3 из HTM файлов ===\n")
 
     # Проверяем существует ли папка с файлами
-    if not os.path.exists(HTM_DIR):
-        print(f"Папка {HTM_DIR} не найдена!")
+    if not os.path.exists(args.htm_dir):
+        print(f"Папка {args.htm_dir} не найдена!")
         return
 
-    # Получаем список всех .htm файлов
-    htm_files = [f for f in os.listdir(HTM_DIR) if f.endswith('.htm')]
+    # Получаем список всех .htm файлов; сортировка делает вывод независимым от порядка listdir
+    htm_files = sorted(f for f in os.listdir(args.htm_dir) if f.endswith('.htm'))
 
     if not htm_files:
-        print(f"В папке {HTM_DIR} не найдено .htm файлов!")
+        print(f"В папке {args.htm_dir} не найдено .htm файлов!")
         return
 
     print(f"Найдено {len(htm_files)} HTM файлов")
+    filepaths = [os.path.join(args.htm_dir, filename) for filename in htm_files]
 
-    # Обрабатываем каждый файл
-    results = {}
-    processed = 0
-    errors = 0
-
-    for filename in htm_files:
-        filepath = os.path.join(HTM_DIR, filename)
+    if args.check_parser:
+        check_parsers(filepaths)
+        return
 
-        print(f"Обработка: {filename}")
+    if args.compare:
+        compare_timings(filepaths, args.workers, args.chunksize)
+        return
 
-        h3_text = extract_h3_from_file(filepath)
+    # Обрабатываем в пуле процессов только новые и измененные файлы
+    manifest = BuildManifest(args.manifest)
+    titles, processed_files, removed = update_titles(args.htm_dir, htm_files, manifest,
+                                                     args.workers, args.chunksize, args.full)
 
-        if h3_text.startswith("Ошибка") or h3_text == "H3 элемент не найден" or h3_text == "PageHeader не найден":
+    for filename in processed_files:
+        h3_text = titles[filename]
+        print(f"Обработка: {filename}")
+        if is_error(h3_text):
             print(f"  ✗ {h3_text}")
-            errors += 1
         else:
             print(f"  ✓ Заголовок: {h3_text}")
 
-        results[filename] = h3_text
-        processed += 1
+    # Ключ - код набора данных (имя файла без .htm), ключи по порядку,
+    # чтобы файл не зависел от порядка обработки
+    results = dict(sorted((os.path.splitext(filename)[0], title) for filename, title in titles.items()))
+    processed = len(processed_files)
+    errors = sum(1 for title in results.values() if is_error(title))
 
     # Сохраняем результаты в JSON
     try:
-        with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        written = write_json_if_changed(args.output, results)
+        manifest.save()
 
         print("=== Обработка завершена ===")
-        print(f"Обработано файлов: {processed}")
+        print(f"Обработано файлов: {processed} (без изменений: {len(htm_files) - processed}, удалено: {removed})")
         print(f"Ошибок: {errors}")
-        print(f"Результаты сохранены в: {OUTPUT_JSON}")
+        print(f"Результаты сохранены в: {args.output}" if written else f"{args.output} не изменился")
 
         # Показываем пример результатов
         print("Примеры результатов:")
         count = 0
-        for filename, title in results.items():
-            if not title.startswith("Ошибка") and title not in ["H3 элемент не найден", "PageHeader не найден"]:
-                print(f"  {filename}: {title}")
+        for code, title in results.items():
+            if not is_error(title):
+                print(f"  {code}: {title}")
                 count += 1
                 if count >= 5:  # Показываем только первые 5 примеров
                     break
@@ -0,0 +1,183 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import metrics
+
+# Настройки общего HTTP клиента
+POOL_SIZE = 16                                # Соединений keep-alive на один хост
+MAX_RETRIES = 4                               # Повторов после первой попытки
+BACKOFF_BASE = 0.5                            # Базовая задержка экспоненциального backoff (сек)
+BACKOFF_MAX = 30.0                            # Потолок задержки (сек)
+RETRY_STATUSES = {429, 500, 502, 503, 504}    # Статусы, которые считаем временными
+RETRY_METHODS = {'GET', 'HEAD'}               # Повторяем только идемпотентные запросы
+DEFAULT_TIMEOUT = 30
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class _TimedConnectionMixin:
+    """Замеряет установку соединения: DNS+TCP (_new_conn) и TLS (остаток connect)"""
+
+    def _new_conn(self):
+        started = time.monotonic()
+        try:
+            return super()._new_conn()
+        finally:
+            self._tcp_seconds = time.monotonic() - started
+
+    def connect(self):
+        self._tcp_seconds = 0.0
+        started = time.monotonic()
+        super().connect()
+        total = time.monotonic() - started
+        metrics.add_connection_timing(self._tcp_seconds, max(0.0, total - self._tcp_seconds))
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter, чьи соединения сообщают время connect/TLS в metrics"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+def configure(pool_size=None, max_retries=None, backoff_base=None, backoff_max=None):
+    """Меняет настройки клиента. Новый пул соединений создается при следующем запросе"""
+    global POOL_SIZE, MAX_RETRIES, BACKOFF_BASE, BACKOFF_MAX, _session
+    with _session_lock:
+        if pool_size is not None:
+            POOL_SIZE = pool_size
+        if max_retries is not None:
+            MAX_RETRIES = max_retries
+        if backoff_base is not None:
+            BACKOFF_BASE = backoff_base
+        if backoff_max is not None:
+            BACKOFF_MAX = backoff_max
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_session():
+    """Возвращает общую для процесса сессию с пулом keep-alive соединений"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            # Повторы делаем сами (см. request), поэтому у адаптера их нет
+            adapter = TimedHTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def parse_retry_after(value):
+    """Переводит заголовок Retry-After (секунды или HTTP-дата) в секунды ожидания"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Задержка перед повтором: Retry-After, если сервер его прислал, иначе full jitter"""
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def request(method, url, **kwargs):
+    """HTTP запрос через общую сессию с повторами временных ошибок.
+
+    Повторяются сетевые ошибки и статусы из RETRY_STATUSES (только для
+    GET/HEAD). Последний ответ с ошибочным статусом возвращается как есть,
+    чтобы вызывающий код сам решил, вызывать ли raise_for_status().
+
+    Тайминги запроса пишутся в metrics.recorder. Для stream=True тело еще
+    не прочитано, поэтому они только прикрепляются к ответу (response.timing),
+    а записывает их тот, кто дочитал тело (см. download_engine).
+    """
+    method = method.upper()
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    stream = kwargs.get('stream', False)
+    retries = MAX_RETRIES if method in RETRY_METHODS else 0
+    session = get_session()
+    metrics.reset_connection_timing()
+
+    for attempt in range(retries + 1):
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt >= retries:
+                connect, tls = metrics.take_connection_timing()
+                metrics.recorder.record(url, connect=connect, tls=tls, retries=attempt, error=str(e))
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        if response.status_code not in RETRY_STATUSES or attempt >= retries:
+            connect, tls = metrics.take_connection_timing()
+            response.timing = {
+                'connect': connect,
+                'tls': tls,
+                'ttfb': response.elapsed.total_seconds(),
+                'retries': attempt,
+            }
+            if not stream:
+                metrics.recorder.record(url, status=response.status_code, nbytes=len(response.content),
+                                        **response.timing)
+            return response
+
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        response.close()
+        time.sleep(backoff_delay(attempt, retry_after))
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def head(url, **kwargs):
+    kwargs.setdefault('allow_redirects', True)
+    return request('HEAD', url, **kwargs)
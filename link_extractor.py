@@ -0,0 +1,168 @@
+import html
+import os
+import re
+from urllib.parse import urljoin, urlparse
+
+BASE_URL = "https://wwwn.cdc.gov"
+
+# Заголовки столбцов таблицы datapage.aspx -> поля записи
+COLUMN_FIELDS = {
+    'years': 'years',
+    'data file name': 'data_file_name',
+    'doc file': 'doc_file',
+    'data file': 'data_file',
+    'date published': 'date_published',
+}
+# Порядок столбцов, если заголовок таблицы не найден
+DEFAULT_COLUMNS = ['years', 'data_file_name', 'doc_file', 'data_file', 'date_published']
+
+# Токенизатор интересует только table/tr/td/th/a; комментарии и script/style пропускаются целиком
+_TOKEN = re.compile(
+    r'<!--.*?-->|<(script|style)\b.*?</\1\s*>|<(/?)(table|tr|td|th|a)\b([^>]*)>',
+    re.S | re.I)
+_HREF = re.compile(r'''href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.I)
+_ANY_TAG = re.compile(r'<[^>]*>')
+_UNCLOSED = re.compile(r'<!--(?!.*?-->)|<(script|style)\b(?!.*?</\1\s*>)', re.S | re.I)
+
+
+def _clean(text):
+    return ' '.join(text.split())
+
+
+class DatapageLinkExtractor:
+    """Потоковый разбор страницы datapage.aspx без построения дерева.
+
+    Данные подаются кусками через feed(); готовые записи накапливаются
+    в self.records и забираются через pop_records() по мере разбора, так что
+    ссылки доступны, пока ответ еще качается. Для каждой ссылки на .xpt
+    сохраняется контекст строки таблицы: цикл, название файла данных,
+    ссылка на документацию и дата публикации.
+    """
+
+    def __init__(self, base_url=BASE_URL, extension='.xpt'):
+        self.base_url = base_url
+        self.extension = extension.lower()
+        self.records = []
+        self.columns = list(DEFAULT_COLUMNS)
+        self._buffer = ''
+        self._row = None
+        self._cell = None
+
+    def feed(self, data):
+        buffer = self._buffer + data
+        # Обрабатываем только до последнего полного тега; незакрытые
+        # комментарий или script ждут следующего куска
+        end = buffer.rfind('>') + 1
+        last_open = buffer.rfind('<')
+        if last_open >= end:
+            end = min(end, last_open)
+        unclosed = _UNCLOSED.search(buffer, 0, end)
+        if unclosed:
+            end = unclosed.start()
+        self._process(buffer[:end])
+        self._buffer = buffer[end:]
+
+    def close(self):
+        self._process(self._buffer)
+        self._buffer = ''
+        self._end_row()
+
+    def _process(self, text):
+        position = 0
+        for match in _TOKEN.finditer(text):
+            if self._cell is not None and match.start() > position:
+                self._cell['text'].append(text[position:match.start()])
+            position = match.end()
+            tag = match.group(3)
+            if tag is None:
+                continue
+            self._handle_tag(tag.lower(), bool(match.group(2)), match.group(4))
+        if self._cell is not None and position < len(text):
+            self._cell['text'].append(text[position:])
+
+    def _handle_tag(self, tag, closing, attrs):
+        if tag == 'a':
+            if closing:
+                return
+            href = _HREF.search(attrs)
+            if not href:
+                return
+            href = html.unescape(next(group for group in href.groups() if group is not None))
+            if self._cell is not None:
+                self._cell['hrefs'].append(href)
+            elif href.lower().endswith(self.extension):
+                # Ссылка вне таблицы: контекста нет, но ссылку не теряем
+                self.records.append(self._record(href, {}))
+        elif tag == 'tr':
+            # </tr> и </td> в HTML необязательны: строку завершает и следующий <tr>
+            self._end_row()
+            if not closing:
+                self._row = []
+        elif tag == 'table':
+            if closing:
+                self._end_row()
+        elif self._row is not None:
+            # td / th
+            self._close_cell()
+            if not closing:
+                self._cell = {'text': [], 'hrefs': [], 'header': tag == 'th'}
+
+    def _end_row(self):
+        if self._row is not None:
+            self._close_cell()
+            self._finish_row(self._row)
+        self._row = None
+
+    def _close_cell(self):
+        if self._cell is not None:
+            text = html.unescape(_ANY_TAG.sub('', ''.join(self._cell['text'])))
+            self._row.append((_clean(text), self._cell['hrefs'], self._cell['header']))
+            self._cell = None
+
+    def _absolute(self, href):
+        return urljoin(self.base_url + '/', href.strip())
+
+    def _finish_row(self, cells):
+        if cells and all(is_header for _, _, is_header in cells):
+            names = [COLUMN_FIELDS.get(text.lower()) for text, _, _ in cells]
+            if any(names):
+                self.columns = [name or f'column_{i}' for i, name in enumerate(names)]
+            return
+
+        context = {}
+        for i, (text, hrefs, _) in enumerate(cells):
+            field = self.columns[i] if i < len(self.columns) else f'column_{i}'
+            context[field] = text
+            for href in hrefs:
+                if href.lower().endswith('.htm'):
+                    context['doc_url'] = self._absolute(href)
+
+        for text, hrefs, _ in cells:
+            for href in hrefs:
+                if href.lower().endswith(self.extension):
+                    self.records.append(self._record(href, context))
+
+    def _record(self, href, context):
+        url = self._absolute(href)
+        return {
+            'url': url,
+            'code': os.path.splitext(os.path.basename(urlparse(url).path))[0],
+            'years': context.get('years'),
+            'data_file_name': context.get('data_file_name'),
+            'doc_url': context.get('doc_url'),
+            'date_published': context.get('date_published'),
+        }
+
+    def pop_records(self):
+        records, self.records = self.records, []
+        return records
+
+
+def iter_links(chunks, base_url=BASE_URL, extension='.xpt'):
+    """Генератор записей о ссылках из потока кусков HTML (str)"""
+    parser = DatapageLinkExtractor(base_url, extension)
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.pop_records()
+    parser.close()
+    yield from parser.pop_records()
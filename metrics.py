@@ -0,0 +1,224 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+# Границы корзин гистограммы задержки запроса (сек), как в Prometheus
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PHASES = ('connect', 'tls', 'ttfb', 'transfer', 'write')  # ttfb включает connect и tls
+METRIC_PREFIX = 'nhanes_download'
+
+# Время установки соединения копится в потоке, который выполняет запрос
+_connection_timing = threading.local()
+
+
+def reset_connection_timing():
+    _connection_timing.connect = 0.0
+    _connection_timing.tls = 0.0
+
+
+def add_connection_timing(connect, tls):
+    """Вызывается из соединения urllib3: connect включает DNS и TCP, tls - рукопожатие"""
+    _connection_timing.connect = getattr(_connection_timing, 'connect', 0.0) + connect
+    _connection_timing.tls = getattr(_connection_timing, 'tls', 0.0) + tls
+
+
+def take_connection_timing():
+    """Возвращает (connect, tls) с последнего reset_connection_timing()"""
+    return getattr(_connection_timing, 'connect', 0.0), getattr(_connection_timing, 'tls', 0.0)
+
+
+class HostStats:
+    """Накопленные метрики по одному хосту"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.latency_sum = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def observe(self, latency):
+        self.latency_sum += latency
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.buckets[i] += 1
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'bytes': self.bytes,
+            'phases_seconds': {phase: round(value, 6) for phase, value in self.phases.items()},
+            'latency_seconds': {
+                'sum': round(self.latency_sum, 6),
+                'count': self.requests,
+                'buckets': {str(bound): count for bound, count in zip(LATENCY_BUCKETS, self.buckets)},
+            },
+        }
+
+
+class MetricsRecorder:
+    """Собирает тайминги HTTP запросов прогона и выгружает их в JSON и Prometheus"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.monotonic()
+            self.started_at = datetime.now(timezone.utc)
+            self.hosts = {}
+            self.requests = []
+            self.stages = {}
+
+    def record(self, url, status=None, connect=0.0, tls=0.0, ttfb=0.0, transfer=0.0, write=0.0,
+               nbytes=0, retries=0, error=None):
+        """Запоминает один запрос: фазы в секундах, объем тела и число повторов"""
+        host = urlparse(url).netloc.lower()
+        phases = {'connect': connect, 'tls': tls, 'ttfb': ttfb, 'transfer': transfer, 'write': write}
+        latency = ttfb + transfer
+        with self.lock:
+            stats = self.hosts.setdefault(host, HostStats())
+            stats.requests += 1
+            stats.retries += retries
+            stats.bytes += nbytes
+            if error is not None or (status is not None and status >= 400):
+                stats.errors += 1
+            for phase, value in phases.items():
+                stats.phases[phase] += value
+            stats.observe(latency)
+            self.requests.append({
+                'url': url,
+                'status': status,
+                'bytes': nbytes,
+                'retries': retries,
+                'error': error,
+                **{phase: round(value, 6) for phase, value in phases.items()},
+                'bytes_per_sec': round(nbytes / transfer, 1) if transfer > 0 else None,
+            })
+
+    def record_stage(self, stage, seconds, rows=0, error=False):
+        """Запоминает работу стадии конвейера (конвертация, описание) над одним файлом"""
+        with self.lock:
+            totals = self.stages.setdefault(stage, {'files': 0, 'errors': 0, 'seconds': 0.0, 'rows': 0})
+            totals['files'] += 1
+            totals['errors'] += int(error)
+            totals['seconds'] += seconds
+            totals['rows'] += rows
+
+    def report(self):
+        """Сводка прогона в виде словаря (для JSON отчета)"""
+        with self.lock:
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            total_bytes = sum(stats.bytes for stats in self.hosts.values())
+            return {
+                'started': self.started_at.isoformat(timespec='seconds'),
+                'duration_seconds': round(elapsed, 3),
+                'requests': len(self.requests),
+                'bytes': total_bytes,
+                'bytes_per_sec': round(total_bytes / elapsed, 1),
+                'hosts': {host: stats.as_dict() for host, stats in sorted(self.hosts.items())},
+                'stages': {stage: dict(totals) for stage, totals in sorted(self.stages.items())},
+                'request_log': list(self.requests),
+            }
+
+    def write_json(self, path):
+        _write_atomic(path, json.dumps(self.report(), ensure_ascii=False, indent=2))
+
+    def prometheus_text(self):
+        """Метрики в текстовом формате Prometheus (для textfile collector node_exporter)"""
+        report = self.report()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            full_name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{full_name}{{{label_text}}} {value}" if label_text else f"{full_name} {value}")
+
+        hosts = report['hosts']
+        metric('requests_total', 'counter', "HTTP requests made during the run.",
+               [({'host': host}, data['requests']) for host, data in hosts.items()])
+        metric('errors_total', 'counter', "Failed HTTP requests (exception or status >= 400).",
+               [({'host': host}, data['errors']) for host, data in hosts.items()])
+        metric('retries_total', 'counter', "Retries performed by the HTTP client.",
+               [({'host': host}, data['retries']) for host, data in hosts.items()])
+        metric('bytes_total', 'counter', "Response body bytes received.",
+               [({'host': host}, data['bytes']) for host, data in hosts.items()])
+        metric('phase_seconds_total', 'counter', "Time spent per request phase.",
+               [({'host': host, 'phase': phase}, value)
+                for host, data in hosts.items() for phase, value in data['phases_seconds'].items()])
+
+        histogram = []
+        for host, data in hosts.items():
+            latency = data['latency_seconds']
+            for bound, count in latency['buckets'].items():
+                histogram.append(({'host': host, 'le': bound}, count))
+            histogram.append(({'host': host, 'le': '+Inf'}, latency['count']))
+        full_name = f"{METRIC_PREFIX}_request_duration_seconds"
+        lines.append(f"# HELP {full_name} Request latency (time to first byte plus body transfer).")
+        lines.append(f"# TYPE {full_name} histogram")
+        for labels, value in histogram:
+            lines.append(f'{full_name}_bucket{{host="{_escape(labels["host"])}",le="{labels["le"]}"}} {value}')
+        for host, data in hosts.items():
+            lines.append(f'{full_name}_sum{{host="{_escape(host)}"}} {data["latency_seconds"]["sum"]}')
+            lines.append(f'{full_name}_count{{host="{_escape(host)}"}} {data["latency_seconds"]["count"]}')
+
+        stages = report['stages']
+        if stages:
+            metric('stage_files_total', 'counter', "Files processed by a pipeline stage.",
+                   [({'stage': stage}, totals['files']) for stage, totals in stages.items()])
+            metric('stage_seconds_total', 'counter', "Worker time spent in a pipeline stage.",
+                   [({'stage': stage}, round(totals['seconds'], 6)) for stage, totals in stages.items()])
+            metric('stage_rows_total', 'counter', "Rows produced by a pipeline stage.",
+                   [({'stage': stage}, totals['rows']) for stage, totals in stages.items()])
+
+        metric('run_duration_seconds', 'gauge', "Wall time of the last run.", [({}, report['duration_seconds'])])
+        metric('run_bytes_per_second', 'gauge', "Aggregate throughput of the last run.",
+               [({}, report['bytes_per_sec'])])
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        _write_atomic(path, self.prometheus_text())
+
+    def summary(self):
+        """Короткая сводка по хостам для вывода в консоль"""
+        report = self.report()
+        lines = []
+        for host, data in report['hosts'].items():
+            count = max(data['requests'], 1)
+            phases = ', '.join(f"{phase} {value / count * 1000:.0f} мс"
+                               for phase, value in data['phases_seconds'].items())
+            lines.append(f"{host}: {data['requests']} запросов, повторов {data['retries']}, "
+                         f"ошибок {data['errors']}; в среднем {phases}")
+        for stage, totals in report['stages'].items():
+            rate = totals['rows'] / totals['seconds'] if totals['seconds'] else 0
+            lines.append(f"{stage}: {totals['files']} файлов, {totals['seconds']:.1f} с, {rate:,.0f} строк/с")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# Общий сборщик метрик процесса
+recorder = MetricsRecorder()
@@ -0,0 +1,195 @@
+# Разбор кодов наборов данных NHANES: цикл, префикс, компонент и категория.
+# Код состоит из префикса и суффикса цикла: DEMO_J, ALB_CR_D (префикс сам
+# содержит '_'), P_DEMO (объединенный цикл 2017-2020 до пандемии) и DEMO без
+# суффикса (1999-2000). Компонент и категория определяются по префиксу через
+# префиксное дерево: побеждает самый длинный префикс из таблицы.
+
+# Суффикс цикла -> годы. 'P' ставится приставкой P_, а не суффиксом
+CYCLES = {
+    '': '1999-2000', 'B': '2001-2002', 'C': '2003-2004', 'D': '2005-2006', 'E': '2007-2008',
+    'F': '2009-2010', 'G': '2011-2012', 'H': '2013-2014', 'I': '2015-2016', 'J': '2017-2018',
+    'P': '2017-2020', 'L': '2021-2023',
+}
+SUFFIX_CYCLES = set(CYCLES) - {'', 'P'}
+
+COMPONENTS = ['Demographics', 'Dietary', 'Examination', 'Laboratory', 'Questionnaire']
+
+# Префикс кода -> (компонент, категория). Префиксы семейств (DR1, SS, L06...)
+# покрывают все наборы, начинающиеся с них, если нет более длинного префикса.
+PREFIX_TABLE = {
+    # Demographics
+    'DEMO': ('Demographics', 'Demographics'),
+
+    # Dietary
+    'DR1': ('Dietary', 'Dietary Interview'), 'DR2': ('Dietary', 'Dietary Interview'),
+    'DRX': ('Dietary', 'Dietary Interview'),
+    'DS1': ('Dietary', 'Dietary Supplements'), 'DS2': ('Dietary', 'Dietary Supplements'),
+    'DSB': ('Dietary', 'Dietary Supplements'), 'DSI': ('Dietary', 'Dietary Supplements'),
+    'DSP': ('Dietary', 'Dietary Supplements'), 'DSQ': ('Dietary', 'Dietary Supplements'),
+    'FFQ': ('Dietary', 'Food Frequency'), 'FOODLK': ('Dietary', 'Food Frequency'),
+    'VARLK': ('Dietary', 'Food Frequency'),
+    'DTQ': ('Dietary', 'Diet Behavior'), 'DBQ': ('Dietary', 'Diet Behavior'),
+    'FLDEW': ('Dietary', 'Water'), 'WPIN': ('Dietary', 'Water'),
+
+    # Examination
+    'BMX': ('Examination', 'Body Measures'), 'BIX': ('Examination', 'Body Measures'),
+    'ARX': ('Examination', 'Body Measures'),
+    'BPX': ('Examination', 'Blood Pressure'), 'LEXAB': ('Examination', 'Blood Pressure'),
+    'AUX': ('Examination', 'Audiometry'),
+    'BAX': ('Examination', 'Balance'),
+    'CSX': ('Examination', 'Taste & Smell'),
+    'CVX': ('Examination', 'Cardiovascular Fitness'),
+    'DEX': ('Examination', 'Dermatology'),
+    'DXX': ('Examination', 'Bone Densitometry'),
+    'ENX': ('Examination', 'Respiratory'), 'SPX': ('Examination', 'Respiratory'),
+    'FLXCLN': ('Examination', 'Oral Health'), 'OHX': ('Examination', 'Oral Health'),
+    'LEXPN': ('Examination', 'Peripheral Neuropathy'),
+    'LUX': ('Examination', 'Liver Ultrasound'),
+    'MGX': ('Examination', 'Muscle Strength'), 'MSX': ('Examination', 'Muscle Strength'),
+    'OPX': ('Examination', 'Vision'), 'VIX': ('Examination', 'Vision'),
+    'PAX': ('Examination', 'Physical Activity Monitor'),
+    'TBX': ('Examination', 'Tuberculosis'),
+
+    # Laboratory: лабораторные серии L02..L52 и LAB02..LAB28
+    'L0': ('Laboratory', 'Laboratory Panels'), 'L1': ('Laboratory', 'Laboratory Panels'),
+    'L2': ('Laboratory', 'Laboratory Panels'), 'L3': ('Laboratory', 'Laboratory Panels'),
+    'L4': ('Laboratory', 'Laboratory Panels'), 'L5': ('Laboratory', 'Laboratory Panels'),
+    'LAB': ('Laboratory', 'Laboratory Panels'),
+    # Остатки образцов (surplus) и объединенные образцы
+    'SS': ('Laboratory', 'Surplus Specimens'), 'POOLTF': ('Laboratory', 'Surplus Specimens'),
+    'SSQ': ('Questionnaire', 'Social Support'),
+    # Моча и окружающая среда
+    'U': ('Laboratory', 'Urine'),
+    'UCFLOW': ('Laboratory', 'Urine'), 'UCPREG': ('Laboratory', 'Reproductive Health'),
+    'UC': ('Laboratory', 'Reproductive Health'), 'UCOSMO': ('Laboratory', 'Urine'),
+    'AAS': ('Laboratory', 'Environmental Chemicals'), 'AA': ('Laboratory', 'Environmental Chemicals'),
+    'ALD': ('Laboratory', 'Environmental Chemicals'), 'ALDUST': ('Laboratory', 'Allergy'),
+    'AMDG': ('Laboratory', 'Environmental Chemicals'), 'BFRPOL': ('Laboratory', 'Environmental Chemicals'),
+    'CAFE': ('Laboratory', 'Environmental Chemicals'), 'CARB': ('Laboratory', 'Environmental Chemicals'),
+    'COT': ('Laboratory', 'Tobacco Biomarkers'), 'TSNA': ('Laboratory', 'Tobacco Biomarkers'),
+    'DEET': ('Laboratory', 'Environmental Chemicals'), 'DOXPOL': ('Laboratory', 'Environmental Chemicals'),
+    'EPH': ('Laboratory', 'Environmental Chemicals'), 'ETHOX': ('Laboratory', 'Environmental Chemicals'),
+    'FLDEP': ('Laboratory', 'Environmental Chemicals'), 'FORMA': ('Laboratory', 'Environmental Chemicals'),
+    'FR': ('Laboratory', 'Environmental Chemicals'), 'HCAA': ('Laboratory', 'Environmental Chemicals'),
+    'OPD': ('Laboratory', 'Environmental Chemicals'), 'PAH': ('Laboratory', 'Environmental Chemicals'),
+    'PCBPOL': ('Laboratory', 'Environmental Chemicals'), 'PERNT': ('Laboratory', 'Environmental Chemicals'),
+    'PFAS': ('Laboratory', 'Environmental Chemicals'), 'PFC': ('Laboratory', 'Environmental Chemicals'),
+    'PHPYPA': ('Laboratory', 'Environmental Chemicals'), 'PHTHTE': ('Laboratory', 'Environmental Chemicals'),
+    'PHYTO': ('Laboratory', 'Environmental Chemicals'), 'PP': ('Laboratory', 'Environmental Chemicals'),
+    'PSTPOL': ('Laboratory', 'Environmental Chemicals'), 'VNA': ('Laboratory', 'Environmental Chemicals'),
+    'VOC': ('Laboratory', 'Environmental Chemicals'),
+    # Металлы
+    'CRCO': ('Laboratory', 'Metals'), 'CUSEZN': ('Laboratory', 'Metals'), 'IHG': ('Laboratory', 'Metals'),
+    'PBCD': ('Laboratory', 'Metals'),
+    # Биохимия, липиды, глюкоза
+    'ALB_CR': ('Laboratory', 'Kidney Function'), 'BIOPRO': ('Laboratory', 'Biochemistry'),
+    'HDL': ('Laboratory', 'Lipids'), 'TCHOL': ('Laboratory', 'Lipids'), 'TRIGLY': ('Laboratory', 'Lipids'),
+    'APOB': ('Laboratory', 'Lipids'), 'FAS': ('Laboratory', 'Lipids'), 'TFA': ('Laboratory', 'Lipids'),
+    'GHB': ('Laboratory', 'Diabetes'), 'GLU': ('Laboratory', 'Diabetes'), 'INS': ('Laboratory', 'Diabetes'),
+    'OGTT': ('Laboratory', 'Diabetes'),
+    'CRP': ('Laboratory', 'Inflammation'), 'HSCRP': ('Laboratory', 'Inflammation'),
+    'AGP': ('Laboratory', 'Inflammation'),
+    'CBC': ('Laboratory', 'Hematology'), 'EPP': ('Laboratory', 'Hematology'),
+    # Питательные вещества
+    'B12': ('Laboratory', 'Nutrition Biomarkers'), 'FERTIN': ('Laboratory', 'Nutrition Biomarkers'),
+    'FETIB': ('Laboratory', 'Nutrition Biomarkers'), 'FOL': ('Laboratory', 'Nutrition Biomarkers'),
+    'HCY': ('Laboratory', 'Nutrition Biomarkers'), 'MMA': ('Laboratory', 'Nutrition Biomarkers'),
+    'TFR': ('Laboratory', 'Nutrition Biomarkers'), 'VIC': ('Laboratory', 'Nutrition Biomarkers'),
+    'VID': ('Laboratory', 'Nutrition Biomarkers'), 'VIT': ('Laboratory', 'Nutrition Biomarkers'),
+    # Гормоны
+    'PTH': ('Laboratory', 'Hormones'), 'THYROD': ('Laboratory', 'Hormones'), 'TST': ('Laboratory', 'Hormones'),
+    'PSA': ('Laboratory', 'Hormones'),
+    # Инфекции и иммунитет
+    'AL_IGE': ('Laboratory', 'Allergy'), 'CHLMDA': ('Laboratory', 'Infectious Disease'),
+    'CMV': ('Laboratory', 'Infectious Disease'), 'HEP': ('Laboratory', 'Infectious Disease'),
+    'HIV': ('Laboratory', 'Infectious Disease'), 'HPV': ('Laboratory', 'Infectious Disease'),
+    'HSV': ('Laboratory', 'Infectious Disease'), 'MMRV': ('Laboratory', 'Infectious Disease'),
+    'ORHPV': ('Laboratory', 'Infectious Disease'), 'TB': ('Laboratory', 'Infectious Disease'),
+    'TGEMA': ('Laboratory', 'Infectious Disease'), 'TRICH': ('Laboratory', 'Infectious Disease'),
+    'TELO': ('Laboratory', 'Surplus Specimens'),
+
+    # Questionnaire
+    'ACQ': ('Questionnaire', 'Demographics & Social'), 'INQ': ('Questionnaire', 'Demographics & Social'),
+    'HOQ': ('Questionnaire', 'Demographics & Social'), 'OCQ': ('Questionnaire', 'Demographics & Social'),
+    'SEQ': ('Questionnaire', 'Demographics & Social'), 'FSQ': ('Questionnaire', 'Demographics & Social'),
+    'CBQ': ('Questionnaire', 'Demographics & Social'),
+    'HIQ': ('Questionnaire', 'Health Care'), 'HUQ': ('Questionnaire', 'Health Care'),
+    'IMQ': ('Questionnaire', 'Health Care'), 'RXQ': ('Questionnaire', 'Medications'),
+    'AGQ': ('Questionnaire', 'Medical Conditions'), 'ARQ': ('Questionnaire', 'Medical Conditions'),
+    'BPQ': ('Questionnaire', 'Medical Conditions'), 'BHQ': ('Questionnaire', 'Medical Conditions'),
+    'CDQ': ('Questionnaire', 'Medical Conditions'), 'CKQ': ('Questionnaire', 'Medical Conditions'),
+    'DIQ': ('Questionnaire', 'Medical Conditions'), 'HCQ': ('Questionnaire', 'Medical Conditions'),
+    'HEQ': ('Questionnaire', 'Medical Conditions'), 'KIQ': ('Questionnaire', 'Medical Conditions'),
+    'MCQ': ('Questionnaire', 'Medical Conditions'), 'MPQ': ('Questionnaire', 'Medical Conditions'),
+    'OSQ': ('Questionnaire', 'Medical Conditions'), 'PSQ': ('Questionnaire', 'Medical Conditions'),
+    'RDQ': ('Questionnaire', 'Medical Conditions'), 'TBQ': ('Questionnaire', 'Medical Conditions'),
+    'DEQ': ('Questionnaire', 'Medical Conditions'), 'VIQ': ('Questionnaire', 'Medical Conditions'),
+    'AUQ': ('Questionnaire', 'Medical Conditions'), 'BAQ': ('Questionnaire', 'Medical Conditions'),
+    'CSQ': ('Questionnaire', 'Medical Conditions'), 'OHQ': ('Questionnaire', 'Medical Conditions'),
+    'HSQ': ('Questionnaire', 'Health Status'), 'DLQ': ('Questionnaire', 'Health Status'),
+    'FNQ': ('Questionnaire', 'Health Status'), 'PFQ': ('Questionnaire', 'Health Status'),
+    'CFQ': ('Questionnaire', 'Health Status'), 'ECQ': ('Questionnaire', 'Health Status'),
+    'WHQ': ('Questionnaire', 'Health Status'), 'SLQ': ('Questionnaire', 'Health Status'),
+    'CIQ': ('Questionnaire', 'Mental Health'), 'DPQ': ('Questionnaire', 'Mental Health'),
+    'ALQ': ('Questionnaire', 'Lifestyle'), 'DUQ': ('Questionnaire', 'Lifestyle'),
+    'PAQ': ('Questionnaire', 'Lifestyle'), 'SMQ': ('Questionnaire', 'Lifestyle'),
+    'SXQ': ('Questionnaire', 'Lifestyle'), 'RHQ': ('Questionnaire', 'Reproductive Health'),
+    'AQQ': ('Questionnaire', 'Environment'), 'PUQ': ('Questionnaire', 'Environment'),
+    'VTQ': ('Questionnaire', 'Environment'),
+    'FASTQX': ('Questionnaire', 'Fasting'), 'PH': ('Questionnaire', 'Fasting'),
+}
+
+
+class PrefixTrie:
+    """Префиксное дерево: поиск самого длинного префикса строки из таблицы за один проход"""
+
+    _VALUE = object()
+
+    def __init__(self, table):
+        self.root = {}
+        for prefix, value in table.items():
+            node = self.root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[self._VALUE] = value
+
+    def longest_match(self, text):
+        node = self.root
+        found = node.get(self._VALUE)
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(self._VALUE, found)
+        return found
+
+
+_TRIE = PrefixTrie(PREFIX_TABLE)
+
+
+def split_code(code):
+    """Префикс и суффикс цикла: DEMO_J -> (DEMO, J), ALB_CR_D -> (ALB_CR, D),
+    P_DEMO -> (DEMO, P), KIQ_U -> (KIQ_U, ''), DEMO -> (DEMO, '')"""
+    code = code.upper()
+    if code.startswith('P_'):
+        return code[2:], 'P'
+    head, sep, tail = code.rpartition('_')
+    if sep and tail in SUFFIX_CYCLES:
+        return head, tail
+    return code, ''
+
+
+def classify(code):
+    """Полная классификация кода: префикс, суффикс, годы, компонент и категория.
+
+    Для префиксов вне таблицы компонент и категория - 'Other'.
+    """
+    prefix, suffix = split_code(code)
+    component, category = _TRIE.longest_match(prefix) or ('Other', 'Other')
+    return {
+        'prefix': prefix,
+        'cycle': suffix,
+        'years': CYCLES[suffix],
+        'component': component,
+        'category': category,
+    }
@@ -0,0 +1,296 @@
+import argparse
+import fnmatch
+import json
+import os
+import sys
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+import http_client
+import metrics
+from blob_store import BlobStore, STORE_DIR, manager_view_path
+from catalog_db import CatalogDB, CATALOG_DB
+from download_engine import DownloadEngine, download_to_path, DEFAULT_WORKERS, DEFAULT_PER_HOST, DEFAULT_HOST_DELAY
+from nhanes_codes import split_code
+from sync_manifest import SyncManifest, MANIFEST_FILE
+
+# Отчет о таймингах запросов каждого прогона
+METRICS_JSON = 'downloads/download_metrics.json'
+
+# Каталоги ссылок и папки загрузки для каждого типа файлов
+KINDS = {
+    'xpt': {'title': 'XPT', 'catalog': 'nhanes_xpt_links.json', 'dest': 'downloads/xpt_files'},
+    'htm': {'title': 'HTM', 'catalog': 'nhanes_htm_links.json', 'dest': 'downloads/htm_files'},
+}
+
+
+def load_links_from_json(json_file, kind='xpt'):
+    """Загружает ссылки из JSON файла (или из базы каталога *.db)"""
+    if json_file.endswith('.db'):
+        if not os.path.exists(json_file):
+            print(f"Файл {json_file} не найден!")
+            return []
+        with CatalogDB(json_file) as db:
+            return db.links(kind)
+    try:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data['links']
+    except FileNotFoundError:
+        print(f"Файл {json_file} не найден!")
+        return []
+    except json.JSONDecodeError:
+        print(f"Ошибка чтения JSON файла {json_file}")
+        return []
+
+
+def get_filename_from_url(url):
+    """Извлекает имя файла из URL"""
+    parsed = urlparse(url)
+    return os.path.basename(parsed.path)
+
+
+def get_code(filename):
+    """Код набора данных по имени файла: DEMO_J.xpt -> DEMO_J"""
+    return os.path.splitext(filename)[0].upper()
+
+
+def get_cycle_suffix(code):
+    """Суффикс цикла по коду: DEMO_J -> J, P_DEMO -> P, DEMO и KIQ_P -> '' (1999-2000)"""
+    return split_code(code)[1]
+
+
+def select_links(links, cycles=None, components=None, patterns=None):
+    """Отбирает ссылки по суффиксам циклов, префиксам компонентов и glob-маскам"""
+    cycles = {c.upper().lstrip('_') for c in cycles or []}
+    if 'NONE' in cycles:
+        cycles.discard('NONE')
+        cycles.add('')
+    components = [c.upper() for c in components or []]
+    patterns = [p.upper() for p in patterns or []]
+
+    selected = []
+    for url in links:
+        filename = get_filename_from_url(url)
+        code = get_code(filename)
+        if cycles and get_cycle_suffix(code) not in cycles:
+            continue
+        # Префикс компонента ищем и без приставки P_ у файлов 2017-2020
+        bare_code = code[2:] if code.startswith('P_') else code
+        if components and not any(code.startswith(c) or bare_code.startswith(c) for c in components):
+            continue
+        if patterns and not any(fnmatch.fnmatchcase(filename.upper(), p) for p in patterns):
+            continue
+        selected.append(url)
+    return selected
+
+
+def fetch_size(url):
+    """Размер файла по HEAD запросу (None, если сервер его не сообщает)"""
+    try:
+        response = http_client.head(url)
+        if response.ok and response.headers.get('Content-Length'):
+            return int(response.headers['Content-Length'])
+    except (requests.exceptions.RequestException, ValueError):
+        pass
+    return None
+
+
+def fetch_sizes(urls, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST, host_delay=DEFAULT_HOST_DELAY):
+    """Параллельно запрашивает размеры файлов, с лимитами на хост как у загрузки"""
+    engine = DownloadEngine(None, workers=workers, per_host=per_host, host_delay=host_delay)
+    return engine.map(fetch_size, urls)
+
+
+def schedule_largest_first(urls, sizes):
+    """Сначала самые большие файлы, чтобы хвост параллельной загрузки был коротким.
+
+    Файлы неизвестного размера идут последними, порядок каталога сохраняется.
+    """
+    return sorted(urls, key=lambda url: -(sizes.get(url) or -1))
+
+
+def format_size(nbytes):
+    if nbytes is None:
+        return '?'
+    return f"{nbytes / 1024 / 1024:.2f} MB"
+
+
+def download_file(url, filepath, manifest=None, conditional=True, store=None, db=None):
+    """Скачивает файл по URL (условно, если передан манифест синхронизации).
+
+    С хранилищем BlobStore файл дополнительно появляется в раскладке
+    NHANESDataManager (nhanes_data/...), если менеджер знает этот набор.
+    Результат записывается в журнал загрузок CatalogDB, если он передан.
+    """
+    filename = os.path.basename(filepath)
+    code = get_code(filename)
+    kind = os.path.splitext(filename)[1].lstrip('.').lower()
+    try:
+        result = download_to_path(url, filepath, timeout=30, manifest=manifest,
+                                  conditional=conditional, store=store)
+
+        if result.not_modified:
+            return True, f"Файл {filename} не изменился", 0, True
+        view = manager_view_path(filename)
+        if store is not None and view is not None:
+            store.link_view(result.sha256, view)
+        if db is not None:
+            db.record_file(code, kind, filepath, result.size, result.sha256)
+        return True, f"Файл {filename} успешно загружен", result.size, False
+    except requests.exceptions.RequestException as e:
+        message = f"Ошибка загрузки {filename}: {str(e)}"
+    except Exception as e:
+        message = f"Неизвестная ошибка для {filename}: {str(e)}"
+    if db is not None:
+        db.record_file(code, kind, filepath, status='error', error=message)
+    return False, message, 0, False
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Неинтерактивная загрузка файлов NHANES из каталога ссылок")
+    parser.add_argument('--kind', choices=sorted(KINDS), default='xpt',
+                        help="Тип файлов: xpt (данные) или htm (документация)")
+    parser.add_argument('--catalog',
+                        help="JSON каталог ссылок или база *.db (по умолчанию JSON, зависит от --kind)")
+    parser.add_argument('--dest', help="Папка для загрузок (по умолчанию зависит от --kind)")
+    parser.add_argument('--cycle', action='append', metavar='SUFFIX',
+                        help="Суффикс цикла: J, _H, P; 'none' для файлов 1999-2000 без суффикса")
+    parser.add_argument('--component', action='append', metavar='PREFIX',
+                        help="Префикс кода набора данных: DEMO, DR1, BPX...")
+    parser.add_argument('--glob', action='append', metavar='PATTERN',
+                        help="Маска имени файла, например 'DR?IFF_*'")
+    parser.add_argument('--limit', type=int, help="Скачать не больше N файлов")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Параллельных загрузок")
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST,
+                        help="Параллельных запросов к одному хосту")
+    parser.add_argument('--host-delay', type=float, default=DEFAULT_HOST_DELAY,
+                        help="Пауза между запросами к одному хосту, сек")
+    parser.add_argument('--manifest', default=MANIFEST_FILE, help="Файл манифеста синхронизации")
+    parser.add_argument('--db', default=CATALOG_DB, help="База каталога с журналом загрузок")
+    parser.add_argument('--force', action='store_true',
+                        help="Перекачать файлы без условных запросов по манифесту")
+    parser.add_argument('--store', default=STORE_DIR,
+                        help="Контентно-адресуемое хранилище (sha256) для скачанных файлов")
+    parser.add_argument('--no-store', action='store_true',
+                        help="Писать файлы напрямую, без хранилища и ссылок")
+    parser.add_argument('--no-sizes', action='store_true',
+                        help="Не запрашивать размеры (HEAD) и не сортировать по размеру")
+    parser.add_argument('--metrics-json', default=METRICS_JSON,
+                        help="JSON отчет о таймингах запросов (connect, TLS, TTFB, передача, запись)")
+    parser.add_argument('--prometheus', metavar='PATH',
+                        help="Также записать метрики в формате Prometheus (*.prom для textfile collector)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Только показать план загрузки с оценкой объема")
+    return parser
+
+
+def plan_downloads(args, catalog):
+    """Отбирает ссылки по фильтрам из args и упорядочивает их для загрузки.
+
+    Возвращает (urls, sizes) или None, если каталог пуст или не прочитан.
+    """
+    links = load_links_from_json(catalog, args.kind)
+    if not links:
+        print("Нет ссылок для загрузки")
+        return None
+
+    urls = select_links(links, args.cycle, args.component, args.glob)
+    if args.limit is not None:
+        urls = urls[:args.limit]
+    print(f"Выбрано {len(urls)} из {len(links)} файлов каталога {catalog}")
+
+    http_client.configure(pool_size=max(args.workers, args.per_host))
+
+    sizes = {}
+    if urls and not args.no_sizes:
+        print("Запрашиваем размеры файлов (HEAD)...")
+        sizes = fetch_sizes(urls, args.workers, args.per_host, args.host_delay)
+        urls = schedule_largest_first(urls, sizes)
+
+    known = [sizes[url] for url in urls if sizes.get(url) is not None]
+    if sizes:
+        print(f"Оценка объема: {format_size(sum(known))} "
+              f"(размер известен для {len(known)} из {len(urls)} файлов)")
+    return urls, sizes
+
+
+def print_plan(urls, sizes):
+    print("\nПлан загрузки:")
+    for i, url in enumerate(urls, 1):
+        print(f"  {i:>5}. {format_size(sizes.get(url)):>12}  {get_filename_from_url(url)}")
+
+
+def write_metrics(args):
+    """Сохраняет метрики прогона: JSON всегда, Prometheus - если указан путь"""
+    metrics.recorder.write_json(args.metrics_json)
+    print(f"Метрики запросов: {args.metrics_json}")
+    if args.prometheus:
+        metrics.recorder.write_prometheus(args.prometheus)
+        print(f"Метрики Prometheus: {args.prometheus}")
+    for line in metrics.recorder.summary():
+        print(f"  {line}")
+
+
+def print_download_summary(stats, dest):
+    print("=== Загрузка завершена ===")
+    print(f"Успешно загружено: {stats.successful}")
+    print(f"Не изменились на сервере: {stats.skipped}")
+    print(f"Ошибок: {stats.failed}")
+    for line in stats.summary():
+        print(line)
+    print(f"Файлы сохранены в: {dest}")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    kind = KINDS[args.kind]
+    catalog = args.catalog or kind['catalog']
+    dest = args.dest or kind['dest']
+
+    print(f"=== Загрузчик {kind['title']} файлов NHANES ===\n")
+
+    metrics.recorder.reset()
+    plan = plan_downloads(args, catalog)
+    if plan is None:
+        return 1
+    urls, sizes = plan
+    if not urls:
+        return 0
+
+    if args.dry_run:
+        print_plan(urls, sizes)
+        return 0
+
+    Path(dest).mkdir(parents=True, exist_ok=True)
+    manifest = SyncManifest(args.manifest)
+    store = None if args.no_store else BlobStore(args.store)
+    db = CatalogDB(args.db)
+    print(f"Папка для загрузок: {dest}")
+    print(f"\nНачинаем загрузку {len(urls)} файлов (потоков: {args.workers}, на хост: {args.per_host})...\n")
+
+    def fetch(url, filename):
+        return download_file(url, os.path.join(dest, filename), manifest, conditional=not args.force,
+                             store=store, db=db)
+
+    def report(i, total, url, filename, success, message):
+        print(f"[{i}/{total}] {'✓' if success else '✗'} {message}")
+
+    tasks = [(url, get_filename_from_url(url)) for url in urls]
+    engine = DownloadEngine(fetch, workers=args.workers, per_host=args.per_host, host_delay=args.host_delay)
+    try:
+        stats = engine.run(tasks, on_result=report)
+    finally:
+        manifest.save()
+        db.close()
+
+    print_download_summary(stats, dest)
+    write_metrics(args)
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,10 @@ import json
 from pathlib import Path
 import base64
 
+from catalog_db import CatalogDB
+from columnar_store import load_frame
+from search_index import refresh_index, search
+
 st.markdown("""
     <style>
     [data-testid="stToolbar"] {visibility: hidden !important;}
@@ -53,11 +57,11 @@ def get_file_path(data_type, code):
     return file_path if file_path.exists() else None
 
 def load_csv_file(code):
-    """Загрузить CSV файл"""
+    """Загрузить CSV файл (или его Parquet копию, если она есть: без разбора текста)"""
     file_path = get_file_path('csv', code)
     if file_path:
         try:
-            df = pd.read_csv(file_path)
+            df = load_frame(file_path)
             return df
         except Exception as e:
             st.error(f"Ошибка загрузки CSV файла: {e}")
@@ -88,6 +92,42 @@ def load_htm_file(code):
             return None
     return None
 
+@st.cache_resource
+def get_catalog_db():
+    """База каталога с индексом кодовых книг (codebook_index.py build)"""
+    return CatalogDB()
+
+def load_codebook(variable=None, code=None):
+    """Кодовые книги из индекса: переменная во всех наборах или все переменные набора"""
+    try:
+        return get_catalog_db().codebook(variable, code)
+    except Exception as e:
+        st.error(f"Ошибка чтения индекса кодовых книг: {e}")
+        return []
+
+def show_codebook(variable):
+    """Показать описание переменной и таблицу ее значений"""
+    st.markdown(f"**{variable['code']}.{variable['variable']}** — {variable['sas_label'] or ''}")
+    if variable['english_text']:
+        st.caption(variable['english_text'])
+    if variable['target']:
+        st.write(f"**Целевая группа:** {variable['target']}")
+    if variable['values']:
+        values = pd.DataFrame(variable['values']).rename(columns={
+            'value': 'Код или значение', 'description': 'Описание', 'count': 'Количество',
+            'cumulative': 'Накопленно', 'skip_to': 'Переход к'})
+        st.dataframe(values, use_container_width=True, hide_index=True)
+
+def search_catalog(query):
+    """Полнотекстовый поиск по каталогу; индекс догоняет изменения базы перед запросом"""
+    try:
+        db = get_catalog_db()
+        refresh_index(db)
+        return search(db, query)
+    except Exception as e:
+        st.error(f"Ошибка поиска по каталогу: {e}")
+        return []
+
 def create_download_link(df, filename):
     """Создать ссылку для скачивания DataFrame как CSV"""
     csv = df.to_csv(index=False, encoding='utf-8')
@@ -105,6 +145,39 @@ def main():
     # Боковая панель для навигации
     st.sidebar.title(":material/explore: Навигация")
 
+    # Полнотекстовый поиск по наборам данных и переменным
+    search_query = st.sidebar.text_input(
+        "Поиск по каталогу:",
+        help="Слова или их начала на русском или английском: глюкоза, gluc, DEMO_J, RIAGENDR"
+    ).strip()
+    if search_query:
+        found = search_catalog(search_query)
+        with st.expander(f":material/search: «{search_query}»: найдено {len(found)}", expanded=True):
+            if not found:
+                st.info("Ничего не найдено")
+            else:
+                results = pd.DataFrame([{
+                    'Код': row['code'],
+                    'Переменная': row['variable'] or '',
+                    'Годы': row['years'],
+                    'Описание': row['label'] if row['variable'] else (row['title_ru'] or row['title']),
+                } for row in found])
+                st.dataframe(results, use_container_width=True, hide_index=True)
+
+    # Поиск переменной по индексу кодовых книг
+    variable_query = st.sidebar.text_input(
+        "Поиск переменной:",
+        help="Имя переменной, например RIAGENDR: кодовая книга во всех наборах данных"
+    ).strip()
+    if variable_query:
+        found = load_codebook(variable=variable_query)
+        with st.expander(f":material/menu_book: Переменная {variable_query.upper()}: найдено в {len(found)} наборах",
+                         expanded=True):
+            if not found:
+                st.info("Переменная не найдена в индексе кодовых книг")
+            for variable in found:
+                show_codebook(variable)
+
     # Выбор года
     years = list(nhanes_data.keys())
     selected_year = st.sidebar.selectbox(
@@ -170,6 +243,7 @@ def main():
                         csv_exists = get_file_path('csv', code) is not None
                         txt_exists = get_file_path('txt', code) is not None
                         htm_exists = get_file_path('htm', code) is not None
+                        codebook = load_codebook(code=code)
 
                         if csv_exists:
                             st.success(":material/check_circle: CSV данные")
@@ -187,12 +261,14 @@ def main():
                             st.warning(":material/cancel: Оригинальное описание недоступно")
 
                     # Табы для разных типов контента
-                    if csv_exists or txt_exists or htm_exists:
+                    if csv_exists or txt_exists or htm_exists or codebook:
                         tab_names = []
                         if csv_exists:
                             tab_names.append(":material/table_chart: Данные (CSV)")
                         if txt_exists:
                             tab_names.append(":material/description: Метаданные (TXT)")
+                        if codebook:
+                            tab_names.append(":material/menu_book: Кодовая книга")
                         if htm_exists:
                             tab_names.append(":material/public: Подробное описание (HTM)")
 
@@ -251,6 +327,17 @@ def main():
 
                                 tab_index += 1
 
+                            # Вкладка кодовой книги из индекса
+                            if codebook:
+                                with tabs[tab_index]:
+                                    st.subheader(":material/menu_book: Кодовая книга")
+                                    names = [f"{v['variable']}: {v['sas_label'] or ''}" for v in codebook]
+                                    selected = st.selectbox("Переменная:", range(len(codebook)),
+                                                            format_func=lambda i: names[i])
+                                    show_codebook(codebook[selected])
+
+                                tab_index += 1
+
                             # Вкладка HTM описания
                             if htm_exists:
                                 with tabs[tab_index]:
@@ -3,7 +3,10 @@
 
 import streamlit as st
 import pandas as pd
-import requests
+from blob_store import BlobStore
+from download_engine import download_to_path
+from xpt_dispatch import plan_readers
+import columnar_store
 import io
 import os
 from datetime import datetime
@@ -30,6 +33,7 @@ class NHANESDataManager:
         self.base_url = "https://ftp.cdc.gov/pub/health_statistics/nchs/nhanes/continuousnhanes"
         self.data_dir = Path("nhanes_data")
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.store = BlobStore()
 
         # Структура данных NHANES
         self.cycles = {
@@ -102,25 +106,15 @@ class NHANESDataManager:
     def download_xpt_file(self, url, local_path):
         """Скачать XPT файл"""
         try:
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
-
-            # Check if the response is HTML (error page)
-            content_type = response.headers.get('content-type', '').lower()
-            if 'text/html' in content_type:
-                logger.error(f"URL {url} returned HTML instead of XPT file")
-                return False
-
-            with open(local_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            # Файл кладется в общее хранилище по sha256, а local_path - ссылка на него
+            result = download_to_path(url, local_path, timeout=30, store=self.store)
 
             # Validate that the downloaded file is actually an XPT file
+            # (an HTML error page is not)
             if not self._is_valid_xpt_file(local_path):
                 logger.error(f"Downloaded file {local_path} is not a valid XPT file")
                 # Remove the invalid file
-                if local_path.exists():
-                    local_path.unlink()
+                self.store.discard(result.sha256, local_path)
                 return False
 
             return True
@@ -145,30 +139,50 @@ class NHANESDataManager:
 
     def xpt_to_dataframe(self, xpt_path):
         """Преобразовать XPT файл в DataFrame"""
+        # Parquet копия рядом с XPT читается без разбора XPT
+        cached = columnar_store.fresh_columnar(xpt_path)
+        if cached is not None:
+            try:
+                return columnar_store.read_frame(cached)
+            except Exception as e:
+                logger.warning(f"Parquet копия {cached} не читается: {e}")
+        # Читатели выбираются по заголовку файла, HTML и пустые файлы не разбираются
         try:
-            # Try pandas read_sas first
-            df = pd.read_sas(xpt_path, format='xport')
-            return df
-        except Exception as e1:
-            logger.warning(f"Pandas read_sas failed for {xpt_path}: {e1}")
+            fmt, readers = plan_readers(xpt_path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Не XPT файл {xpt_path}: {e}")
+            return None
+        errors = []
+        for name in readers:
             try:
-                # Try alternative: pyreadstat
-                import pyreadstat
-                df, meta = pyreadstat.read_xport(str(xpt_path))
-                logger.info(f"Successfully read {xpt_path} with pyreadstat")
-                return df
-            except Exception as e2:
-                logger.warning(f"Pyreadstat failed for {xpt_path}: {e2}")
-                try:
-                    # Try alternative: sas7bdat
+                if name == 'xport_reader':
+                    from xport_reader import read_xport
+                    df, meta = read_xport(xpt_path)
+                elif name == 'pandas':
+                    df = pd.read_sas(xpt_path, format='xport', encoding='latin-1')
+                elif name == 'pyreadstat':
+                    import pyreadstat
+                    df, meta = pyreadstat.read_xport(str(xpt_path))
+                else:
                     from sas7bdat import SAS7BDAT
                     with SAS7BDAT(str(xpt_path)) as f:
                         df = f.to_data_frame()
-                    logger.info(f"Successfully read {xpt_path} with sas7bdat")
-                    return df
-                except Exception as e3:
-                    logger.error(f"All methods failed for {xpt_path}: pandas({e1}), pyreadstat({e2}), sas7bdat({e3})")
-                    return None
+                logger.info(f"Successfully read {xpt_path} ({fmt}) with {name}")
+                return self._cache_columnar(xpt_path, df)
+            except Exception as e:
+                logger.warning(f"{name} failed for {xpt_path}: {e}")
+                errors.append(f"{name}({e})")
+        logger.error(f"All methods failed for {xpt_path}: {', '.join(errors)}")
+        return None
+
+    def _cache_columnar(self, xpt_path, df):
+        """Сохранить Parquet копию рядом с XPT, чтобы следующий экспорт не разбирал XPT"""
+        if columnar_store.available():
+            try:
+                columnar_store.write_parquet(df, columnar_store.columnar_path(xpt_path))
+            except Exception as e:
+                logger.warning(f"Не удалось записать Parquet копию {xpt_path}: {e}")
+        return df
 
     def download_all_data(self, progress_callback=None):
         """Скачать все данные NHANES"""
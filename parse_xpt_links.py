@@ -1,6 +1,9 @@
-import requests
-from bs4 import BeautifulSoup
+import argparse
 import json
+import time
+
+import http_client
+from link_extractor import iter_links
 
 # URL страницы NHANES с файлами XPT
 url = "https://wwwn.cdc.gov/nchs/nhanes/search/datapage.aspx?utm_source=chatgpt.com"
@@ -10,32 +13,94 @@ headers = {
     "User-Agent": "Mozilla/5.0"
 }
 
-# Получаем страницу
-response = requests.get(url, headers=headers)
-response.raise_for_status()
-
-# Парсим HTML
-soup = BeautifulSoup(response.text, "html.parser")
-
-# Ищем все ссылки на XPT файлы
-xpt_links = []
-for link in soup.find_all('a', href=True):
-    href = link['href']
-    if href.lower().endswith('.xpt'):
-        # Преобразуем относительный путь к абсолютному
-        if href.startswith('/'):
-            full_url = "https://wwwn.cdc.gov" + href
-        else:
-            full_url = href
-        xpt_links.append(full_url)
-
-# Сохраняем в JSON файл
-data = {
-    "total_links": len(xpt_links),
-    "links": xpt_links
-}
+OUTPUT_JSON = 'nhanes_xpt_links.json'
+DETAILS_JSON = 'nhanes_xpt_details.json'
+STREAM_CHUNK = 64 * 1024
+
+
+def stream_records(page_url=url):
+    """Скачивает страницу потоком и отдает записи о ссылках по мере разбора"""
+    with http_client.get(page_url, headers=headers, stream=True) as response:
+        response.raise_for_status()
+        if response.encoding is None:
+            response.encoding = 'utf-8'
+        yield from iter_links(response.iter_content(chunk_size=STREAM_CHUNK, decode_unicode=True))
+
+
+def bs4_links(html):
+    """Прежний способ: полное дерево BeautifulSoup (оставлен для сравнения)"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    xpt_links = []
+    for link in soup.find_all('a', href=True):
+        href = link['href']
+        if href.lower().endswith('.xpt'):
+            # Преобразуем относительный путь к абсолютному
+            if href.startswith('/'):
+                full_url = "https://wwwn.cdc.gov" + href
+            else:
+                full_url = href
+            xpt_links.append(full_url)
+    return xpt_links
+
+
+def benchmark(html_file, repeat=5):
+    """Сравнивает потоковый разбор с BeautifulSoup на сохраненной странице"""
+    with open(html_file, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    def best_of(func):
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - started)
+        return min(times), result
+
+    chunks = [html[i:i + STREAM_CHUNK] for i in range(0, len(html), STREAM_CHUNK)]
+    stream_time, records = best_of(lambda: list(iter_links(chunks)))
+    bs4_time, links = best_of(lambda: bs4_links(html))
+
+    print(f"Страница: {html_file} ({len(html) / 1024:.0f} KB), лучший из {repeat} прогонов")
+    print(f"  BeautifulSoup: {bs4_time * 1000:.1f} мс, ссылок: {len(links)}")
+    print(f"  Потоковый:     {stream_time * 1000:.1f} мс, ссылок: {len(records)}")
+    print(f"  Ускорение: {bs4_time / stream_time:.1f}x")
+    if [record['url'] for record in records] != links:
+        print("  ВНИМАНИЕ: списки ссылок различаются!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сбор ссылок на XPT файлы со страницы NHANES")
+    parser.add_argument('--url', default=url, help="Страница со списком файлов")
+    parser.add_argument('--output', default=OUTPUT_JSON, help="JSON со списком ссылок")
+    parser.add_argument('--details', default=DETAILS_JSON,
+                        help="JSON с контекстом каждой ссылки (цикл, файл, документация, дата)")
+    parser.add_argument('--benchmark', metavar='HTML',
+                        help="Сравнить скорость с BeautifulSoup на сохраненной странице и выйти")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+
+    records = list(stream_records(args.url))
+    xpt_links = [record['url'] for record in records]
+
+    # Сохраняем в JSON файл
+    data = {
+        "total_links": len(xpt_links),
+        "links": xpt_links
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+    with open(args.details, 'w', encoding='utf-8') as f:
+        json.dump({"total_links": len(records), "records": records}, f, indent=2, ensure_ascii=False)
+
+    print(f"Найдено {len(xpt_links)} ссылок. Данные сохранены в {args.output}, контекст - в {args.details}")
 
-with open('nhanes_xpt_links.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
 
-print(f"Найдено {len(xpt_links)} ссылок. Данные сохранены в nhanes_xpt_links.json")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import metrics
+import nhanes_download
+from conversion_journal import ConversionJournal
+from convert_xpt_to_csv import (CHUNK_ROWS, PANDAS_IBM_ZERO, WRITE_PARQUET, convert_file, journal_key, partial_path,
+                                remove_partials)
+from columnar_store import columnar_path
+from describe_xpt import describe_xpt_file
+from blob_store import BlobStore
+from catalog_db import CatalogDB
+from download_engine import DownloadEngine
+from sync_manifest import SyncManifest
+
+# Настройки по умолчанию
+CSV_DIR = 'csv'
+CONVERT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+
+def output_paths(xpt_file, csv_dir, txt_dir, parquet=WRITE_PARQUET):
+    """Выходы конвейера для одного XPT: CSV, Parquet копия (если пишется) и описание .txt"""
+    csv_file = Path(csv_dir) / Path(xpt_file).with_suffix('.csv').name
+    txt_file = Path(txt_dir) / Path(xpt_file).with_suffix('.txt').name
+    return [csv_file] + ([columnar_path(csv_file)] if parquet else []) + [txt_file]
+
+
+def process_xpt(xpt_path, csv_dir, txt_dir, parquet=WRITE_PARQUET, chunksize=CHUNK_ROWS):
+    """Стадии convert и describe для одного файла.
+
+    Выполняется в процессе-обработчике. Конвертация - convert_xpt_to_csv.convert_file:
+    XPT читается потоком по chunksize строк (0 - целиком), так что память
+    обработчика ограничена одним куском; CSV и Parquet пишутся во временные
+    *.part и переименовываются только целиком. Файл разбирается один раз:
+    метаданные и первые строки для описания convert_file возвращает вместе
+    с результатом; описание тоже пишется через .part.
+    """
+    xpt_file = Path(xpt_path)
+    started = time.monotonic()
+    csv_file, *_, txt_file = output_paths(xpt_file, csv_dir, txt_dir, parquet)
+    log = []
+    result = convert_file(xpt_file, csv_file, chunksize, log=log.append, parquet=parquet, preview=True)
+    if result['error']:
+        return result
+    head, meta = result.pop('head'), result.pop('meta')
+    if result['reader'] == 'pandas':
+        # Предпросмотр как у describe_xpt.py (pyreadstat): ноль - 0.0, а не 5.4e-79
+        head = head.replace(PANDAS_IBM_ZERO, 0.0)
+    txt_part = partial_path(txt_file)
+    try:
+        with open(txt_part, 'w', encoding='utf-8') as f:
+            f.write(describe_xpt_file(xpt_file, head, meta, rows=result['rows']))
+        os.replace(txt_part, txt_file)
+    except Exception as e:
+        if txt_part.exists():
+            txt_part.unlink()
+        result['error'] = f"describe: {e}"
+    result.update(seconds=time.monotonic() - started, csv=str(csv_file), txt=str(txt_file),
+                  parquet=result['parquet'] and str(result['parquet']))
+    return result
+
+
+class ConversionPool:
+    """Пул процессов для process_xpt, переживающий падение обработчика.
+
+    Падение процесса (segfault в C-читателе, убийство по памяти) ломает
+    ProcessPoolExecutor целиком: BrokenProcessPool получают все его
+    незавершенные задачи и все следующие submit. Тогда пул создается
+    заново, а задачи, попавшие под падение, повторяются каждая в своем
+    отдельном процессе (не больше workers одновременно): упавшая там
+    записывается как ошибка своего файла и больше никого не задевает.
+    """
+
+    def __init__(self, workers):
+        self.workers = max(1, workers)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.pending = {}  # future -> (имя файла, функция, аргументы)
+        self.suspects = []  # задачи из сломанного пула, ждущие повтора
+        self.isolated = {}  # future -> (имя файла, executor на один процесс)
+
+    def submit(self, filename, fn, *args):
+        try:
+            future = self.executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self.executor.shutdown(wait=False)
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            future = self.executor.submit(fn, *args)
+        self.pending[future] = (filename, fn, args)
+
+    def _isolate(self):
+        while self.suspects and len(self.isolated) < self.workers:
+            filename, fn, args = self.suspects.pop()
+            executor = ProcessPoolExecutor(max_workers=1)
+            self.isolated[executor.submit(fn, *args)] = (filename, executor)
+
+    def results(self):
+        """Результаты по мере готовности, включая отправленные во время обхода"""
+        while self.pending or self.suspects or self.isolated:
+            self._isolate()
+            done, _ = wait(list(self.pending) + list(self.isolated), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in self.isolated:
+                    filename, executor = self.isolated.pop(future)
+                    executor.shutdown(wait=False)
+                else:
+                    filename, fn, args = self.pending.pop(future)
+                    executor = None
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    if executor is None:
+                        self.suspects.append((filename, fn, args))
+                        continue
+                    yield failed_result(filename, "worker crashed")
+                except Exception as e:
+                    yield failed_result(filename, str(e) or type(e).__name__)
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+
+def failed_result(filename, error):
+    """Результат process_xpt для файла, обработчик которого не вернул результат"""
+    return {'file': filename, 'rows': 0, 'columns': 0, 'seconds': 0.0, 'error': error,
+            'parquet': None, 'labels': None}
+
+
+def build_parser():
+    parser = nhanes_download.build_parser()
+    parser.description = "Конвейер download -> convert -> describe для XPT файлов NHANES"
+    parser.set_defaults(kind='xpt')
+    parser.add_argument('--csv-dir', default=CSV_DIR, help="Папка для CSV")
+    parser.add_argument('--txt-dir', help="Папка для описаний .txt (по умолчанию рядом с XPT)")
+    parser.add_argument('--convert-workers', type=int, default=CONVERT_WORKERS,
+                        help="Процессов для конвертации и описания")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS,
+                        help="Строк в куске при потоковой конвертации; 0 - читать файл целиком")
+    parser.add_argument('--reconvert', action='store_true',
+                        help="Конвертировать и файлы, которые журнал конвертации считает актуальными")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.kind != 'xpt':
+        print("Конвейер работает только с XPT файлами (--kind xpt)")
+        return 2
+    kind = nhanes_download.KINDS['xpt']
+    catalog = args.catalog or kind['catalog']
+    dest = args.dest or kind['dest']
+    txt_dir = args.txt_dir or dest
+
+    print("=== Конвейер NHANES: загрузка -> CSV -> описание ===\n")
+
+    metrics.recorder.reset()
+    plan = nhanes_download.plan_downloads(args, catalog)
+    if plan is None:
+        return 1
+    urls, sizes = plan
+    if not urls:
+        return 0
+    if args.dry_run:
+        nhanes_download.print_plan(urls, sizes)
+        return 0
+
+    for directory in (dest, args.csv_dir, txt_dir):
+        Path(directory).mkdir(parents=True, exist_ok=True)
+    manifest = SyncManifest(args.manifest)
+    store = None if args.no_store else BlobStore(args.store)
+    db = CatalogDB(args.db)
+    # Тот же журнал, что у convert_xpt_to_csv.py: XPT с тем же хэшем и
+    # целыми выходами не конвертируется повторно, прерванный запуск продолжается
+    remove_partials(args.csv_dir)
+    remove_partials(txt_dir, '*.txt')
+    journal = ConversionJournal(args.csv_dir, journal_key(WRITE_PARQUET))
+    snapshots = {}
+
+    def fetch(url, filename):
+        return nhanes_download.download_file(url, os.path.join(dest, filename), manifest,
+                                             conditional=not args.force, store=store, db=db)
+
+    pool = ConversionPool(args.convert_workers)
+    converted = 0
+    errors = 0
+    try:
+        def on_downloaded(i, total, url, filename, success, message):
+            # Вызывается в основном потоке сразу по завершении загрузки:
+            # конвертация этого файла идет параллельно с остальными загрузками
+            print(f"[{i}/{total}] {'✓' if success else '✗'} {message}")
+            if not success:
+                return
+            xpt_path = os.path.join(dest, filename)
+            up_to_date, snapshots[filename] = journal.check(xpt_path, output_paths(xpt_path, args.csv_dir, txt_dir))
+            if up_to_date and not args.reconvert:
+                return
+            pool.submit(filename, process_xpt, xpt_path, args.csv_dir, txt_dir, WRITE_PARQUET, args.chunksize)
+
+        engine = DownloadEngine(fetch, workers=args.workers, per_host=args.per_host, host_delay=args.host_delay)
+        try:
+            stats = engine.run([(url, nhanes_download.get_filename_from_url(url)) for url in urls],
+                               on_result=on_downloaded)
+        finally:
+            manifest.save()
+        nhanes_download.print_download_summary(stats, dest)
+
+        print(f"\nОжидаем завершения конвертации ({len(pool.pending)} файлов)...")
+        for result in pool.results():
+            metrics.recorder.record_stage('convert_describe', result['seconds'], result['rows'],
+                                          error=bool(result['error']))
+            code = nhanes_download.get_code(result['file'])
+            if result['error']:
+                errors += 1
+                db.record_file(code, 'csv', Path(args.csv_dir) / Path(result['file']).with_suffix('.csv').name,
+                               status='error', error=result['error'])
+                print(f"✗ {result['file']}: {result['error']}")
+            else:
+                converted += 1
+                db.record_file(code, 'csv', result['csv'], os.path.getsize(result['csv']))
+                db.record_file(code, 'txt', result['txt'], os.path.getsize(result['txt']))
+                if result['parquet']:
+                    db.record_file(code, 'parquet', result['parquet'], os.path.getsize(result['parquet']))
+                if result['labels']:
+                    db.replace_xpt_columns(code, *result['labels'])
+                xpt_path = os.path.join(dest, result['file'])
+                journal.record(xpt_path, output_paths(xpt_path, args.csv_dir, txt_dir), snapshots[result['file']])
+                print(f"✓ {result['file']}: {result['rows']:,} строк, {result['seconds']:.1f} с")
+    finally:
+        pool.shutdown()
+        db.close()
+        journal.compact()
+        nhanes_download.write_metrics(args)
+    print("=== Конвейер завершен ===")
+    print(f"Сконвертировано и описано: {converted}")
+    print(f"Ошибок конвертации: {errors}")
+    return 1 if stats.failed or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
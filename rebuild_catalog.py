@@ -0,0 +1,41 @@
+import argparse
+import time
+
+import add_russian_translations
+import catalog_builder
+import get_htm_info
+import sort_json
+from build_manifest import BUILD_MANIFEST
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Инкрементальная пересборка htm_info.json -> nhanes_grouped.json -> переводы и представления")
+    parser.add_argument('--htm-dir', default=get_htm_info.HTM_DIR, help="Папка с HTM файлами")
+    parser.add_argument('--manifest', default=BUILD_MANIFEST, help="Манифест инкрементальной сборки")
+    parser.add_argument('--full', action='store_true', help="Пересобрать все стадии с нуля")
+    args = parser.parse_args(argv)
+
+    common = ['--manifest', args.manifest] + (['--full'] if args.full else [])
+    stages = [
+        ('htm_info', lambda: get_htm_info.main(['--htm-dir', args.htm_dir] + common)),
+        ('grouped', lambda: sort_json.main(common)),
+        ('translations', lambda: add_russian_translations.add_russian_translations(
+            manifest_path=args.manifest, full=args.full)),
+        ('views', lambda: catalog_builder.main(common)),
+    ]
+    timings = []
+    started = time.perf_counter()
+    for name, run in stages:
+        stage_started = time.perf_counter()
+        run()
+        timings.append((name, time.perf_counter() - stage_started))
+
+    print("\n=== Пересборка завершена ===")
+    for name, seconds in timings:
+        print(f"  {name}: {seconds * 1000:.0f} мс")
+    print(f"Всего: {(time.perf_counter() - started) * 1000:.0f} мс")
+
+
+if __name__ == "__main__":
+    main()
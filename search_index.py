@@ -0,0 +1,327 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+from catalog_db import CatalogDB, CATALOG_DB
+
+# Настройки
+XPT_DIR = 'downloads/xpt_files'
+SEARCH_LIMIT = 50
+# Версия правил нормализации: при смене стеммера индекс пересобирается целиком
+INDEX_VERSION = '1'
+# Веса столбцов для bm25: совпадение по коду и имени переменной важнее текста
+BM25_WEIGHTS = (10.0, 10.0, 1.0)
+# Множитель оценки документа набора данных: длинный текст набора не должен
+# уступать его же переменным при поиске по коду
+DATASET_BOOST = 2.0
+
+# Индекс живет в той же базе каталога. Триггеры помечают коды, у которых
+# изменились заголовки, переводы, кодовые книги или столбцы XPT; обновление
+# индекса переиндексирует только помеченные коды.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+    code, variable, body,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+CREATE TABLE IF NOT EXISTS search_docs (
+    docid INTEGER PRIMARY KEY,
+    code TEXT NOT NULL,
+    variable TEXT
+);
+CREATE INDEX IF NOT EXISTS search_docs_code ON search_docs(code);
+CREATE TABLE IF NOT EXISTS search_dirty (
+    code TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS search_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS search_dirty_{table}_{event} AFTER {event} ON {table}
+BEGIN INSERT OR IGNORE INTO search_dirty(code) VALUES ({row}.code); END;
+"""
+SEARCH_TRIGGERS = ''.join(
+    _TRIGGER.format(table=table, event=event, row='OLD' if event == 'DELETE' else 'NEW')
+    for table in ('datasets', 'variables', 'xpt_columns')
+    for event in ('INSERT', 'UPDATE', 'DELETE'))
+
+# --- Русский стеммер (алгоритм Snowball для русского языка) ---
+
+_VOWELS = 'аеиоуыэюя'
+_PERFECTIVE_GERUND = (('в', 'вши', 'вшись'), ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'))
+_ADJECTIVE = ('ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом',
+              'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею')
+_PARTICIPLE = (('ем', 'нн', 'вш', 'ющ', 'щ'), ('ивш', 'ывш', 'ующ'))
+_REFLEXIVE = ('ся', 'сь')
+_VERB = (('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет', 'ют', 'ны', 'ть', 'ешь',
+          'нно'),
+         ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен',
+          'ило', 'ыло', 'ено', 'ят', 'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'))
+_NOUN = ('а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и', 'ией', 'ей', 'ой', 'ий',
+         'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю',
+         'ия', 'ья', 'я')
+_SUPERLATIVE = ('ейше', 'ейш')
+_DERIVATIONAL = ('ость', 'ост')
+_CYRILLIC = re.compile('[а-яё]')
+_TOKEN = re.compile(r'\w+')
+
+
+def _endings(groups):
+    """[(окончание, требует ли а/я перед собой)] от длинных к коротким"""
+    if isinstance(groups[0], str):
+        groups = ((), groups)
+    pairs = [(ending, True) for ending in groups[0]] + [(ending, False) for ending in groups[1]]
+    return sorted(pairs, key=lambda pair: -len(pair[0]))
+
+
+_PERFECTIVE_GERUND = _endings(_PERFECTIVE_GERUND)
+_ADJECTIVE = _endings(_ADJECTIVE)
+_PARTICIPLE = _endings(_PARTICIPLE)
+_REFLEXIVE = _endings(_REFLEXIVE)
+_VERB = _endings(_VERB)
+_NOUN = _endings(_NOUN)
+_SUPERLATIVE = _endings(_SUPERLATIVE)
+_DERIVATIONAL = _endings(_DERIVATIONAL)
+
+
+def _region(word, start=0):
+    """Начало области после первого сочетания гласная + согласная (R1/R2 Snowball)"""
+    for i in range(start + 1, len(word)):
+        if word[i] not in _VOWELS and word[i - 1] in _VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _remove(word, start, endings):
+    """Удаляет самое длинное окончание из endings, лежащее в области word[start:].
+
+    Возвращает слово без окончания или None, если окончание не найдено.
+    """
+    for ending, after_a in endings:
+        if word.endswith(ending) and len(word) - len(ending) >= start:
+            stem = word[:-len(ending)]
+            if after_a and not (len(stem) > start and stem[-1] in 'ая'):
+                return None
+            return stem
+    return None
+
+
+def stem_ru(word):
+    """Основа русского слова: глюкозы, глюкоза, глюкозе -> глюкоз"""
+    word = word.lower().replace('ё', 'е')
+    rv = next((i + 1 for i, char in enumerate(word) if char in _VOWELS), len(word))
+    r2 = _region(word, _region(word))
+
+    # Шаг 1: деепричастие, иначе возвратная частица и прилагательное/глагол/существительное
+    stem = _remove(word, rv, _PERFECTIVE_GERUND)
+    if stem is None:
+        word = _remove(word, rv, _REFLEXIVE) or word
+        stem = _remove(word, rv, _ADJECTIVE)
+        if stem is not None:
+            stem = _remove(stem, rv, _PARTICIPLE) or stem
+        else:
+            stem = _remove(word, rv, _VERB)
+            if stem is None:
+                stem = _remove(word, rv, _NOUN)
+    word = word if stem is None else stem
+
+    # Шаг 2: конечное и
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+    # Шаг 3: словообразовательный суффикс в R2
+    word = _remove(word, r2, _DERIVATIONAL) or word
+    # Шаг 4: превосходная степень, двойное н, мягкий знак
+    word = _remove(word, rv, _SUPERLATIVE) or word
+    if word.endswith('нн') and len(word) - 1 >= rv:
+        word = word[:-1]
+    elif word.endswith('ь') and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+def normalize(text):
+    """Текст для индекса: слова в нижнем регистре, русские - в виде основ"""
+    tokens = []
+    for token in _TOKEN.findall((text or '').lower()):
+        tokens.append(stem_ru(token) if _CYRILLIC.search(token) else token)
+    return ' '.join(tokens)
+
+
+def match_query(query):
+    """Запрос пользователя -> выражение FTS5: каждое слово ищется по префиксу.
+
+    Русские слова приводятся к основе, как и в индексе; коды с '_' (DEMO_J)
+    ищутся как фраза.
+    """
+    terms = []
+    for token in _TOKEN.findall(query.lower()):
+        parts = [stem_ru(part) if _CYRILLIC.search(part) else part for part in token.split('_') if part]
+        if parts:
+            terms.append('"' + ' '.join(parts) + '"*')
+    return ' '.join(terms)
+
+
+# --- Построение и обновление индекса ---
+
+def _ensure_schema(conn):
+    conn.executescript(SEARCH_SCHEMA + SEARCH_TRIGGERS)
+    row = conn.execute("SELECT value FROM search_meta WHERE key = 'version'").fetchone()
+    return row is not None and row[0] == INDEX_VERSION
+
+
+def _documents(conn, codes):
+    """Документы индекса для кодов: набор данных и каждая его переменная"""
+    for code in codes:
+        row = conn.execute(
+            'SELECT code, prefix, years, component, category, title, title_ru FROM datasets WHERE code = ?',
+            (code,)).fetchone()
+        if row is None:
+            continue
+        yield code, None, ' '.join(filter(None, [row['title'], row['title_ru'], row['category'],
+                                                 row['component'], row['years']]))
+        labels = {}
+        for variable in conn.execute(
+                'SELECT variable, title, sas_label, english_text FROM variables WHERE code = ? ORDER BY position',
+                (code,)):
+            labels[variable['variable']] = [variable['sas_label'], variable['english_text'], variable['title']]
+        for column in conn.execute('SELECT variable, label FROM xpt_columns WHERE code = ? ORDER BY position',
+                                   (code,)):
+            texts = labels.setdefault(column['variable'], [])
+            if column['label'] not in texts:
+                texts.append(column['label'])
+        for variable, texts in labels.items():
+            yield code, variable, ' '.join(filter(None, texts))
+
+
+def _reindex(conn, codes):
+    docs = 0
+    for code in codes:
+        docids = [row[0] for row in conn.execute('SELECT docid FROM search_docs WHERE code = ?', (code,))]
+        conn.executemany('DELETE FROM search_fts WHERE rowid = ?', [(docid,) for docid in docids])
+        conn.execute('DELETE FROM search_docs WHERE code = ?', (code,))
+    for code, variable, text in _documents(conn, codes):
+        docid = conn.execute('INSERT INTO search_docs(code, variable) VALUES (?, ?)', (code, variable)).lastrowid
+        conn.execute('INSERT INTO search_fts(rowid, code, variable, body) VALUES (?, ?, ?, ?)',
+                     (docid, code, variable, normalize(text)))
+        docs += 1
+    return docs
+
+
+def refresh_index(db, full=False):
+    """Переиндексирует коды, измененные с прошлого обновления (или все при full).
+
+    Возвращает (число переиндексированных кодов, число документов).
+    """
+    with db.lock, db.conn:
+        if not _ensure_schema(db.conn) or full:
+            db.conn.execute('DELETE FROM search_fts')
+            db.conn.execute('DELETE FROM search_docs')
+            db.conn.execute('DELETE FROM search_dirty')
+            codes = [row[0] for row in db.conn.execute('SELECT code FROM datasets ORDER BY code')]
+            db.conn.execute("INSERT OR REPLACE INTO search_meta(key, value) VALUES ('version', ?)",
+                            (INDEX_VERSION,))
+        else:
+            codes = [row[0] for row in db.conn.execute('SELECT code FROM search_dirty ORDER BY code')]
+            if not codes:
+                return 0, 0
+            db.conn.execute('DELETE FROM search_dirty')
+        docs = _reindex(db.conn, codes)
+    if full or len(codes) > 100:
+        with db.lock, db.conn:
+            db.conn.execute("INSERT INTO search_fts(search_fts) VALUES ('optimize')")
+    return len(codes), docs
+
+
+def search(db, query, limit=SEARCH_LIMIT):
+    """Поиск по кодам, заголовкам, переводам и меткам переменных.
+
+    Возвращает список dict: code, variable (None для набора данных), years,
+    title, title_ru, label - лучшие совпадения первыми.
+    """
+    expression = match_query(query)
+    if not expression:
+        return []
+    with db.lock:
+        rows = db.conn.execute(
+            f"""
+            SELECT d.code, d.variable, ds.years, ds.title, ds.title_ru,
+                   COALESCE(v.sas_label, x.label) AS label
+            FROM (SELECT rowid, bm25(search_fts, {', '.join(map(str, BM25_WEIGHTS))})
+                         * (CASE WHEN variable IS NULL THEN {DATASET_BOOST} ELSE 1 END) AS score
+                  FROM search_fts WHERE search_fts MATCH ? ORDER BY score, rowid LIMIT ?) AS hits
+            JOIN search_docs AS d ON d.docid = hits.rowid
+            JOIN datasets AS ds ON ds.code = d.code
+            LEFT JOIN variables AS v ON v.code = d.code AND v.variable = d.variable
+            LEFT JOIN xpt_columns AS x ON x.code = d.code AND x.variable = d.variable
+            ORDER BY hits.score, hits.rowid
+            """, (expression, limit)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def import_xpt_labels(db, xpt_dir, full=False, log=print):
+    """Читает только метаданные XPT файлов и записывает метки столбцов в базу.
+
+    Файлы, для которых столбцы уже записаны (конвейером или раньше), пропускаются.
+    """
+    import pyreadstat
+
+    with db.lock:
+        known = {row[0] for row in db.conn.execute('SELECT DISTINCT code FROM xpt_columns')}
+    imported = 0
+    for filename in sorted(os.listdir(xpt_dir)):
+        code, ext = os.path.splitext(filename)
+        if ext.lower() != '.xpt' or (code.upper() in known and not full):
+            continue
+        try:
+            _, meta = pyreadstat.read_xport(os.path.join(xpt_dir, filename), metadataonly=True)
+        except Exception as e:
+            log(f"✗ {filename}: {e}")
+            continue
+        db.replace_xpt_columns(code, meta.column_names, meta.column_labels)
+        imported += 1
+    return imported
+
+
+def print_results(rows):
+    for row in rows:
+        name = f"{row['code']}.{row['variable']}" if row['variable'] else row['code']
+        text = row['label'] if row['variable'] else (row['title_ru'] or row['title'])
+        print(f"{name:<24} {row['years'] or '?':<10} {text or ''}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Полнотекстовый поиск по каталогу NHANES (SQLite FTS5)")
+    parser.add_argument('--db', default=CATALOG_DB, help="База каталога SQLite")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build', help="Обновить индекс (только измененные наборы)")
+    build_parser.add_argument('--full', action='store_true', help="Пересобрать индекс целиком")
+    build_parser.add_argument('--xpt-dir', help=f"Сначала взять метки столбцов из XPT файлов (например {XPT_DIR})")
+    query_parser = commands.add_parser('query', help="Найти наборы данных и переменные")
+    query_parser.add_argument('query', help="Запрос, например 'глюкоза' или 'gluc'")
+    query_parser.add_argument('--limit', type=int, default=SEARCH_LIMIT, help="Сколько результатов показать")
+    args = parser.parse_args(argv)
+
+    with CatalogDB(args.db) as db:
+        if args.command == 'query':
+            started = time.perf_counter()
+            rows = search(db, args.query, args.limit)
+            elapsed = (time.perf_counter() - started) * 1000
+            print_results(rows)
+            print(f"Найдено: {len(rows)} за {elapsed:.1f} мс")
+            return 0 if rows else 1
+
+        started = time.perf_counter()
+        if args.xpt_dir:
+            print(f"Метки столбцов из XPT: {import_xpt_labels(db, args.xpt_dir, args.full)} файлов")
+        codes, docs = refresh_index(db, args.full)
+        print(f"Переиндексировано наборов: {codes}, документов: {docs}")
+        print(f"Время: {(time.perf_counter() - started) * 1000:.0f} мс")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
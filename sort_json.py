@@ -1,9 +1,13 @@
+import argparse
 import json
 import re
+import time
 from collections import defaultdict
 
-with open('htm_info.json', encoding='utf-8') as f:
-    data = json.load(f)
+from build_manifest import BuildManifest, BUILD_MANIFEST, fingerprint, sha256_path, write_json_if_changed
+
+INPUT_JSON = 'htm_info.json'
+OUTPUT_JSON = 'nhanes_grouped.json'
 
 # Карта для циклов
 cycle_suffix = {
@@ -22,9 +26,9 @@ category_map = {
     # можно дополнить/уточнить!
 }
 
-grouped = defaultdict(lambda: defaultdict(list))
 
-for code, desc in data.items():
+def classify(code):
+    """Цикл и категория набора данных по коду"""
     # Определить цикл (год/период)
     match = re.search(r'_([A-Z])$', code)
     cycle = cycle_suffix.get(match.group(1), "Unknown") if match else "Unknown"
@@ -35,16 +39,69 @@ for code, desc in data.items():
         if code.startswith(prefix):
             cat = cat_name
             break
+    return cycle, cat
 
-    grouped[cycle][cat].append({'code': code, 'desc': desc})
 
-# Сортированный вывод для примера
-for cycle in sorted(grouped.keys()):
-    print(f"{cycle}:")
-    for cat in grouped[cycle]:
-        print(f"  {cat} ({len(grouped[cycle][cat])})")
+def group(data, placements=None):
+    """Группирует {код: описание} по циклам и категориям.
 
-# Можно сохранить в файл:
-import json
-with open('nhanes_grouped.json', 'w', encoding='utf-8') as f:
-    json.dump(grouped, f, ensure_ascii=False, indent=2)
+    placements - кэш {код: [цикл, категория]} из прошлой сборки: коды из
+    него не классифицируются заново. Возвращает (grouped, placements,
+    число классифицированных кодов).
+    """
+    placements = placements or {}
+    new_placements = {}
+    classified = 0
+    grouped = defaultdict(lambda: defaultdict(list))
+
+    for code, desc in data.items():
+        placement = placements.get(code)
+        if placement is None:
+            placement = list(classify(code))
+            classified += 1
+        new_placements[code] = placement
+        cycle, cat = placement
+        grouped[cycle][cat].append({'code': code, 'desc': desc})
+
+    return grouped, new_placements, classified
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Группировка заголовков HTM по циклам и категориям")
+    parser.add_argument('--input', default=INPUT_JSON, help="JSON с заголовками (get_htm_info.py)")
+    parser.add_argument('--output', default=OUTPUT_JSON, help="Сгруппированный JSON")
+    parser.add_argument('--manifest', default=BUILD_MANIFEST, help="Манифест инкрементальной сборки")
+    parser.add_argument('--full', action='store_true', help="Пересобрать без манифеста")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    manifest = BuildManifest(args.manifest)
+    # Классификация зависит только от кода и карт; их смена сбрасывает кэш
+    config = fingerprint([cycle_suffix, category_map])
+    inputs = {'input': sha256_path(args.input), 'config': config}
+    if not args.full and manifest.up_to_date('grouped', inputs, args.output):
+        print(f"{args.output} актуален ({(time.perf_counter() - started) * 1000:.0f} мс)")
+        return
+
+    with open(args.input, encoding='utf-8') as f:
+        data = json.load(f)
+
+    stage = manifest.stage('grouped')
+    cached = stage['items'] if not args.full and stage['inputs'].get('config') == config else {}
+    grouped, stage['items'], classified = group(data, cached)
+
+    # Сортированный вывод для примера
+    for cycle in sorted(grouped.keys()):
+        print(f"{cycle}:")
+        for cat in grouped[cycle]:
+            print(f"  {cat} ({len(grouped[cycle][cat])})")
+
+    # Можно сохранить в файл:
+    write_json_if_changed(args.output, grouped)
+    manifest.mark_built('grouped', inputs, args.output)
+    manifest.save()
+    print(f"Классифицировано кодов: {classified} из {len(data)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+from build_manifest import file_state, sha256_path
+
+# Файл манифеста синхронизации по умолчанию
+MANIFEST_FILE = 'downloads/sync_manifest.json'
+SAVE_EVERY = 50  # Как часто сбрасывать манифест на диск (число обновлений)
+
+
+class SyncManifest:
+    """Манифест синхронизации зеркала: URL -> ETag, Last-Modified, размер, sha256.
+
+    По нему downloader отправляет условные GET-запросы (If-None-Match /
+    If-Modified-Since) и скачивает только те файлы, которые CDC изменил.
+    """
+
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        # Запись на диск - под отдельной блокировкой: record() не ждет диска,
+        # а два сохранения не пишут в один .tmp одновременно
+        self._save_lock = threading.Lock()
+        self.entries = {}
+        self._dirty = 0
+        self.load()
+
+    def load(self):
+        """Загружает манифест с диска (пустой, если файла нет или он поврежден)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('files', {})
+        except FileNotFoundError:
+            self.entries = {}
+        except json.JSONDecodeError:
+            print(f"Манифест {self.path} поврежден, начинаем с пустого")
+            self.entries = {}
+
+    def save(self):
+        """Атомарно записывает манифест на диск"""
+        with self._save_lock:
+            # Снимок берется под той же блокировкой, что и запись: более
+            # старый снимок не может перезаписать более новый
+            with self.lock:
+                data = {'files': dict(sorted(self.entries.items()))}
+                self._dirty = 0
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def get(self, url):
+        with self.lock:
+            return self.entries.get(url)
+
+    def conditional_headers(self, url, filepath):
+        """Заголовки условного запроса, если локальная копия совпадает с манифестом.
+
+        Копия должна совпасть по размеру и по sha256: файл, измененный или
+        обрезанный до того же размера, иначе получал бы 304 вечно. Хэш
+        считается, только если размер или mtime изменились с последней
+        проверки, так что повторный прогон обходится stat-проверками.
+        """
+        entry = self.get(url)
+        if not entry or not os.path.exists(filepath):
+            return {}
+        if os.path.getsize(filepath) != entry.get('size'):
+            return {}
+        if entry.get('sha256'):
+            state = file_state(filepath)
+            if entry.get('state') != state:
+                if sha256_path(filepath) != entry['sha256']:
+                    return {}
+                with self.lock:
+                    entry['state'] = state
+                    self._dirty += 1
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record(self, url, etag, last_modified, size, sha256, filepath=None):
+        """Запоминает состояние успешно скачанного файла (и его stat, если передан filepath)"""
+        state = file_state(filepath) if filepath is not None else None
+        with self.lock:
+            self.entries[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': size,
+                'sha256': sha256,
+                'state': state,
+                'checked': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            }
+            self._dirty += 1
+            need_save = self._dirty >= SAVE_EVERY
+        if need_save:
+            self.save()
+
+    def touch(self, url):
+        """Отмечает, что файл проверен и не изменился (ответ 304)"""
+        with self.lock:
+            if url in self.entries:
+                self.entries[url]['checked'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+                self._dirty += 1
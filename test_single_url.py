@@ -1,10 +1,10 @@
-import requests
+import http_client
 
 url = 'https://ftp.cdc.gov/pub/health_statistics/nchs/nhanes/continuousnhanes/1999-2000/DBQ.XPT'
 print(f"Testing URL: {url}")
 
 try:
-    r = requests.get(url, timeout=10)
+    r = http_client.get(url, timeout=10)
     print(f'Status: {r.status_code}')
     print(f'Content-Type: {r.headers.get("content-type", "unknown")}')
     print(f'Length: {len(r.content)}')
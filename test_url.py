@@ -1,4 +1,4 @@
-import requests
+import http_client
 
 # Test different URL patterns for NHANES data
 test_urls = [
@@ -20,7 +20,7 @@ test_urls = [
 
 for url in test_urls:
     try:
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         print(f"{url}: {response.status_code}")
         if response.status_code == 200:
             print(f"  Content-Type: {response.headers.get('content-type', 'unknown')}")
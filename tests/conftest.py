@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pandas as pd
+import pyreadstat
+import pytest
+
+# Модули проекта лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+@pytest.fixture
+def xpt_file(tmp_path):
+    """Небольшой XPORT v5 файл: числа, пропуски и текст"""
+    from xpt_dispatch import sniff_format
+
+    df = pd.DataFrame({'SEQN': [float(i) for i in range(1, 26)],
+                       'LBXGH': [5.4, None, 6.1, 7.0, 4.9] * 5,
+                       'LBDNOTE': ['a', 'b', '', 'd', 'e'] * 5})
+    path = tmp_path / 'GHB_J.xpt'
+    pyreadstat.write_xport(df, str(path), file_format_version=5, table_name='GHB_J',
+                           column_labels=['Respondent sequence number', 'Glycohemoglobin (%)', 'Note'])
+    assert sniff_format(path) == 'xport5'
+    return path
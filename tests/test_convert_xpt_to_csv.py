@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import columnar_store
+import convert_xpt_to_csv
+from catalog_db import CatalogDB
+
+
+@pytest.mark.skipif(not columnar_store.available(), reason="pyarrow не установлен")
+@pytest.mark.parametrize('chunksize', [0, 7])
+def test_parquet_copy_is_fresh(tmp_path, xpt_file, chunksize):
+    csv_file = tmp_path / 'GHB_J.csv'
+    result = convert_xpt_to_csv.convert_file(xpt_file, csv_file, chunksize, log=lambda message: None, parquet=True)
+    assert result['error'] is None
+    assert result['rows'] == 25
+    parquet_file = columnar_store.fresh_columnar(csv_file)
+    assert parquet_file == Path(result['parquet'])
+    assert columnar_store.column_labels(parquet_file)['LBXGH'] == 'Glycohemoglobin (%)'
+    df = columnar_store.load_frame(csv_file)
+    assert list(df.columns) == ['SEQN', 'LBXGH', 'LBDNOTE']
+    assert df['LBXGH'].isna().sum() == 5
+
+
+def test_streamed_csv_matches_full_read(tmp_path, xpt_file):
+    full, streamed = tmp_path / 'full.csv', tmp_path / 'streamed.csv'
+    convert_xpt_to_csv.convert_file(xpt_file, full, 0, log=lambda message: None, parquet=False)
+    convert_xpt_to_csv.convert_file(xpt_file, streamed, 7, log=lambda message: None, parquet=False)
+    assert full.read_bytes() == streamed.read_bytes()
+    assert not list(tmp_path.glob('*.part'))
+
+
+@pytest.mark.skipif(not columnar_store.available(), reason="pyarrow не установлен")
+@pytest.mark.parametrize('chunksize', [0, 7])
+def test_parquet_copy_matches_csv(tmp_path, xpt_file, chunksize):
+    csv_file = tmp_path / 'GHB_J.csv'
+    convert_xpt_to_csv.convert_file(xpt_file, csv_file, chunksize, log=lambda message: None, parquet=True)
+    # Текст в CSV декодирован, как в Parquet: без b'...'
+    assert "b'" not in csv_file.read_text(encoding='utf-8')
+    pd.testing.assert_frame_equal(columnar_store.load_frame(csv_file), pd.read_csv(csv_file))
+
+
+def test_results_go_to_the_given_database(tmp_path, xpt_file, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = tmp_path / 'other.db'
+    assert convert_xpt_to_csv.main(['--xpt-dir', str(tmp_path), '--csv-dir', str(tmp_path / 'csv'),
+                                    '--workers', '0', '--db', str(db_path)]) == 0
+    assert not (tmp_path / 'nhanes_catalog.db').exists()
+    with CatalogDB(str(db_path)) as db:
+        assert db.file('GHB_J', 'csv')['status'] == 'ok'
+
+
+@pytest.mark.skipif(convert_xpt_to_csv.address_space_mb() is None, reason="нет /proc")
+def test_memory_limit_below_interpreter_is_rejected(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        convert_xpt_to_csv.main(['--xpt-dir', str(tmp_path), '--csv-dir', str(tmp_path / 'csv'), '--memory-mb', '10'])
+    assert exit_info.value.code == 2
+    assert 'before reading any data' in capsys.readouterr().err
+    assert not (tmp_path / 'csv').exists()
@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+
+import crawl_catalog
+from conftest import FIXTURES
+from link_extractor import BASE_URL, iter_links
+
+
+def load_page(component='Laboratory', chunk=100):
+    """Сохраненная страница компонента, поданная в разборщик кусками"""
+    with open(os.path.join(FIXTURES, f"{component}.html"), encoding='utf-8') as f:
+        text = f.read()
+    records = list(iter_links((text[i:i + chunk] for i in range(0, len(text), chunk)), BASE_URL))
+    for record in records:
+        record['component'] = component
+    return records
+
+
+def test_canonical_url_public_prefix():
+    assert crawl_catalog.canonical_url('https://WWWN.cdc.gov/nchs/data/nhanes/public/1999/datafiles/lab13am.XPT') \
+        == 'https://wwwn.cdc.gov/Nchs/Data/Nhanes/Public/1999/DataFiles/LAB13AM.xpt'
+
+
+def test_dedup_key_ignores_path_case():
+    assert crawl_catalog.dedup_key('https://wwwn.cdc.gov/Nchs/Nhanes/2017-2018/DEMO_J.XPT') \
+        == crawl_catalog.dedup_key('https://wwwn.cdc.gov/nchs/nhanes/2017-2018/demo_j.xpt')
+
+
+def test_fixture_links():
+    codes = [record['code'] for record in load_page()]
+    # Ссылки в script и комментарии не считаются, ссылка вне таблицы - считается
+    assert codes == ['ALB_CR_J', 'GHB_J', 'ghb_j', 'lab13am', 'LAB13AM', 'DEMO_J']
+
+
+def test_merge_records_dedup():
+    catalog, duplicates = crawl_catalog.merge_records([load_page()])
+    assert duplicates == 2
+    urls = [entry['xpt_url'] for entry in catalog]
+    assert urls == [
+        'https://wwwn.cdc.gov/Nchs/Nhanes/2017-2018/ALB_CR_J.xpt',
+        'https://wwwn.cdc.gov/Nchs/Nhanes/2017-2018/GHB_J.xpt',
+        'https://wwwn.cdc.gov/Nchs/Data/Nhanes/Public/1999/DataFiles/LAB13AM.xpt',
+        'https://wwwn.cdc.gov/Nchs/Nhanes/2017-2018/DEMO_J.xpt',
+    ]
+    ghb = catalog[1]
+    assert ghb['code'] == 'GHB_J'
+    assert ghb['data_file_name'] == 'Glycohemoglobin'
+    assert ghb['date_published'] == 'November 2019'
+    assert ghb['doc_url'] == 'https://wwwn.cdc.gov/Nchs/Nhanes/2017-2018/GHB_J.htm'
+    assert catalog[0]['data_file_name'] == 'Albumin & Creatinine - Urine'
+    # Вне таблицы контекста нет: документация - рядом с данными
+    assert catalog[3]['doc_url'] == 'https://wwwn.cdc.gov/Nchs/Nhanes/2017-2018/DEMO_J.htm'
+
+
+def test_merge_fills_missing_fields_from_duplicates():
+    first = {'url': 'https://wwwn.cdc.gov/Nchs/Nhanes/2017-2018/DEMO_J.XPT', 'component': 'Demographics'}
+    second = {'url': 'https://wwwn.cdc.gov/nchs/nhanes/2017-2018/demo_j.xpt', 'years': '2017-2018'}
+    catalog, duplicates = crawl_catalog.merge_records([[first], [second]])
+    assert duplicates == 1
+    assert catalog[0]['years'] == '2017-2018'
+    assert catalog[0]['component'] == 'Demographics'
+
+
+@pytest.fixture
+def crawl(monkeypatch):
+    """crawl_component по сохраненным страницам; компоненты из failing падают"""
+    failing = set()
+
+    def fake_crawl(component, page_url, base_url, save_dir):
+        if component in failing:
+            raise ConnectionError("503 Service Unavailable")
+        return component, load_page(), 0.0
+
+    monkeypatch.setattr(crawl_catalog, 'crawl_component', fake_crawl)
+    return failing
+
+
+def test_main_writes_catalogs(tmp_path, crawl):
+    assert crawl_catalog.main(['--component', 'Laboratory', '--out-dir', str(tmp_path), '--db', '']) == 0
+    with open(tmp_path / crawl_catalog.XPT_LINKS_JSON, encoding='utf-8') as f:
+        assert json.load(f)['total_links'] == 4
+
+
+def test_main_keeps_catalogs_when_a_page_fails(tmp_path, crawl):
+    out = tmp_path / crawl_catalog.XPT_LINKS_JSON
+    out.write_text('{"total_links": 1, "links": ["kept"]}', encoding='utf-8')
+    crawl.add('Dietary')
+    assert crawl_catalog.main(['--component', 'Laboratory', '--component', 'Dietary',
+                               '--out-dir', str(tmp_path), '--db', str(tmp_path / 'catalog.db')]) == 1
+    assert json.loads(out.read_text(encoding='utf-8'))['links'] == ['kept']
+    assert not (tmp_path / crawl_catalog.CATALOG_JSON).exists()
+    assert not (tmp_path / 'catalog.db').exists()
@@ -0,0 +1,186 @@
+import hashlib
+import os
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import download_engine
+import http_client
+import nhanes_download
+from download_engine import DownloadEngine, download_to_path
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 МБ
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Локальная замена сервера CDC: Range, обрыв передачи, медленные ответы"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get('Range')))
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            server.starts.append(time.monotonic())
+        try:
+            if self.path.startswith('/slow/'):
+                time.sleep(0.1)
+                self._send(200, b'ok')
+            else:
+                self._send_file()
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def do_HEAD(self):
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            server.starts.append(time.monotonic())
+        try:
+            time.sleep(0.1)
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(PAYLOAD)))
+            self.end_headers()
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self):
+        server = self.server
+        total = len(PAYLOAD)
+        match = re.match(r'bytes=(\d+)-$', self.headers.get('Range') or '')
+        if match and server.ranges:
+            start = int(match.group(1))
+            if start >= total:
+                self._send(416, b'', [('Content-Range', f'bytes */{total}')])
+                return
+            status, body = 206, PAYLOAD[start:]
+            headers = [('Content-Range', f'bytes {start}-{total - 1}/{total}')]
+        else:
+            status, body, headers = 200, PAYLOAD, []
+        headers.append(('ETag', '"v1"'))
+        if server.cut_first and self.path not in server.cut_done:
+            # Обрыв: обещаем все тело, отдаем половину и закрываем соединение
+            server.cut_done.add(self.path)
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self._send(status, body, headers)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(http_client, 'backoff_delay', lambda attempt, retry_after=None: 0)
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    httpd.lock = threading.Lock()
+    httpd.requests = []
+    httpd.starts = []
+    httpd.active = httpd.peak = 0
+    httpd.ranges = True
+    httpd.cut_first = False
+    httpd.cut_done = set()
+    httpd.url = f'http://127.0.0.1:{httpd.server_address[1]}'
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_interrupted_transfer_resumes_with_range(server, tmp_path):
+    server.cut_first = True
+    target = tmp_path / 'DEMO_J.xpt'
+    result = download_to_path(server.url + '/DEMO_J.xpt', target)
+    assert target.read_bytes() == PAYLOAD
+    assert result.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+    assert result.etag == '"v1"'
+    assert server.requests == [('/DEMO_J.xpt', None), ('/DEMO_J.xpt', f'bytes={len(PAYLOAD) // 2}-')]
+    assert not os.path.exists(str(target) + download_engine.PART_SUFFIX)
+
+
+def test_connection_errors_are_not_retried_twice(monkeypatch, tmp_path):
+    monkeypatch.setattr(http_client, 'backoff_delay', lambda attempt, retry_after=None: 0)
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    calls = []
+    get = http_client.get
+    monkeypatch.setattr(http_client, 'get', lambda *args, **kwargs: calls.append(args) or get(*args, **kwargs))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        download_to_path(f'http://127.0.0.1:{port}/DEMO_J.xpt', tmp_path / 'DEMO_J.xpt')
+    # Повторы соединения - только внутри http_client.request, без внешнего цикла докачки
+    assert len(calls) == 1
+
+
+def test_server_without_range_restarts_from_zero(server, tmp_path):
+    server.cut_first = True
+    server.ranges = False
+    target = tmp_path / 'DEMO_J.xpt'
+    download_to_path(server.url + '/DEMO_J.xpt', target)
+    assert target.read_bytes() == PAYLOAD
+
+
+def test_416_with_complete_part(server, tmp_path):
+    target = tmp_path / 'DEMO_J.xpt'
+    (tmp_path / 'DEMO_J.xpt.part').write_bytes(PAYLOAD)
+    result = download_to_path(server.url + '/DEMO_J.xpt', target)
+    assert target.read_bytes() == PAYLOAD
+    assert result.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+    assert server.requests == [('/DEMO_J.xpt', f'bytes={len(PAYLOAD)}-')]
+
+
+def test_416_with_stale_part_downloads_again(server, tmp_path):
+    target = tmp_path / 'DEMO_J.xpt'
+    (tmp_path / 'DEMO_J.xpt.part').write_bytes(PAYLOAD + b'stale tail')
+    download_to_path(server.url + '/DEMO_J.xpt', target)
+    assert target.read_bytes() == PAYLOAD
+    assert [header for _, header in server.requests] == [f'bytes={len(PAYLOAD) + 10}-', None]
+
+
+def test_per_host_limit_and_delay(server):
+    def fetch(url, filename):
+        with http_client.get(url) as response:
+            return response.ok, filename, len(response.content), False
+
+    engine = DownloadEngine(fetch, workers=8, per_host=2, host_delay=0.05)
+    stats = engine.run([(f'{server.url}/slow/{i}', f'{i}.xpt') for i in range(8)])
+    assert stats.successful == 8
+    assert server.peak <= 2
+    starts = sorted(server.starts)
+    assert all(later - earlier >= 0.045 for earlier, later in zip(starts, starts[1:]))
+
+
+def test_size_probes_respect_host_limits(server):
+    urls = [f'{server.url}/{i}.xpt' for i in range(6)]
+    sizes = nhanes_download.fetch_sizes(urls, workers=8, per_host=2, host_delay=0.05)
+    assert sizes == dict.fromkeys(urls, len(PAYLOAD))
+    assert server.peak <= 2
+    starts = sorted(server.starts)
+    assert all(later - earlier >= 0.045 for earlier, later in zip(starts, starts[1:]))
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from conftest import FIXTURES
+from link_extractor import BASE_URL, DatapageLinkExtractor, iter_links
+
+HEADER = '<tr><th>Years</th><th>Data File Name</th><th>Doc File</th><th>Data File</th><th>Date Published</th></tr>'
+
+
+def extract(page, chunk=None):
+    chunks = [page] if chunk is None else [page[i:i + chunk] for i in range(0, len(page), chunk)]
+    return list(iter_links(chunks, BASE_URL))
+
+
+@pytest.mark.parametrize('chunk', [None, 1, 7, 100])
+def test_row_context_in_any_chunking(chunk):
+    with open(os.path.join(FIXTURES, 'Laboratory.html'), encoding='utf-8') as f:
+        records = extract(f.read(), chunk)
+    assert records[1] == {
+        'url': 'https://wwwn.cdc.gov/Nchs/Nhanes/2017-2018/GHB_J.XPT',
+        'code': 'GHB_J',
+        'years': '2017-2018',
+        'data_file_name': 'Glycohemoglobin',
+        'doc_url': 'https://wwwn.cdc.gov/Nchs/Nhanes/2017-2018/GHB_J.htm',
+        'date_published': 'November 2019',
+    }
+
+
+def test_omitted_end_tags():
+    # </td> и </tr> необязательны: строку завершают следующий <tr> и </table>
+    page = ('<table>' + HEADER
+            + '<tr><td>2017-2018<td>Glycohemoglobin<td><a href="/GHB_J.htm">Doc</a>'
+            + '<td><a href="/GHB_J.XPT">Data</a><td>November 2019'
+            + '<tr><td>2017-2018<td>Cotinine<td><a href="/COT_J.htm">Doc</a>'
+            + '<td><a href="/COT_J.XPT">Data</a><td>March 2020'
+            + '</table><p>after</p>')
+    records = extract(page)
+    assert [(record['code'], record['data_file_name'], record['date_published']) for record in records] == [
+        ('GHB_J', 'Glycohemoglobin', 'November 2019'),
+        ('COT_J', 'Cotinine', 'March 2020'),
+    ]
+    assert records[1]['doc_url'] == 'https://wwwn.cdc.gov/COT_J.htm'
+
+
+def test_close_flushes_unterminated_table():
+    parser = DatapageLinkExtractor()
+    parser.feed('<table>' + HEADER + '<tr><td>2017-2018<td>Demographics<td><td><a href="/DEMO_J.XPT">Data</a>')
+    assert parser.pop_records() == []
+    parser.close()
+    assert [(record['code'], record['years']) for record in parser.pop_records()] == [('DEMO_J', '2017-2018')]
+
+
+def test_links_in_comments_and_scripts_are_skipped():
+    page = ('<script>var x = "<tr><td><a href=\'/FAKE_J.XPT\'>x</a>";</script>'
+            '<!-- <a href="/OLD_J.XPT">old</a> --><a href="/DEMO_J.XPT">DEMO_J</a>')
+    assert [record['code'] for record in extract(page, 5)] == ['DEMO_J']
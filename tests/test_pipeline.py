@@ -0,0 +1,150 @@
+import os
+import time
+
+import pandas as pd
+import pyreadstat
+import pytest
+
+import convert_xpt_to_csv
+import pipeline
+import xpt_dispatch
+from conversion_journal import ConversionJournal
+from convert_xpt_to_csv import journal_key
+from describe_xpt import describe_xpt_file
+
+
+@pytest.fixture(autouse=True)
+def csv_dir(tmp_path):
+    (tmp_path / 'csv').mkdir()
+    return tmp_path / 'csv'
+
+
+def test_process_xpt_writes_all_outputs(tmp_path, xpt_file):
+    result = pipeline.process_xpt(xpt_file, tmp_path / 'csv', tmp_path)
+    assert result['error'] is None
+    outputs = pipeline.output_paths(xpt_file, tmp_path / 'csv', tmp_path)
+    assert all(path.exists() for path in outputs)
+    assert not list(tmp_path.rglob('*.part'))
+    description = outputs[-1].read_text(encoding='utf-8')
+    # Описание строится по первым строкам, но число строк - полное
+    assert 'Number of Rows: 25' in description
+    assert 'Label: Glycohemoglobin (%)' in description
+
+
+@pytest.mark.parametrize('chunksize', [0, 5])
+def test_process_xpt_parses_file_once(tmp_path, xpt_file, monkeypatch, chunksize):
+    plans = []
+    plan_readers = convert_xpt_to_csv.plan_readers
+    monkeypatch.setattr(convert_xpt_to_csv, 'plan_readers',
+                        lambda *args: plans.append(args) or plan_readers(*args))
+    assert pipeline.process_xpt(xpt_file, tmp_path / 'csv', tmp_path, chunksize=chunksize)['error'] is None
+    assert len(plans) == 1
+
+
+@pytest.mark.parametrize('reader', ['xport_reader', 'pandas'])
+@pytest.mark.parametrize('chunksize', [0, 2])
+def test_description_matches_describe_xpt(tmp_path, monkeypatch, reader, chunksize):
+    monkeypatch.setitem(xpt_dispatch.READERS, 'xport5', [reader])
+    df = pd.DataFrame({'SEQN': [float(i) for i in range(1, 7)], 'LBXVAL': [0.0, 1.5, None, 0.0, -2.0, 3.0],
+                       'LBDNOTE': ['ab1', '', 'x', 'y', 'z', 'wwww']})
+    path = tmp_path / 'LAB_J.xpt'
+    pyreadstat.write_xport(df, str(path), file_format_version=5, table_name='LAB_J',
+                           column_labels=['Respondent sequence number', 'Value', 'Note'])
+    result = pipeline.process_xpt(path, tmp_path / 'csv', tmp_path, chunksize=chunksize)
+    assert result['reader'] == reader
+    # Тот же текст, что пишет describe_xpt.py через pyreadstat: str, а не b'...', и 0.0 вместо 5.4e-79
+    assert (tmp_path / 'LAB_J.txt').read_text(encoding='utf-8') == describe_xpt_file(path)
+
+
+def _convert_or_crash(filename):
+    if filename == 'CRASH_J.xpt':
+        os._exit(1)
+    # Остальные файлы еще в работе, когда пул ломается
+    time.sleep(0.2)
+    return {'file': filename, 'rows': 1, 'seconds': 0.0, 'error': None}
+
+
+def test_pool_survives_crashed_worker():
+    pool = pipeline.ConversionPool(2)
+    try:
+        for name in ('A_J.xpt', 'CRASH_J.xpt', 'B_J.xpt', 'C_J.xpt'):
+            pool.submit(name, _convert_or_crash, name)
+        results = {result['file']: result for result in pool.results()}
+        # Пул после падения пересоздается и принимает новые файлы
+        pool.submit('D_J.xpt', _convert_or_crash, 'D_J.xpt')
+        results.update((result['file'], result) for result in pool.results())
+    finally:
+        pool.shutdown()
+    assert 'crashed' in results.pop('CRASH_J.xpt')['error']
+    assert sorted(results) == ['A_J.xpt', 'B_J.xpt', 'C_J.xpt', 'D_J.xpt']
+    assert all(result['error'] is None for result in results.values())
+
+
+def test_failed_description_is_an_error(tmp_path, xpt_file, monkeypatch):
+    def broken(*args, **kwargs):
+        raise ValueError("no labels")
+
+    monkeypatch.setattr(pipeline, 'describe_xpt_file', broken)
+    result = pipeline.process_xpt(xpt_file, tmp_path / 'csv', tmp_path)
+    assert result['error'] == "describe: no labels"
+    assert not pipeline.output_paths(xpt_file, tmp_path / 'csv', tmp_path)[-1].exists()
+    assert not list(tmp_path.rglob('*.part'))
+
+
+def test_describe_raises_for_parsed_frame(xpt_file):
+    df, meta = pyreadstat.read_xport(str(xpt_file))
+    meta.column_names = None
+    with pytest.raises(TypeError):
+        describe_xpt_file(xpt_file, df, meta)
+
+
+def test_failed_conversion_leaves_no_outputs(tmp_path):
+    html = tmp_path / 'DEMO_J.xpt'
+    html.write_text('<!DOCTYPE html><html>Page not found</html>', encoding='utf-8')
+    result = pipeline.process_xpt(html, tmp_path / 'csv', tmp_path)
+    assert 'HTML' in result['error']
+    assert not any(path.exists() for path in pipeline.output_paths(html, tmp_path / 'csv', tmp_path))
+    assert not list(tmp_path.rglob('*.part'))
+
+
+def test_journal_skips_converted_file(tmp_path, xpt_file):
+    outputs = pipeline.output_paths(xpt_file, tmp_path / 'csv', tmp_path)
+    journal = ConversionJournal(tmp_path / 'csv', journal_key(True))
+    up_to_date, snapshot = journal.check(xpt_file, outputs)
+    assert not up_to_date
+    pipeline.process_xpt(xpt_file, tmp_path / 'csv', tmp_path, parquet=True)
+    journal.record(xpt_file, outputs, snapshot)
+    journal.close()
+
+    journal = ConversionJournal(tmp_path / 'csv', journal_key(True))
+    assert journal.check(xpt_file, outputs)[0]
+    # Новый mtime при том же содержимом - все еще актуален
+    os.utime(xpt_file, ns=(0, 0))
+    assert journal.check(xpt_file, outputs)[0]
+    # Другие настройки выхода или пропавший выход - конвертировать заново
+    assert not ConversionJournal(tmp_path / 'csv', journal_key(False)).check(xpt_file, outputs[:1])[0]
+    outputs[-1].unlink()
+    assert not journal.check(xpt_file, outputs)[0]
+    journal.close()
+
+
+def test_journal_survives_torn_line(tmp_path, xpt_file):
+    outputs = pipeline.output_paths(xpt_file, tmp_path / 'csv', tmp_path)
+    pipeline.process_xpt(xpt_file, tmp_path / 'csv', tmp_path, parquet=True)
+    journal = ConversionJournal(tmp_path / 'csv', journal_key(True))
+    journal.record(xpt_file, outputs, journal.check(xpt_file, outputs)[1])
+    journal.close()
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"file": "DEMO_J.xpt", "ke')
+    journal = ConversionJournal(tmp_path / 'csv', journal_key(True))
+    assert journal.check(xpt_file, outputs)[0]
+    journal.record(xpt_file, outputs, journal.check(xpt_file, outputs)[1])
+    journal.close()
+    assert ConversionJournal(tmp_path / 'csv', journal_key(True)).check(xpt_file, outputs)[0]
+
+
+def test_streamed_outputs_match_full_read(tmp_path, xpt_file):
+    pipeline.process_xpt(xpt_file, tmp_path / 'csv', tmp_path, chunksize=0)
+    full = [path.read_bytes() for path in pipeline.output_paths(xpt_file, tmp_path / 'csv', tmp_path, False)]
+    pipeline.process_xpt(xpt_file, tmp_path / 'csv', tmp_path, chunksize=5)
+    assert [path.read_bytes() for path in pipeline.output_paths(xpt_file, tmp_path / 'csv', tmp_path, False)] == full
@@ -0,0 +1,50 @@
+import hashlib
+import json
+import threading
+
+import pytest
+
+import sync_manifest
+from sync_manifest import SyncManifest
+
+
+def test_concurrent_saves(tmp_path, monkeypatch):
+    # Сохранение на каждой записи: потоки постоянно сталкиваются в save()
+    monkeypatch.setattr(sync_manifest, 'SAVE_EVERY', 1)
+    manifest = SyncManifest(str(tmp_path / 'sync_manifest.json'))
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(50):
+                manifest.record(f'https://wwwn.cdc.gov/{n}/{i}.xpt', f'"{n}-{i}"', None, i, None)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    with open(manifest.path, encoding='utf-8') as f:
+        assert len(json.load(f)['files']) == 400
+
+
+def test_conditional_headers_need_matching_hash(tmp_path, monkeypatch):
+    url = 'https://wwwn.cdc.gov/Nchs/Nhanes/2017-2018/DEMO_J.XPT'
+    path = tmp_path / 'DEMO_J.xpt'
+    path.write_bytes(b'original')
+    manifest = SyncManifest(str(tmp_path / 'sync_manifest.json'))
+    manifest.record(url, '"v1"', None, 8, hashlib.sha256(b'original').hexdigest(), path)
+    assert manifest.conditional_headers(url, path) == {'If-None-Match': '"v1"'}
+
+    # Тот же размер, другое содержимое: без условных заголовков, файл перекачается
+    path.write_bytes(b'modified')
+    assert manifest.conditional_headers(url, path) == {}
+
+    # Содержимое вернулось: хэш совпал и запомнен, дальше хватает stat
+    path.write_bytes(b'original')
+    assert manifest.conditional_headers(url, path) == {'If-None-Match': '"v1"'}
+    monkeypatch.setattr(sync_manifest, 'sha256_path', lambda path: pytest.fail("hashed again"))
+    assert manifest.conditional_headers(url, path) == {'If-None-Match': '"v1"'}
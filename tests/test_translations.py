@@ -0,0 +1,25 @@
+from add_russian_translations import PhraseTranslator
+
+DICTIONARY = {'Ethyl': 'Этильная', 'Urine': 'Моча', 'Pesticides': 'Пестициды', 'Follow-up': 'Последующее наблюдение'}
+
+
+def translate(text):
+    return PhraseTranslator(DICTIONARY).translate(text)[0]
+
+
+def test_hyphenated_names_are_one_token():
+    assert translate('Mono-2-ethyl-5-hydroxyhexyl terephthalate - Urine') \
+        == 'Mono-2-ethyl-5-hydroxyhexyl terephthalate - Моча'
+
+
+def test_hyphen_joined_run_is_not_translated():
+    assert translate('Ethyl-_x') == 'Ethyl-_x'
+
+
+def test_spaced_hyphen_is_a_separator():
+    assert translate('Pesticides - Urine') == 'Пестициды - Моча'
+    assert translate('Hydrocarbons -Urine') == 'Hydrocarbons -Моча'
+
+
+def test_hyphenated_dictionary_phrase():
+    assert translate('Phone Follow-up') == 'Phone Последующее наблюдение'
@@ -0,0 +1,133 @@
+import math
+import struct
+
+import numpy as np
+import pandas as pd
+import pyreadstat
+import pytest
+
+import xport_reader
+from xport_reader import ibm_to_ieee, read_xport
+
+MISSING = ['.', '._'] + [f'.{letter}' for letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ']
+
+
+def ibm_bytes(value, length=8):
+    """float или код пропуска ('.', '.A'...) -> число IBM, усеченное до length байт"""
+    if isinstance(value, str):
+        return (b'.' if value == '.' else value[1:].encode('ascii')) + b'\0' * (length - 1)
+    if value == 0:
+        return b'\0' * length
+    mantissa, exponent = math.frexp(abs(value))
+    exponent16 = (exponent + 3) // 4
+    fraction = int(mantissa * 2.0 ** (exponent - 4 * exponent16) * (1 << 56))
+    first = (0x80 if value < 0 else 0) | (exponent16 + 64)
+    return (bytes([first]) + fraction.to_bytes(7, 'big'))[:length]
+
+
+def write_xport5(path, columns, rows):
+    """XPORT v5 с произвольной длиной чисел (pyreadstat пишет только 8 байт).
+
+    columns - [(имя, метка, числовой ли, длина)], rows - строки значений.
+    """
+    def record(text):
+        return text.ljust(80, b' ')
+
+    header = record(b'HEADER RECORD*******LIBRARY HEADER RECORD!!!!!!!000000000000000000000000000000')
+    header += record(b'SAS     SAS     SASLIB  9.4     X64_7PRO' + b' ' * 24 + b'01JAN20:00:00:00')
+    header += record(b'01JAN20:00:00:00')
+    header += record(b'HEADER RECORD*******MEMBER  HEADER RECORD!!!!!!!000000000000000001600000000140')
+    header += record(b'HEADER RECORD*******DSCRPTR HEADER RECORD!!!!!!!000000000000000000000000000000')
+    header += record(b'SAS     TEST    SASDATA 9.4     X64_7PRO' + b' ' * 24 + b'01JAN20:00:00:00')
+    header += record(b'01JAN20:00:00:00' + b' ' * 16 + b'Test file'.ljust(40) + b' ' * 8)
+    header += record(b'HEADER RECORD*******NAMESTR HEADER RECORD!!!!!!!000000%04d00000000000000000000' % len(columns))
+    namestr = b''
+    position = 0
+    for i, (name, label, numeric, length) in enumerate(columns):
+        namestr += struct.pack('>hhhh8s40s8shhh2s8shhl52s', 1 if numeric else 2, 0, length, i + 1,
+                               name.ljust(8).encode(), label.ljust(40).encode(), b' ' * 8, 0, 0, 0, b'\0\0',
+                               b' ' * 8, 0, 0, position, b'\0' * 52)
+        position += length
+    header += namestr + b' ' * (-len(namestr) % 80)
+    header += record(b'HEADER RECORD*******OBS     HEADER RECORD!!!!!!!000000000000000000000000000000')
+    data = b''
+    for row in rows:
+        for (_, _, numeric, length), value in zip(columns, row):
+            data += ibm_bytes(value, length) if numeric else value.encode('latin-1').ljust(length)[:length]
+    path.write_bytes(header + data + b' ' * (-len(data) % 80))
+
+
+def assert_matches_pyreadstat(path, columns=None, start=0, stop=None):
+    ours, meta = read_xport(path, columns, start, stop)
+    reference, reference_meta = pyreadstat.read_xport(str(path))
+    reference = reference.iloc[start:stop].reset_index(drop=True)
+    if columns is not None:
+        reference = reference[columns]
+    pd.testing.assert_frame_equal(ours, reference, check_dtype=False)
+    assert meta.column_names == reference_meta.column_names
+    assert meta.column_labels == reference_meta.column_labels
+
+
+def test_ibm_to_ieee_bit_patterns():
+    raw = np.array([0, 0x4110000000000000, 0xC110000000000000, 0x4210000000000000, 0x40_80000000000000,
+                    0xC2_76A00000000000, 0x2E00000000000000, 0x4100000000000000, 0x5A00000000000000,
+                    0x5F00000000000000], dtype=np.uint64)
+    values = ibm_to_ieee(raw)
+    assert values[:6].tolist() == [0.0, 1.0, -1.0, 16.0, 0.5, -118.625]
+    # Мантисса 0 с первым байтом '.', 'A'-'Z', '_' - пропуск, а не ноль
+    assert np.isnan(values[6:]).all()
+
+
+def test_values_match_pyreadstat(tmp_path):
+    values = [0.0, 1.0, -1.0, 5.4, -7.25, 1e-5, 123456789.0, -0.001, 2.0 ** 40, math.pi] + MISSING
+    path = tmp_path / 'IBM_J.xpt'
+    write_xport5(path, [('VALUE', 'Value', True, 8)], [[value] for value in values])
+    assert_matches_pyreadstat(path)
+    df, _ = read_xport(path)
+    assert df['VALUE'].iloc[0] == 0.0
+    assert df['VALUE'].iloc[10:].isna().all()
+
+
+@pytest.mark.parametrize('length', [3, 4, 5, 6, 7])
+def test_short_numerics_match_pyreadstat(tmp_path, length):
+    values = [0.0, 1.0, -2.5, 100.0, 0.1, -123.456, 65535.0, '.', '.A', '.Z']
+    path = tmp_path / 'SHORT_J.xpt'
+    write_xport5(path, [('SEQN', 'Sequence', True, 8), ('SHORT', 'Short', True, length)],
+                 [[float(i), value] for i, value in enumerate(values)])
+    assert_matches_pyreadstat(path)
+
+
+@pytest.fixture
+def mixed_file(tmp_path):
+    path = tmp_path / 'MIX_J.xpt'
+    rows = [[float(i), f'r{i}', -i / 4 if i % 3 else '.', 'x' * (i % 5)] for i in range(23)]
+    write_xport5(path, [('SEQN', 'Sequence', True, 8), ('CODE', 'Code', False, 4),
+                        ('VALUE', 'Value', True, 5), ('NOTE', 'Note', False, 6)], rows)
+    return path
+
+
+@pytest.mark.parametrize('columns, start, stop', [
+    (None, 0, None),
+    (['VALUE', 'SEQN'], 0, None),
+    (['NOTE'], 5, 12),
+    (None, 20, None),
+    (['CODE', 'VALUE'], 22, 40),
+    (None, 30, None),
+])
+def test_projection_and_slices_match_pyreadstat(mixed_file, columns, start, stop):
+    assert_matches_pyreadstat(mixed_file, columns, start, stop)
+
+
+def test_column_names_are_case_insensitive(mixed_file):
+    df, _ = read_xport(mixed_file, ['value', 'seqn'], 1, 3)
+    assert list(df.columns) == ['VALUE', 'SEQN']
+    assert df['SEQN'].tolist() == [1.0, 2.0]
+    with pytest.raises(KeyError):
+        read_xport(mixed_file, ['NOPE'])
+
+
+def test_rejects_non_xport(tmp_path):
+    path = tmp_path / 'DEMO_J.xpt'
+    path.write_text('<!DOCTYPE html><html>Page not found</html>', encoding='utf-8')
+    with pytest.raises(ValueError):
+        xport_reader.XportFile(path)
@@ -0,0 +1,285 @@
+import argparse
+import mmap
+import struct
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+# Формат SAS XPORT v5: записи по 80 байт, заголовки - текстовые записи
+# "HEADER RECORD*******...", описание каждой переменной - структура NAMESTR
+# (140 байт), затем строки данных фиксированной длины до конца файла.
+RECORD = 80
+LIBRARY_HEADER = b'HEADER RECORD*******LIBRARY HEADER RECORD!!!!!!!'
+LIBV8_HEADER = b'HEADER RECORD*******LIBV8   HEADER RECORD!!!!!!!'
+MEMBER_HEADER = b'HEADER RECORD*******MEMBER  HEADER RECORD!!!!!!!'
+NAMESTR_HEADER = b'HEADER RECORD*******NAMESTR HEADER RECORD!!!!!!!'
+OBS_HEADER = b'HEADER RECORD*******OBS     HEADER RECORD!!!!!!!'
+# ntype, nhfun, nlng, nvar0, nname, nlabel, nform, nfl, nfd, nfj, nfill, niform, nifl, nifd, npos, rest
+NAMESTR = struct.Struct('>hhhh8s40s8shhh2s8shhl52s')
+# Первый байт пропущенного значения: '.', '.A'-'.Z', '._'
+MISSING_BYTES = np.array([0x2E, 0x5F] + list(range(0x41, 0x5B)), dtype=np.uint64)
+# Текстовые столбцы NHANES - ASCII; latin-1 декодирует любой байт
+ENCODING = 'latin-1'
+
+
+def _text(raw):
+    return raw.decode(ENCODING).strip()
+
+
+def ibm_to_ieee(raw):
+    """Числа IBM System/370 (uint64, big-endian биты) -> float64, векторно.
+
+    Значение = (-1)^знак * мантисса(56 бит) * 16^(порядок-64) / 2^56. Ноль -
+    нулевая мантисса; мантисса 0 с первым байтом из MISSING_BYTES - пропуск.
+    Числа, записанные SAS из IEEE double, переводятся без потерь.
+    """
+    mantissa = raw & np.uint64(0x00FFFFFFFFFFFFFF)
+    exponent = ((raw >> np.uint64(56)) & np.uint64(0x7F)).astype(np.int64)
+    values = np.ldexp(mantissa.astype(np.float64), 4 * (exponent - 64) - 56)
+    np.negative(values, out=values, where=(raw >> np.uint64(63)).astype(bool))
+    missing = (mantissa == 0) & np.isin(raw >> np.uint64(56), MISSING_BYTES)
+    values[missing] = np.nan
+    return values
+
+
+class XportFile:
+    """Чтение XPORT v5 через mmap: заголовки разбираются один раз, данные - numpy-представление.
+
+    Строки файла видны как массив структурного dtype прямо поверх mmap
+    (без копирования); read() декодирует только запрошенные столбцы и
+    строки, все числовые значения столбца - одним векторным вызовом.
+    Поддерживается первый (в NHANES - единственный) набор в файле.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{self.path}: пустой файл, не XPORT")
+        try:
+            self._parse_headers()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse_headers(self):
+        mm = self._mm
+        if mm[:len(LIBV8_HEADER)] == LIBV8_HEADER:
+            raise ValueError(f"{self.path}: XPORT v8/v9 не поддерживается, только v5")
+        if mm[:len(LIBRARY_HEADER)] != LIBRARY_HEADER:
+            raise ValueError(f"{self.path}: не XPORT файл")
+
+        member = mm.find(MEMBER_HEADER)
+        if member < 0:
+            raise ValueError(f"{self.path}: нет заголовка набора данных")
+        namestr_size = int(mm[member + 74:member + 78])
+        # После MEMBER и DSCRPTR - две записи описания набора: имя и метка
+        descriptor = member + 2 * RECORD
+        self.table_name = _text(mm[descriptor + 8:descriptor + 16])
+        self.file_label = _text(mm[descriptor + RECORD + 32:descriptor + RECORD + 72])
+
+        namestr = mm.find(NAMESTR_HEADER, descriptor)
+        if namestr < 0:
+            raise ValueError(f"{self.path}: нет заголовка NAMESTR")
+        nvars = int(mm[namestr + 54:namestr + 58])
+        self.columns = []
+        position = namestr + RECORD
+        for i in range(nvars):
+            fields = NAMESTR.unpack(mm[position:position + 140].ljust(140, b'\0'))
+            self.columns.append({
+                'name': _text(fields[4]), 'label': _text(fields[5]), 'format': _text(fields[6]),
+                'numeric': fields[0] == 1, 'length': fields[2], 'offset': fields[14],
+            })
+            position += namestr_size
+        self.column_names = [column['name'] for column in self.columns]
+        self.column_labels = [column['label'] for column in self.columns]
+
+        obs = mm.find(OBS_HEADER, position - RECORD)
+        if obs < 0:
+            raise ValueError(f"{self.path}: нет заголовка данных OBS")
+        self.data_start = obs + RECORD
+        data_end = mm.find(MEMBER_HEADER, self.data_start)
+        data_end = len(mm) if data_end < 0 else data_end
+        self.row_length = sum(column['length'] for column in self.columns)
+        self.nrows = self._count_rows(data_end)
+
+    def _count_rows(self, data_end):
+        if not self.row_length:
+            return 0
+        nrows = (data_end - self.data_start) // self.row_length
+        # Конец файла добит пробелами до 80 байт; короткие строки из одних
+        # пробелов в последней записи - это добивка, а не данные
+        while nrows and (data_end - self.data_start) - (nrows - 1) * self.row_length <= RECORD:
+            row_start = self.data_start + (nrows - 1) * self.row_length
+            if self._mm[row_start:row_start + self.row_length].strip(b' '):
+                break
+            nrows -= 1
+        return nrows
+
+    def close(self):
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def rows(self, columns=None, start=0, stop=None):
+        """Строки [start:stop) как массив структурного dtype поверх mmap (без копирования).
+
+        Числовые поля длины 8 - '>u8', короче - байтовые 'V{длина}', текстовые - 'S{длина}'.
+        """
+        selected = self._select(columns)
+        start, stop, _ = slice(start, stop).indices(self.nrows)
+        dtype = np.dtype({
+            'names': [column['name'] for column in selected],
+            'formats': [('>u8' if column['length'] == 8 else f"V{column['length']}") if column['numeric']
+                        else f"S{column['length']}" for column in selected],
+            'offsets': [column['offset'] for column in selected],
+            'itemsize': self.row_length,
+        })
+        return np.frombuffer(self._mm, dtype=dtype, count=max(0, stop - start),
+                             offset=self.data_start + start * self.row_length)
+
+    def _select(self, columns):
+        if columns is None:
+            return self.columns
+        by_name = {column['name'].upper(): column for column in self.columns}
+        missing = [name for name in columns if name.upper() not in by_name]
+        if missing:
+            raise KeyError(f"Нет столбцов в {self.path}: {', '.join(missing)}")
+        return [by_name[name.upper()] for name in columns]
+
+    def read(self, columns=None, start=0, stop=None):
+        """{имя столбца: ndarray} для выбранных столбцов и строк [start:stop).
+
+        Числа - float64 (пропуски - NaN), текст - object со строками без
+        хвостовых пробелов.
+        """
+        data = self.rows(columns, start, stop)
+        result = {}
+        for column in self._select(columns):
+            field = data[column['name']]
+            if column['numeric']:
+                if column['length'] == 8:
+                    raw = field.astype(np.uint64)
+                else:
+                    # Укороченные числа: недостающие младшие байты мантиссы - нули
+                    padded = np.zeros((len(field), 8), dtype=np.uint8)
+                    padded[:, :column['length']] = np.ascontiguousarray(field).view(np.uint8).reshape(
+                        len(field), column['length'])
+                    raw = padded.view('>u8').ravel().astype(np.uint64)
+                result[column['name']] = ibm_to_ieee(raw)
+            else:
+                # latin-1: код байта равен коду символа, поэтому байты расширяются до
+                # UCS-4 и просматриваются как строки numpy без поэлементного decode
+                length = column['length']
+                text = np.ascontiguousarray(field).view(np.uint8).reshape(len(field), length)
+                text = text.astype(np.uint32).view(f'U{length}').ravel()
+                result[column['name']] = np.char.rstrip(text, ' ').astype(object)
+        return result
+
+    def to_dataframe(self, columns=None, start=0, stop=None):
+        names = [column['name'] for column in self._select(columns)]
+        return pd.DataFrame(self.read(columns, start, stop), columns=names)
+
+    def meta(self):
+        """Метаданные в форме meta pyreadstat (как convert_xpt_to_csv._pandas_meta)"""
+        return SimpleNamespace(column_names=self.column_names, column_labels=self.column_labels,
+                               file_label=self.file_label, table_name=self.table_name,
+                               file_encoding=None, number_rows=self.nrows)
+
+
+def read_xport(path, columns=None, start=0, stop=None):
+    """(DataFrame, meta) для XPORT v5 файла; columns и start/stop ограничивают чтение"""
+    with XportFile(path) as xport:
+        return xport.to_dataframe(columns, start, stop), xport.meta()
+
+
+def compare_frames(df, reference):
+    """Число несовпадающих значений (NaN == NaN, текст сравнивается без пробелов по краям)"""
+    mismatches = 0
+    for name in df.columns:
+        ours, theirs = df[name], reference[name]
+        if ours.dtype == object or theirs.dtype == object:
+            theirs = theirs.map(lambda v: v.decode(ENCODING) if isinstance(v, bytes) else v).fillna('')
+            mismatches += int((ours.fillna('').str.strip() != theirs.astype(str).str.strip()).sum())
+        else:
+            mismatches += int((~((ours == theirs) | (ours.isna() & theirs.isna()))).sum())
+    return mismatches
+
+
+def benchmark(paths, repeat=3):
+    """Время чтения файлов целиком: mmap-читатель, pandas read_sas, pyreadstat; сверка значений"""
+    import pyreadstat
+
+    readers = {
+        'xport_reader': lambda path: read_xport(path)[0],
+        'pandas': lambda path: pd.read_sas(path, format='xport'),
+        'pyreadstat': lambda path: pyreadstat.read_xport(path)[0],
+    }
+    totals = dict.fromkeys(readers, 0.0)
+    print(f"{'Файл':<20} {'Строк':>10} " + ' '.join(f"{name:>13}" for name in readers) + "  Расхождения")
+    for path in paths:
+        times = {}
+        frames = {}
+        for name, read in readers.items():
+            best = None
+            try:
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    frames[name] = read(str(path))
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+            except Exception as e:
+                print(f"  {name}: {path}: {type(e).__name__} {e}")
+                frames[name] = None
+            times[name] = best
+            totals[name] += best or 0
+        # pyreadstat - эталон: pandas читает IBM-ноль как 5.4e-79
+        ours, reference = frames['xport_reader'], frames['pyreadstat']
+        mismatches = compare_frames(ours, reference) if ours is not None and reference is not None else '-'
+        rows = len(ours) if ours is not None else 0
+        print(f"{str(path)[-20:]:<20} {rows:>10,} "
+              + ' '.join(f"{times[name] * 1000:>10.1f} мс" if times[name] is not None else f"{'ошибка':>13}"
+                         for name in readers) + f"  {mismatches}")
+    print(f"{'Всего':<31} " + ' '.join(f"{totals[name] * 1000:>10.1f} мс" for name in readers))
+    base = totals['xport_reader'] or 1e-9
+    print("Ускорение: " + ', '.join(f"{name} x{totals[name] / base:.1f}" for name in readers if name != 'xport_reader'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Чтение SAS XPORT v5 через mmap и numpy")
+    parser.add_argument('files', nargs='+', help="XPT файлы")
+    parser.add_argument('--columns', help="Только эти столбцы, через запятую")
+    parser.add_argument('--start', type=int, default=0, help="Первая строка")
+    parser.add_argument('--stop', type=int, help="Строка, на которой остановиться")
+    parser.add_argument('--benchmark', action='store_true', help="Сравнить скорость с pandas и pyreadstat")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.files)
+        return 0
+    columns = args.columns.split(',') if args.columns else None
+    for path in args.files:
+        started = time.perf_counter()
+        df, meta = read_xport(path, columns, args.start, args.stop)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"=== {path}: {meta.table_name} ({meta.file_label}), строк в файле: {meta.number_rows:,} ===")
+        print(df.head(10).to_string())
+        print(f"Прочитано {df.shape[0]:,} x {df.shape[1]} за {elapsed:.1f} мс")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import json
+import os
+
+from xport_reader import LIBRARY_HEADER, LIBV8_HEADER
+
+# Сигнатура SAS7BDAT: первые 32 байта файла
+SAS7BDAT_MAGIC = (b'\x00' * 12 + b'\xc2\xea\x81\x60\xb3\x14\x11\xcf\xbd\x92\x08\x00'
+                  b'\x09\xc7\x31\x8c\x18\x1f\x10\x11')
+SNIFF_BYTES = 1024
+# Формат -> читатели в порядке попытки. XPORT v5 первым читает xport_reader:
+# mmap, потоковое чтение - срезы строк без разбора остального файла, ноль IBM
+# дает 0.0 (pandas - 5.4e-79), и последняя строка с хвостовыми пробелами не
+# теряется. pandas не читает v8, а читатели pandas здесь вызываются с
+# format='xport', поэтому SAS7BDAT достается только sas7bdat
+READERS = {
+    'xport5': ['xport_reader', 'pandas', 'pyreadstat'],
+    'xport8': ['pyreadstat'],
+    'sas7bdat': ['sas7bdat'],
+    'unknown': ['pandas', 'pyreadstat', 'sas7bdat'],
+}
+# Файл рядом с XPT: какой читатель сработал для каждого файла
+READER_CACHE = '.xpt_readers.json'
+
+
+def sniff_format(path):
+    """Формат по первым байтам: xport5, xport8, sas7bdat, html, empty или unknown"""
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    if not head:
+        return 'empty'
+    if head.startswith(LIBRARY_HEADER):
+        return 'xport5'
+    if head.startswith(LIBV8_HEADER):
+        return 'xport8'
+    if head.startswith(SAS7BDAT_MAGIC):
+        return 'sas7bdat'
+    text = head.lstrip().lower()
+    if text.startswith(b'<') and (b'<html' in text or b'<!doctype' in text):
+        return 'html'
+    return 'unknown'
+
+
+def plan_readers(path, preferred=None):
+    """(формат, [читатели]) для файла; preferred - читатель, сработавший в прошлый раз.
+
+    Для HTML страницы (ошибка сервера вместо данных) и пустого файла
+    сразу бросает ValueError, не запуская ни одного читателя.
+    """
+    fmt = sniff_format(path)
+    if fmt == 'html':
+        raise ValueError("HTML page instead of XPT data (failed download?)")
+    if fmt == 'empty':
+        raise ValueError("empty file")
+    readers = list(READERS[fmt])
+    if preferred in readers:
+        readers.remove(preferred)
+        readers.insert(0, preferred)
+    return fmt, readers
+
+
+class ReaderCache:
+    """Сработавший читатель для каждого файла папки, в JSON рядом с файлами.
+
+    Запись действительна, пока у файла те же размер и время изменения.
+    """
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, READER_CACHE)
+        self.changed = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    @staticmethod
+    def _state(path):
+        stat = os.stat(path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def get(self, path):
+        entry = self.entries.get(os.path.basename(path))
+        if entry and entry['state'] == self._state(path):
+            return entry['reader']
+        return None
+
+    def put(self, path, fmt, reader):
+        entry = {'state': self._state(path), 'format': fmt, 'reader': reader}
+        if self.entries.get(os.path.basename(path)) != entry:
+            self.entries[os.path.basename(path)] = entry
+            self.changed = True
+
+    def save(self):
+        if not self.changed:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.changed = False